@@ -4,88 +4,117 @@
 from __future__ import unicode_literals
 
 # Standard Library
-import calendar
 import datetime
 from datetime import timedelta
+import functools
 from datetime import date as dtdate, datetime as datetime_type
-import time
+import sys
 
-# Third Party
-import dateutil.parser  # https://stackoverflow.com/questions/48632176/python-dateutil-attributeerror-module-dateutil-has-no-attribute-parse
-from dateutil.relativedelta import relativedelta
-from dateutil.rrule import SU, MO, TU, WE, TH, FR, SA  # noqa F401
-
-# Frappe modules.
-import frappe
-from frappe import _, throw, msgprint, ValidationError  # noqa F401
+# NOTE: Frappe, dateutil, and temporal.redis are imported inside the functions that need them.
+# This keeps 'import temporal' fast for CLI tools and workers that only want calendar arithmetic.
 
 # Temporal
 from temporal import core
-from temporal import redis as temporal_redis  # alias to distinguish from Third Party module
+from temporal.core import (  # noqa F401
+	EPOCH_START_YEAR, EPOCH_END_YEAR, EPOCH_START_DATE, EPOCH_END_DATE,
+	MIN_YEAR, MAX_YEAR, MIN_DATE, MAX_DATE,
+	WEEKDAYS, WEEKDAYS_SUN0, WEEKDAYS_MON0,
+	ArgumentMissing, ArgumentType,
+	localize_datetime, date_is_between, date_range, date_range_from_strdates, date_ranges_to_dates,
+	first_week_start_ordinal, week_tuples_between, weeks_between, dates_to_week_arrays,
+	date_generator_type_1, calc_future_dates, get_earliest_date, get_latest_date,
+	any_to_date, any_to_time, any_to_datetime, any_to_iso_date_string, datestr_to_date, date_to_iso_string,
+	datetime_to_iso_string, is_date_string_valid, timestr_to_time, date_to_datetime,
+	next_weekday_after_date, weekday_string_to_shortname, weekday_int_from_name,
+	validate_datatype, make_ordinal
+)
 
 # Constants
 __version__ = '13.1.1'
+WRITE_BATCH_SIZE = 500  # Builder sends this many keys per round trip to the storage backend.
+WEEK_PREFETCH_SIZE = 104  # week_generator(prefetch=True) reads this many Weeks per round trip.
+INTERNED_DATES_SIZE = 16384  # TDates kept for reuse (about 45 years of calendar days; the default epoch has ~11k)
+INTERNED_WEEKS_SIZE = 4096  # Weeks kept for reuse, by week_generator()
+# Increment whenever the content of Day, Week, or Year keys (or their indexes) changes, so that Builder.reconcile() rewrites every year.
+# 2:  Days and Weeks are added to the sorted-set range indexes.
+# 3:  Days, Weeks, and Years are stored as packed records (see temporal/codec.py)
+CALENDAR_SCHEMA_VERSION = 3
 
-# Epoch is the range of 'business active' dates.
-EPOCH_START_YEAR = 2020
-EPOCH_END_YEAR = 2050
-EPOCH_START_DATE = dtdate(EPOCH_START_YEAR, 1, 1)
-EPOCH_END_DATE = dtdate(EPOCH_END_YEAR, 12, 31)
-
-# These should be considered true Min/Max for all other calculations.
-MIN_YEAR = 2000
-MAX_YEAR = 2201
-MIN_DATE = dtdate(MIN_YEAR, 1, 1)
-MAX_DATE = dtdate(MAX_YEAR, 12, 31)
-
-# Module Typing: https://docs.python.org/3.8/library/typing.html#module-typing
-
-WEEKDAYS = (
-	{ 'name_short': 'SUN', 'name_long': 'Sunday' },
-	{ 'name_short': 'MON', 'name_long': 'Monday' },
-	{ 'name_short': 'TUE', 'name_long': 'Tuesday' },
-	{ 'name_short': 'WED', 'name_long': 'Wednesday' },
-	{ 'name_short': 'THU', 'name_long': 'Thursday' },
-	{ 'name_short': 'FRI', 'name_long': 'Friday' },
-	{ 'name_short': 'SAT', 'name_long': 'Saturday' },
-)
+# Names that 'temporal' historically re-exported from Third Party modules.  These are now resolved on first access.
+_LAZY_ATTRIBUTES = {
+	'SU': 'dateutil.rrule', 'MO': 'dateutil.rrule', 'TU': 'dateutil.rrule', 'WE': 'dateutil.rrule',
+	'TH': 'dateutil.rrule', 'FR': 'dateutil.rrule', 'SA': 'dateutil.rrule',
+	'relativedelta': 'dateutil.relativedelta',
+	'_': 'frappe', 'throw': 'frappe', 'msgprint': 'frappe', 'ValidationError': 'frappe',
+}
+
+
+def __getattr__(name):
+	""" Module-level attribute hook (PEP 562), for the lazily-imported names above. """
+	if name in _LAZY_ATTRIBUTES:
+		import importlib  # pylint: disable=import-outside-toplevel
+		return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+	raise AttributeError(f"module 'temporal' has no attribute '{name}'")
+
+
+def _whitelist(*args, **kwargs):
+	"""
+	Equivalent to @frappe.whitelist(), without importing Frappe.
+	Whitelisting only matters to Frappe's request handler, which imports 'frappe' before it imports any App;  so inside a Frappe
+	process the function is registered as usual.  When Temporal is imported without Frappe (a CLI tool), there is nothing to register with.
+	"""
+	frappe_module = sys.modules.get('frappe')
+	if frappe_module:
+		return frappe_module.whitelist(*args, **kwargs)
+	return lambda function: function
 
-WEEKDAYS_SUN0 = (
-	{ 'pos': 0, 'name_short': 'SUN', 'name_long': 'Sunday' },
-	{ 'pos': 1, 'name_short': 'MON', 'name_long': 'Monday' },
-	{ 'pos': 2, 'name_short': 'TUE', 'name_long': 'Tuesday' },
-	{ 'pos': 3, 'name_short': 'WED', 'name_long': 'Wednesday' },
-	{ 'pos': 4, 'name_short': 'THU', 'name_long': 'Thursday' },
-	{ 'pos': 5, 'name_short': 'FRI', 'name_long': 'Friday' },
-	{ 'pos': 6, 'name_short': 'SAT', 'name_long': 'Saturday' })
-
-WEEKDAYS_MON0 = (
-	{ 'pos': 0, 'name_short': 'MON', 'name_long': 'Monday' },
-	{ 'pos': 1, 'name_short': 'TUE', 'name_long': 'Tuesday' },
-	{ 'pos': 2, 'name_short': 'WED', 'name_long': 'Wednesday' },
-	{ 'pos': 3, 'name_short': 'THU', 'name_long': 'Thursday' },
-	{ 'pos': 4, 'name_short': 'FRI', 'name_long': 'Friday' },
-	{ 'pos': 5, 'name_short': 'SAT', 'name_long': 'Saturday' },
-	{ 'pos': 6, 'name_short': 'SUN', 'name_long': 'Sunday' })
-
-class ArgumentMissing(ValidationError):
-	http_status_code = 500
-
-class ArgumentType(ValidationError):
-	http_status_code = 500
 
 class TDate():
-	""" A better datetime.date """
-	def __init__(self, any_date):
+	"""
+	A better datetime.date
+
+	TDates are immutable, and interned:  TDate() returns the same instance for the same calendar date (for up to
+	INTERNED_DATES_SIZE recent dates).  Derived values, like day_of_year() and week_tuple(), are calculated once per instance.
+	"""
+	__slots__ = ('date', '_day_of_year', '_week_tuple')
+
+	def __new__(cls, any_date):
 		if not any_date:
 			raise TypeError("TDate() : Class argument 'any_date' cannot be None.")
 		# To prevent a lot of downstream boilerplate, going to "assume" that strings
 		# passed to this class conform to "YYYY-MM-DD" format.
 		if isinstance(any_date, str):
 			any_date = datestr_to_date(any_date)
+		if type(any_date) is dtdate and cls is TDate:  # pylint: disable=unidiomatic-typecheck
+			return _interned_tdate(any_date.toordinal())
 		if not isinstance(any_date, datetime.date):
 			raise TypeError("Class argument 'any_date' must be a Python date.")
-		self.date = any_date
+		return cls._create(any_date)  # e.g. a datetime; not interned, so its time is kept
+
+	@classmethod
+	def _create(cls, any_date):
+		instance = object.__new__(cls)
+		object.__setattr__(instance, 'date', any_date)
+		object.__setattr__(instance, '_day_of_year', None)
+		object.__setattr__(instance, '_week_tuple', None)
+		return instance
+
+	def __setattr__(self, name, value):
+		raise AttributeError("TDate is immutable.")
+
+	def __reduce__(self):
+		return (TDate, (self.date,))
+
+	def __eq__(self, other):
+		if isinstance(other, TDate):
+			return self.date == other.date
+		return NotImplemented
+
+	def __hash__(self):
+		return hash(self.date)
+
+	def __repr__(self):
+		return f"TDate({self.date!r})"
 
 	def __add__(self, other):
 		# operator overload:  adding two TDates
@@ -116,7 +145,10 @@ class TDate():
 		return make_ordinal(self.day_of_month())
 
 	def day_of_year(self):
-		return int(self.date.strftime("%j"))  # e.g. April 1st is the 109th day in year 2020.
+		# e.g. April 1st is the 109th day in year 2020.
+		if self._day_of_year is None:
+			object.__setattr__(self, '_day_of_year', self.date.toordinal() - dtdate(self.date.year, 1, 1).toordinal() + 1)
+		return self._day_of_year
 
 	def month_of_year(self):
 		return self.date.month
@@ -142,12 +174,22 @@ class TDate():
 	def is_between(self, from_date, to_date):
 		return from_date <= self.date <= to_date
 
+	def week_tuple(self):
+		"""
+		Tuple of (week_year, week_number), calculated with the same integer arithmetic the Builder uses.
+		"""
+		if self._week_tuple is None:
+			ordinal = self.date.toordinal()
+			week_start = ordinal - (ordinal % 7)
+			week_year = dtdate.fromordinal(week_start + 6).year  # a week belongs to the year of its final day (Saturday)
+			object.__setattr__(self, '_week_tuple', (week_year, (week_start - first_week_start_ordinal(week_year)) // 7 + 1))
+		return self._week_tuple
+
 	def week_number(self):
 		"""
-		This function leverages the Redis cache to find the week number.
+		The Temporal week number; calculated, so that Redis is not read.
 		"""
-		week = get_week_by_anydate(self.as_date())
-		return week.week_number
+		return self.week_tuple()[1]
 
 	def as_iso_string(self):
 		return date_to_iso_string(self.date)
@@ -156,6 +198,7 @@ class TDate():
 		"""
 		Return 12:00AM midnight as a Unix Timestamp.
 		"""
+		import calendar  # pylint: disable=import-outside-toplevel
 		# NOTE: January 17th 2024: Unlike previous incarnations, this function does not rely on the Host operating system's timezone.
 		datetime_start_naive = datetime_type.combine(self.as_date(), datetime_type.min.time())
 		datetime_start = core.make_datetime_tz_aware(datetime_start_naive, tzinfo=timezone)
@@ -168,6 +211,7 @@ class TDate():
 		"""
 		Return 11:59:59.999 PM as a Unix Timestamp.
 		"""
+		import calendar  # pylint: disable=import-outside-toplevel
 		# NOTE: January 17th 2024: Unlike previous incarnations, this function does not rely on the Host operating system's timezone.
 		datetime_end_naive = datetime_type.combine(self.as_date() + timedelta(days=1), datetime_type.min.time())  # Midnight of the Next Day
 		datetime_end = core.make_datetime_tz_aware(datetime_end_naive, tzinfo=timezone)
@@ -176,15 +220,52 @@ class TDate():
 			result = result * 1000
 		return result
 
+@functools.lru_cache(maxsize=INTERNED_DATES_SIZE)
+def _interned_tdate(ordinal):
+	return TDate._create(dtdate.fromordinal(ordinal))  # pylint: disable=protected-access
+
+
 class Week():
-	""" A calendar week, starting on Sunday, where the week containing January 1st is always week #1 """
+	"""
+	A calendar week, starting on Sunday, where the week containing January 1st is always week #1
+
+	Weeks are immutable.  When 'set_of_days' is None, the days are calculated from 'date_start' on first use.
+	"""
+	__slots__ = ('week_year', 'week_number', 'date_start', 'date_end', '_days')
+
 	def __init__(self, week_year, week_number, set_of_days, date_start, date_end):
-		self.week_year = week_year
-		self.week_number = week_number
-		self.week_number_str = str(self.week_number).zfill(2)
-		self.days = set_of_days
-		self.date_start = date_start
-		self.date_end = date_end
+		object.__setattr__(self, 'week_year', week_year)
+		object.__setattr__(self, 'week_number', week_number)
+		object.__setattr__(self, '_days', set_of_days)
+		object.__setattr__(self, 'date_start', date_start)
+		object.__setattr__(self, 'date_end', date_end)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Week is immutable.")
+
+	def __reduce__(self):
+		return (Week, (self.week_year, self.week_number, self._days, self.date_start, self.date_end))
+
+	def __eq__(self, other):
+		if isinstance(other, Week):
+			return (self.week_year, self.week_number, self.date_start) == (other.week_year, other.week_number, other.date_start)
+		return NotImplemented
+
+	def __hash__(self):
+		return hash((self.week_year, self.week_number, self.date_start))
+
+	def __repr__(self):
+		return f"Week({self.week_year}, {self.week_number}, {self.date_start} to {self.date_end})"
+
+	@property
+	def week_number_str(self):
+		return str(self.week_number).zfill(2)
+
+	@property
+	def days(self):
+		if self._days is None:
+			object.__setattr__(self, '_days', tuple(self.date_start + timedelta(days=offset) for offset in range(7)))
+		return self._days
 
 	def list_of_day_strings(self):
 		"""
@@ -198,15 +279,23 @@ Days: {", ".join(self.list_of_day_strings())}\nStart: {self.date_start}\nEnd: {s
 		print(message)
 
 
+@functools.lru_cache(maxsize=INTERNED_WEEKS_SIZE)
+def _interned_week(week_year, week_number, week_start_ordinal):
+	week_start = dtdate.fromordinal(week_start_ordinal)
+	return Week(week_year, week_number, None, week_start, dtdate.fromordinal(week_start_ordinal + 6))
+
+
 class Builder():
 	"""
-	This class is used to build the Temporal data (stored in Redis Cache) """
+	This class is used to build the Temporal data (stored in Redis Cache, or another backend from temporal.storage) """
 
 	def __init__(self, epoch_year, end_year, start_of_week='SUN'):
 		""" Initialize the Builder """
+		from temporal.settings import get_settings  # pylint: disable=import-outside-toplevel
+		settings = get_settings()
 
 		# This determines if we output additional error messages.
-		self.debug_mode = frappe.db.get_single_value('Temporal Manager', 'debug_mode')
+		self.debug_mode = settings.debug_mode
 
 		if not isinstance(start_of_week, str):
 			raise TypeError("Argument 'start_of_week' should be a Python String.")
@@ -217,11 +306,9 @@ class Builder():
 
 		# Starting and Ending Year
 		if not epoch_year:
-			gui_start_year = int(frappe.db.get_single_value('Temporal Manager', 'start_year') or 0)
-			epoch_year = gui_start_year or EPOCH_START_YEAR
+			epoch_year = settings.start_year or EPOCH_START_YEAR
 		if not end_year:
-			gui_end_year = int(frappe.db.get_single_value('Temporal Manager', 'end_year') or 0)
-			end_year = gui_end_year or EPOCH_END_YEAR
+			end_year = settings.end_year or EPOCH_END_YEAR
 		if end_year < epoch_year:
 			raise ValueError(f"Ending year {end_year} cannot be smaller than Starting year {epoch_year}")
 		self.epoch_year = epoch_year
@@ -233,25 +320,210 @@ class Builder():
 		self.week_dicts = []  # this will get populated as we build.
 
 	@staticmethod
-	@frappe.whitelist()
-	def build_all(epoch_year=None, end_year=None, start_of_week='SUN'):
-		""" Rebuild all Temporal cache key-values. """
-		instance = Builder(epoch_year=epoch_year,
-		                   end_year=end_year,
+	@_whitelist()
+	def build_all(epoch_year=None, end_year=None, start_of_week='SUN', incremental=False, parallel=False, processes=None, reconcile=False):
+		"""
+		Rebuild all Temporal cache key-values.
+		When 'incremental' is True, only the years added to (or dropped from) the stored range are written (or removed).
+		When 'parallel' is True, years are computed in a pool of 'processes' (default: one per CPU); see build_parallel()
+		When 'reconcile' is True, only years whose content differs from their stored checksum are written; see reconcile()
+		"""
+		from temporal import local_cache, redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		from temporal.storage import get_backend  # pylint: disable=import-outside-toplevel
+		# Whitelisted:  over HTTP, every argument arrives as a string.
+		incremental = incremental in (True, 1, '1', 'true')
+		parallel = parallel in (True, 1, '1', 'true')
+		reconcile = reconcile in (True, 1, '1', 'true')
+		if parallel:
+			import frappe  # pylint: disable=import-outside-toplevel
+			frappe.only_for("System Manager")  # starts a pool of processes
+		instance = Builder(epoch_year=int(epoch_year) if epoch_year else None,
+		                   end_year=int(end_year) if end_year else None,
 		                   start_of_week=start_of_week)
 
-		instance.build_weeks()  # must happen first, so we can build years more-easily.
-		instance.build_years()
-		instance.build_days()
+		with get_backend().use_primary():  # never plan writes from a replica that may be behind
+			built_changes = incremental and instance.build_changes()  # False when nothing is stored yet
+			if not built_changes:
+				if reconcile:
+					instance.reconcile()
+				elif parallel:
+					instance.build_parallel(processes=int(processes) if processes else None)
+				else:
+					instance.build_weeks()
+					instance.build_years()
+					instance.build_days()
+				temporal_redis.write_schema_version(CALENDAR_SCHEMA_VERSION)  # every year was just written (or verified)
+			instance.build_calendar_file()
+			local_cache.publish_generation()  # other processes discard their local caches
+
+	def plan_changes(self):
+		"""
+		Compare the years already stored with this Builder's years.
+		Returns a tuple (stored_years, added_years, dropped_years)
+		"""
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		stored_years = tuple(temporal_redis.read_years())
+		added_years = tuple(year for year in self.years if year not in stored_years)
+		dropped_years = tuple(year for year in stored_years if year not in self.years)
+		if self.debug_mode and stored_years:
+			print(f"Stored years {stored_years[0]}-{stored_years[-1]}.  Adding {added_years}, removing {dropped_years}")
+		return stored_years, added_years, dropped_years
+
+	def build_changes(self):
+		"""
+		Write only the years added to the stored range, and remove only the dropped ones.
+		Returns False when nothing is stored yet (a full build is required).
+		"""
+		stored_years, added_years, dropped_years = self.plan_changes()
+		if not stored_years:
+			return False
+		self.remove_years(dropped_years, stored_end_year=stored_years[-1])
+		for year in added_years:
+			self.build_year_chunk(year)
+		return True
+
+	def remove_years(self, dropped_years, stored_end_year):
+		""" Delete the keys of dropped years.  When the End year moves earlier, also replace the boundary week. """
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		if not dropped_years:
+			return
+		temporal_redis.remove_years(tuple(dropped_years))
+		if stored_end_year in dropped_years:
+			temporal_redis.delete_single_week(stored_end_year + 1, 1)  # the previous boundary week
+		if self.end_year < stored_end_year:
+			# The new boundary week is labelled with a dropped year, so it was just removed.
+			boundary_week = self.boundary_week_dict()
+			if boundary_week:
+				temporal_redis.write_many_weeks([ boundary_week ])
+
+	def build_year_chunk(self, year):
+		"""
+		Completely build a single year:  its weeks, days, and then the year itself.
+		The year is added to the list of years last, so a listed year is always complete (see temporal.rebuild_job)
+		Returns the number of keys written.
+		"""
+		week_count = len(self.week_dicts)
+		self.build_weeks((year,))
+		self.build_days((year,))
+		self.build_years((year,))
+		return (len(self.week_dicts) - week_count) + (dtdate(year, 12, 31) - dtdate(year, 1, 1)).days + 2
 
-	def build_years(self):
-		""" Calculate years and write to Redis. """
-		temporal_redis.write_years(self.years, self.debug_mode)
+	def build_parallel(self, processes=None):
+		"""
+		Build every year, computing each year's weeks, days, and metadata in a pool of worker processes.
+		Results are written by this process, in year order, so the calendar is identical to a serial build.
+		"""
+		import multiprocessing  # pylint: disable=import-outside-toplevel
+		from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+
+		# 'spawn' starts clean interpreters: they do not inherit this process's database and Redis connections.
+		with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+			for week_dicts, day_dicts, year_dict in executor.map(_compute_year_shard, self.years):
+				self.write_year_content(week_dicts, day_dicts, year_dict)
+
+		boundary_week = self.boundary_week_dict()
+		if boundary_week:
+			self.week_dicts.append(boundary_week)
+			temporal_redis.write_many_weeks([ boundary_week ])
+		temporal_redis.write_years(self.years, self.debug_mode)  # last, so that listed years are complete
+
+	def write_year_content(self, week_dicts, day_dicts, year_dict):
+		""" Write one year's Weeks, Days, and Year hash, in batches. """
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		self.week_dicts.extend(week_dicts)
+		for index in range(0, len(week_dicts), WRITE_BATCH_SIZE):
+			temporal_redis.write_many_weeks(week_dicts[index:index + WRITE_BATCH_SIZE])
+		for index in range(0, len(day_dicts), WRITE_BATCH_SIZE):
+			temporal_redis.write_many_days(day_dicts[index:index + WRITE_BATCH_SIZE])
+		temporal_redis.write_single_year(year_dict, self.debug_mode)
+
+	def year_content(self, year):
+		"""
+		Returns a tuple (week_dicts, day_dicts, year_dict) of everything stored for one year.
+		The End year also owns the boundary week (Week #1 of the following year, when it begins in the End year)
+		"""
+		week_dicts, day_dicts, year_dict = _compute_year_shard(year)
+		if year == self.end_year:
+			boundary_week = self.boundary_week_dict()
+			if boundary_week:
+				week_dicts.append(boundary_week)
+		return week_dicts, day_dicts, year_dict
+
+	@staticmethod
+	def content_digest(week_dicts, day_dicts, year_dict):
+		""" A checksum of one year's content, and of the schema version. """
+		import hashlib  # pylint: disable=import-outside-toplevel
+		content = repr((CALENDAR_SCHEMA_VERSION, year_dict, week_dicts, day_dicts))
+		return hashlib.sha256(content.encode()).hexdigest()
+
+	def reconcile(self, verify_only=False, deep=False):
+		"""
+		Compare each year's expected content with the checksum stored when it was last reconciled.
+		Unless 'verify_only' is True, rewrite only the years that differ, and remove the years outside this Builder's range.
+
+		With 'deep', also read each year's keys back from storage and compare them (finds keys that were deleted or evicted)
+
+		Returns a report:  { 'checked': [years], 'drifted': [years], 'removed': [years], 'written': bool }
+		"""
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		stored_years = tuple(temporal_redis.read_years())
+		stored_checksums = temporal_redis.read_checksums(self.years)
+		dropped_years = tuple(year for year in stored_years if year not in self.years)
+		if not verify_only and stored_years:
+			self.remove_years(dropped_years, stored_end_year=stored_years[-1])
+
+		drifted_years = []
 		for year in self.years:
+			week_dicts, day_dicts, year_dict = self.year_content(year)
+			digest = self.content_digest(week_dicts, day_dicts, year_dict)
+			drifted = (year not in stored_years) or (stored_checksums.get(year) != digest)
+			if deep and not drifted:
+				drifted = bool(temporal_redis.find_changed_keys(week_dicts, day_dicts, year_dict))
+			if not drifted:
+				continue
+			drifted_years.append(year)
+			if not verify_only:
+				self.write_year_content(week_dicts, day_dicts, year_dict)
+				temporal_redis.write_checksum(year, digest)
+
+		if not verify_only and set(stored_years) != set(self.years):
+			temporal_redis.write_years(self.years, self.debug_mode)
+		report = { 'checked': list(self.years), 'drifted': drifted_years, 'removed': list(dropped_years), 'written': not verify_only }
+		if self.debug_mode or drifted_years or dropped_years:
+			print(f"Temporal reconcile: {len(drifted_years)} of {len(self.years)} years drifted {drifted_years}; removed {list(dropped_years)}")
+		return report
+
+	def build_calendar_file(self):
+		""" When site config 'temporal_calendar_file' is set, also write the memory-mapped calendar file (see temporal/calendar_file.py) """
+		from temporal import calendar_file  # pylint: disable=import-outside-toplevel
+		path = calendar_file.get_calendar_file_path()
+		if path:
+			calendar_file.write_calendar_file(path)
+			if self.debug_mode:
+				print(f"\u2713 Created Temporal calendar file '{path}'")
+
+	def build_years(self, years=None):
+		"""
+		Calculate years and write to Redis.  By default, every year between Epoch and End (replacing the list of years)
+		"""
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		if years is None:
+			years = self.years
+			temporal_redis.write_years(self.years, self.debug_mode)
+		else:
+			temporal_redis.add_years(tuple(years))
+		for year in years:
 			self.build_year(year)
 
 	def build_year(self, year):
 		""" Create a dictionary of Year metadata and write to Redis. """
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		temporal_redis.write_single_year(self.year_dict_for_year(year, self.weekday_names), self.debug_mode)
+
+	@staticmethod
+	def year_dict_for_year(year, weekday_names=WEEKDAYS_SUN0):
+		""" Returns a dictionary of Year metadata. """
 		date_start = dtdate(year, 1, 1)
 		date_end = dtdate(year, 12, 31)
 		days_in_year = (date_end - date_start).days + 1
@@ -264,22 +536,33 @@ class Builder():
 		# What day of the week is January 1st?
 		year_dict['jan_one_dayname'] = jan_one_dayname
 		try:
-			weekday_short_names = tuple(weekday['name_short'] for weekday in self.weekday_names)
+			weekday_short_names = tuple(weekday['name_short'] for weekday in weekday_names)
 			year_dict['jan_one_weekpos'] = weekday_short_names.index(jan_one_dayname) + 1  # because zero-based indexing
 		except ValueError as ex:
-			raise ValueError(f"Could not find value '{jan_one_dayname}' in tuple 'self.weekday_names' = {self.weekday_names}") from ex
+			raise ValueError(f"Could not find value '{jan_one_dayname}' in tuple 'weekday_names' = {weekday_names}") from ex
 		# Get the maximum week number (52 or 53)
-		max_week_number = max(week['week_number'] for week in self.week_dicts if week['year'] == year)
+		max_week_number = (first_week_start_ordinal(year + 1) - first_week_start_ordinal(year)) // 7
 		year_dict['max_week_number'] = max_week_number
+		return year_dict
 
-		temporal_redis.write_single_year(year_dict, self.debug_mode)
-
-	def build_days(self):
-		start_date = dtdate(self.epoch_year, 1, 1)  # could also do self.years[0]
-		end_date = dtdate(self.end_year, 12, 31)  # could also do self.years[-1]
-
+	def build_days(self, years=None):
+		""" Build all the days in each year (by default, every year between Epoch and End) """
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
 		count = 0
-		for date_foo in date_range(start_date, end_date):
+		for year in (self.years if years is None else years):
+			day_dicts = self.day_dicts_for_year(year)
+			# Write batches of dictionaries to the Redis cache:
+			for index in range(0, len(day_dicts), WRITE_BATCH_SIZE):
+				temporal_redis.write_many_days(day_dicts[index:index + WRITE_BATCH_SIZE])
+			count += len(day_dicts)
+		if self.debug_mode:
+			print(f"\u2713 Created {count} Temporal Day keys in Redis.")
+
+	@staticmethod
+	def day_dicts_for_year(year):
+		""" Returns a list of the Day dictionaries in 'year'. """
+		day_dicts = []
+		for date_foo, week_year, week_number in week_tuples_between(dtdate(year, 1, 1), dtdate(year, 12, 31)):
 			day_dict = {}
 			day_dict['date'] = date_foo
 			day_dict['date_as_string'] = day_dict['date'].strftime("%Y-%m-%d")
@@ -290,69 +573,77 @@ class Builder():
 			day_dict['month_in_year_str'] = date_foo.strftime("%B")
 			day_dict['year'] = date_foo.year
 			day_dict['day_of_year'] = date_foo.strftime("%j")
-			# Calculate the week number:
-			week_tuple = Internals.date_to_week_tuple(date_foo, verbose=False)  # previously self.debug_mode
-			day_dict['week_year'] = week_tuple[0]
-			day_dict['week_number'] = week_tuple[1]
+			# Week number, by integer arithmetic (same result as Internals.date_to_week_tuple, without the per-date overhead)
+			day_dict['week_year'] = week_year
+			day_dict['week_number'] = week_number
 			day_dict['index_in_week'] = int(date_foo.strftime("%w")) + 1  # 1-based indexing
-			# Write this dictionary in the Redis cache:
-			temporal_redis.write_single_day(day_dict)
-			count += 1
-		if self.debug_mode:
-			print(f"\u2713 Created {count} Temporal Day keys in Redis.")
-
-	def build_weeks(self):
-		""" Build all the weeks between Epoch Date and End Date """
-		# Begin on January 1st
-		jan1_date = dtdate(self.epoch_year, 1, 1)
-		jan1_day_of_week = int(jan1_date.strftime("%w"))  # day of week for January 1st
+			day_dicts.append(day_dict)
+		return day_dicts
 
-		week_start_date = jan1_date - timedelta(days=jan1_day_of_week)  # if January 1st is not Sunday, back up.
-		week_end_date = None
-		week_number = None
-		print(f"Temporal is building weeks, starting with {week_start_date}")
-
-		if self.debug_mode:
-			print(f"Processing weeks begining with calendar date: {week_start_date}")
-
-		count = 0
+	@staticmethod
+	def week_dicts_for_year(year):
+		"""
+		Returns a list of the Week dictionaries labelled with 'year'.  A week belongs to the year of its final day (Saturday),
+		so Week #1 may begin in December of the previous year.
+		"""
+		week_dicts = []
+		week_start_date = dtdate.fromordinal(first_week_start_ordinal(year))
+		week_number = 1
 		while True:
-			# Stop once week_start_date's year exceeds the Maximum Year.
-			if week_start_date.year > self.end_year:
-				if self.debug_mode:
-					print(f"Ending loop on {week_start_date}")
-				break
-
 			week_end_date = week_start_date + timedelta(days=6)
-			if self.debug_mode:
-				print(f"Week's end date = {week_end_date}")
-			if (week_start_date.day == 1) and (week_start_date.month == 1):
-				# Sunday is January 1st, it's a new year.
-				week_number = 1
-			elif week_end_date.year > week_start_date.year:
-				# January 1st falls somewhere inside the week
-				week_number = 1
-			else:
-				week_number += 1
-			tuple_of_dates = tuple(list(date_range(week_start_date, week_end_date)))
-			if self.debug_mode:
-				print(f"Writing week number {week_number}")
+			if week_end_date.year > year:
+				break
 			week_dict = {}
 			week_dict['year'] = week_end_date.year
 			week_dict['week_number'] = week_number
 			week_dict['week_start'] = week_start_date
 			week_dict['week_end'] = week_end_date
-			week_dict['week_dates'] = tuple_of_dates
-			temporal_redis.write_single_week(week_dict)
-			self.week_dicts.append(week_dict)  # internal object in Builder, for use later in build_years
-
+			week_dict['week_dates'] = tuple(list(date_range(week_start_date, week_end_date)))
+			week_dicts.append(week_dict)
 			# Increment to the Next Week
 			week_start_date = week_start_date + timedelta(days=7)
-			count += 1
+			week_number += 1
+		return week_dicts
 
-		# Loop complete.
+	def boundary_week_dict(self):
+		"""
+		Week #1 of the year after End, when it begins during the End year (i.e. January 1st is not a Sunday).  Otherwise None.
+		"""
+		next_year_week_one = self.week_dicts_for_year(self.end_year + 1)[0]
+		if next_year_week_one['week_start'].year > self.end_year:
+			return None
+		return next_year_week_one
+
+	def build_weeks(self, years=None):
+		"""
+		Build the weeks of each year (by default, every year between Epoch and End).
+		When the End year is included, this also builds the boundary week (Week #1 of the following year, if it begins in End year)
+		"""
+		from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+		years = self.years if years is None else years
+		if not years:
+			return
+		print(f"Temporal is building weeks, starting with {dtdate.fromordinal(first_week_start_ordinal(years[0]))}")
+
+		week_dicts = []
+		for year in years:
+			week_dicts.extend(self.week_dicts_for_year(year))
+		if self.end_year in years:
+			boundary_week = self.boundary_week_dict()
+			if boundary_week:
+				week_dicts.append(boundary_week)
+		self.week_dicts.extend(week_dicts)  # internal object in Builder, for use later in build_years
+
+		# Write the weeks to the Redis cache, in batches.
+		for index in range(0, len(week_dicts), WRITE_BATCH_SIZE):
+			temporal_redis.write_many_weeks(week_dicts[index:index + WRITE_BATCH_SIZE])
 		if self.debug_mode:
-			print(f"\u2713 Created {count} Temporal Week keys in Redis.")
+			print(f"\u2713 Created {len(week_dicts)} Temporal Week keys in Redis.")
+
+
+def _compute_year_shard(year):
+	""" Computes one year for Builder.build_parallel().  Runs in a worker process, so it must not use Frappe or Redis. """
+	return Builder.week_dicts_for_year(year), Builder.day_dicts_for_year(year), Builder.year_dict_for_year(year)
 
 
 class Internals():
@@ -400,7 +691,7 @@ class Internals():
 		if verbose:
 			print(f"Scenario 3: Target date is not in same Calendar Week as January 1st {this_year}/{next_year}")
 
-		first_sundays_date = TDate(jan1.as_date() + relativedelta(weekday=SU))
+		first_sundays_date = TDate(jan1.as_date() + timedelta(days=(7 - jan1.day_of_week_int(zero_based=True)) % 7))  # on or after Jan 1st
 		first_sundays_day_of_year = first_sundays_date.day_of_year()
 		if first_sundays_day_of_year == 1:
 			first_full_week = 1
@@ -424,177 +715,71 @@ class Internals():
 # Public Functions
 # ----------------
 
-def localize_datetime(any_datetime, any_timezone):
-	"""
-	Given a naive datetime and time zone, return the localized datetime.
-
-	Necessary because Python is -extremely- confusing when it comes to datetime + timezone.
-	"""
-	if not isinstance(any_datetime, datetime_type):
-		raise TypeError("Argument 'any_datetime' must be a Python datetime object.")
-
-	if any_datetime.tzinfo:
-		raise ValueError(f"Datetime value {any_datetime} is already localized and time zone aware (tzinfo={any_datetime.tzinfo})")
-
-	# What kind of time zone object was passed?
-	type_name = type(any_timezone).__name__
-
-	# WARNING: DO NOT USE:  naive_datetime.astimezone(timezone).  This implicitly shifts you the UTC offset.
-	if type_name == 'ZoneInfo':
-		# Only available in Python 3.9+
-		return any_datetime.replace(tzinfo=any_timezone)
-	# Python 3.8 or earlier
-	return any_timezone.localize(any_datetime)
-
-def date_is_between(any_date, start_date, end_date, use_epochs=True):
-	"""
-	Returns a boolean if a date is between 2 other dates.
-	The interesting part is the epoch date substitution.
-	"""
-	if (not use_epochs) and (not start_date):
-		raise ValueError("Function 'date_is_between' cannot resolve Start Date = None, without 'use_epochs' argument.")
-	if (not use_epochs) and (not end_date):
-		raise ValueError("Function 'date_is_between' cannot resolve End Date = None, without 'use_epochs' argument.")
-
-	if not start_date:
-		start_date = EPOCH_START_DATE
-	if not end_date:
-		end_date = EPOCH_END_DATE
-
-	any_date = any_to_date(any_date)
-	start_date = any_to_date(start_date)
-	end_date = any_to_date(end_date)
-
-	return bool(start_date <= any_date <= end_date)
-
-def date_range(start_date, end_date):
-	"""
-	Generator for an inclusive range of dates.
-	It's very weird this isn't part of Python Standard Library or datetime  :/
-	"""
-	validate_datatype("start_date", start_date, (str, dtdate), True)
-	validate_datatype("end_date", end_date, (str, dtdate), True)
-
-	# As always, convert ERPNext strings into dates...
-	start_date = any_to_date(start_date)
-	end_date = any_to_date(end_date)
-	# Important to add +1, otherwise the range is -not- inclusive.
-	for number_of_days in range(int((end_date - start_date).days) + 1):
-		yield start_date + timedelta(number_of_days)
-
-def date_range_from_strdates(start_date_str, end_date_str):
-	""" Generator for an inclusive range of date-strings. """
-	if not isinstance(start_date_str, str):
-		raise TypeError("Argument 'start_date_str' must be a Python string.")
-	if not isinstance(end_date_str, str):
-		raise TypeError("Argument 'end_date_str' must be a Python string.")
-	start_date = datestr_to_date(start_date_str)
-	end_date = datestr_to_date(end_date_str)
-	return date_range(start_date, end_date)
-
-def date_ranges_to_dates(date_ranges: list) -> set:
-	"""
-	Generator for multiple, inclusive ranges of dates.
-	It's very weird this isn't part of Python Standard Library or datetime  :/
-
-	args:
-		date_ranges: List of Tuples, for example: [ (2023-10-01, 2023-10-19) , (2023-11-15, 2023-11-30), (2023-12-09, 2023-12-13)]
-	"""
-
-	validate_datatype("date_ranges", date_ranges, (set, list))
-	if not date_ranges:
-		return set()
+def date_to_datekey(any_date):
+	""" The storage key of a Day (see temporal/keys.py) """
+	from temporal import keys  # pylint: disable=import-outside-toplevel
+	return keys.day_key(any_date)
 
-	result = set()
-	for each_tuple in date_ranges:
-		start_date = any_to_date(each_tuple[0]) or any_to_date("1900-01-01")
-		end_date = any_to_date(each_tuple[1]) or any_to_date("2199-12-31")
+def get_calendar_years():
+	""" Fetch calendar years from Redis. """
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	return temporal_redis.read_years()
 
-		# Interestingly, Python will not allow the following 2 statements to be combined; it's a syntax error
-		temp_results = list(date_range(start_date, end_date))
-		if temp_results:
-			result.update(temp_results)
+def get_calendar_year(year):
+	""" Fetch a Year dictionary from the calendar file, or Redis. """
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	mapped_calendar = _get_calendar_file()
+	if mapped_calendar and mapped_calendar.has_year(year):
+		return mapped_calendar.read_year(year)
+	return temporal_redis.read_single_year(year)
 
-	return sorted(result)
 
-def date_generator_type_1(start_date, increments_of, earliest_result_date):
-	"""
-	Given a start date, increment N number of days.
-	First result can be no earlier than 'earliest_result_date'
+@_whitelist()
+def verify_calendar(deep=False):
 	"""
-	iterations = 0
-	next_date = start_date
-	while True:
-		iterations += 1
-		if (iterations == 1) and (start_date == earliest_result_date):  # On First Iteration, if dates match, yield Start Date.
-			yield start_date
-		else:
-			next_date = next_date + timedelta(days=increments_of)
-			if next_date >= earliest_result_date:
-				yield next_date
+	Report calendar years whose stored content has drifted from what the Builder would write, without writing anything.
+	To repair them:  Builder.build_all(reconcile=True)
 
-def calc_future_dates(epoch_date, multiple_of_days, earliest_result_date, qty_of_result_dates):
-	"""
-		Purpose: Predict future dates, based on an epoch date and multiple.
-		Returns: A List of Dates
-
-		Arguments
-		epoch_date:           The date from which the calculation begins.
-		multiple_of_days:     In every iteration, how many days do we move forward?
-		no_earlier_than:      What is earliest result date we want to see?
-		qty_of_result_dates:  How many qualifying dates should this function return?
+		bench execute temporal.verify_calendar
 	"""
-	validate_datatype('epoch_date', epoch_date, dtdate, True)
-	validate_datatype('earliest_result_date', earliest_result_date, dtdate, True)
+	from temporal.storage import get_backend  # pylint: disable=import-outside-toplevel
+	deep = deep in (True, 1, '1', 'true')
+	with get_backend().use_primary():
+		return Builder(epoch_year=None, end_year=None).reconcile(verify_only=True, deep=deep)
 
-	# Convert to dates, always.
-	epoch_date = any_to_date(epoch_date)
-	earliest_result_date = any_to_date(earliest_result_date)
-	# Validate the remaining data types.
-	validate_datatype("multiple_of_days", multiple_of_days, int)
-	validate_datatype("qty_of_result_dates", qty_of_result_dates, int)
 
-	if earliest_result_date < epoch_date:
-		raise ValueError(f"Earliest_result_date '{earliest_result_date}' cannot precede the epoch date ({epoch_date})")
-
-	this_generator = date_generator_type_1(epoch_date, multiple_of_days, earliest_result_date)
-	ret = []
-	for _ in range(qty_of_result_dates):  # underscore because we don't actually need the index.
-		ret.append(next(this_generator))
-	return ret
-
-def date_to_datekey(any_date):
-	if not isinstance(any_date, datetime.date):
-		raise TypeError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
-	date_as_string = any_date.strftime("%Y-%m-%d")
-	return f"temporal/day/{date_as_string}"
-
-def get_calendar_years():
-	""" Fetch calendar years from Redis. """
-	return temporal_redis.read_years()
-
-def get_calendar_year(year):
-	""" Fetch a Year dictionary from Redis. """
-	return temporal_redis.read_single_year(year)
+def _get_calendar_file():
+	""" Returns the memory-mapped CalendarFile, or None when it is not enabled for this site. """
+	from temporal import calendar_file  # pylint: disable=import-outside-toplevel
+	return calendar_file.get_calendar_file()
 
 # ----------------
 # Weeks
 # ----------------
 
 def week_to_weekkey(year, week_number):
+	""" The storage key of a Week (see temporal/keys.py) """
+	from temporal import keys  # pylint: disable=import-outside-toplevel
 	if not isinstance(week_number, int):
 		raise TypeError("Argument 'week_number' should be a Python integer.")
-	week_as_string = str(week_number).zfill(2)
-	return f"temporal/week/{year}-{week_as_string}"
+	return keys.week_key(year, week_number)
 
 
 def get_week_by_weeknum(year, week_number):
 	"""  Returns a class Week. """
-	week_dict = temporal_redis.read_single_week(year, week_number, )
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	from temporal import metrics  # pylint: disable=import-outside-toplevel
+	from temporal.settings import get_settings  # pylint: disable=import-outside-toplevel
+	mapped_calendar = _get_calendar_file()
+	if mapped_calendar and mapped_calendar.has_year(int(year)):
+		week_dict = mapped_calendar.read_week(year, week_number)
+	else:
+		week_dict = temporal_redis.read_single_week(year, week_number, )
 	if not week_dict:
 		print(f"Warning: No value in Redis for year {year}, week number {week_number}.  Rebuilding...")
-		Builder.build_all()
-		if (not week_dict) and frappe.db.get_single_value('Temporal Manager', 'debug_mode'):
+		with metrics.rebuild_timer('week_miss'):
+			Builder.build_all()
+		if (not week_dict) and get_settings().debug_mode:
 			raise KeyError(f"WARNING: Unable to find Week in Redis for year {year}, week {week_number}.")
 		return None
 
@@ -614,7 +799,9 @@ def get_week_by_anydate(any_date):
 
 	date_dict = get_date_metadata(any_date)  # fetch from Redis
 	if not date_dict:  # try to rebuild without throwing an error
-		Builder.build_all()
+		from temporal import metrics  # pylint: disable=import-outside-toplevel
+		with metrics.rebuild_timer('day_miss'):
+			Builder.build_all()
 		date_dict = get_date_metadata(any_date)  # 2nd Attempt
 		if not date_dict:
 			raise KeyError(f"WARNING: Unable to find Week in Temporal Redis for calendar date {any_date}.")
@@ -624,13 +811,14 @@ def get_week_by_anydate(any_date):
 		raise RuntimeError(f"Unable to construct a Week() for calendar date {any_date} (week_year={date_dict['week_year']}, week_number={date_dict['week_number']})")
 	return result_week
 
-@frappe.whitelist()
+@_whitelist()
 def get_weeks_as_dict(year, from_week_num, to_week_num):
 	""" Given a range of Week numbers, return a List of dictionaries.
 
 		From Shell: bench execute --args "2021,15,20" temporal.get_weeks_as_dict
 
 	"""
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
 	# Convert JS strings into integers.
 	year = int(year)
 	from_week_num = int(from_week_num)
@@ -643,61 +831,101 @@ def get_weeks_as_dict(year, from_week_num, to_week_num):
 	if to_week_num not in range(1, 54):  # 53 possible week numbers.
 		raise ValueError(f"Invalid value '{to_week_num}' for argument 'to_week_num'")
 
+	mapped_calendar = _get_calendar_file()
 	weeks_list = []
 	for week_num in range(from_week_num, to_week_num + 1):
-		week_dict = temporal_redis.read_single_week(year, week_num)
+		if mapped_calendar and mapped_calendar.has_year(year):
+			week_dict = mapped_calendar.read_week(year, week_num)
+		else:
+			week_dict = temporal_redis.read_single_week(year, week_num)
 		if week_dict:
 			weeks_list.append(week_dict)
 
 	return weeks_list
 
 
+@_whitelist()
+def get_weeks_between(from_date, to_date):
+	""" Return a List of dictionaries, for every Week that includes a day between 'from_date' and 'to_date'.
+
+		From Shell: bench execute --args "['2021-04-01','2021-04-30']" temporal.get_weeks_between
+
+	"""
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	from_date = any_to_date(from_date)
+	to_date = any_to_date(to_date)
+	if from_date > to_date:
+		raise ValueError("Argument 'from_date' cannot be greater than argument 'to_date'")
+	return temporal_redis.read_weeks_between(from_date, to_date)
+
+
+@_whitelist()
+def count_weekdays_between(from_date, to_date):
+	""" Count the calendar days between 'from_date' and 'to_date' (inclusive) by day of week:  { 'Sunday': 5, 'Monday': 4, ... }
+
+		From Shell: bench execute --args "['2021-04-01','2021-04-30']" temporal.count_weekdays_between
+
+	"""
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	from_date = any_to_date(from_date)
+	to_date = any_to_date(to_date)
+	if from_date > to_date:
+		raise ValueError("Argument 'from_date' cannot be greater than argument 'to_date'")
+	counts = temporal_redis.count_weekdays_between(from_date, to_date)
+	return { weekday['name_long']: count for weekday, count in zip(WEEKDAYS_SUN0, counts) }
+
+
 def datestr_to_week_number(date_as_string):
 	""" Given a string date, return the Week Number. """
 	return Internals.date_to_week_tuple(datestr_to_date(date_as_string), verbose=False)
 
 
-def week_generator(from_date, to_date):
+def week_generator(from_date, to_date, prefetch=False):
 	"""
 	Return a Python Generator for all the weeks in a date range.
+
+	Weeks are calculated, and created only as they are consumed; nothing is read from Redis.
+	With 'prefetch', each Week is instead built from its stored hash, reading WEEK_PREFETCH_SIZE weeks per round trip.
 	"""
 	from_date = any_to_date(from_date)
 	to_date = any_to_date(to_date)
 
 	if from_date > to_date:
 		raise ValueError("Argument 'from_date' cannot be greater than argument 'to_date'")
-	# If dates are the same, simply return the 1 week.
-	if from_date == to_date:
-		yield get_week_by_anydate(from_date)
-
-	from_week = get_week_by_anydate(from_date)  # Class of type 'Week'
-	if not from_week:
-		raise RuntimeError(f"Unable to find a Week for date {from_date}. (Temporal week_generator() and Cache)")
-	to_week = get_week_by_anydate(to_date)  # Class of type 'Week'
-	if not to_week:
-		raise RuntimeError(f"Unable to find a Week for date {to_date} (Temporal week_generator() and Cache)")
-
-	# results = []
-
-	# Determine which Week Numbers are missing.
-	for year in range(from_week.week_year, to_week.week_year + 1):
-		# print(f"Processing week in year {year}")
-		year_dict = temporal_redis.read_single_year(year)
-		# Start Index
-		start_index = 0
-		if year == from_week.week_year:
-			start_index = from_week.week_number
-		else:
-			start_index = 1
-		# End Index
-		end_index = 0
-		if year == to_week.week_year:
-			end_index = to_week.week_number
-		else:
-			end_index = year_dict['max_week_number']
 
-		for week_num in range(start_index, end_index + 1):
-			yield get_week_by_weeknum(year, week_num)  # A class of type 'Week'
+	weeks = weeks_between(from_date, to_date)
+	if not prefetch:
+		for week_year, week_number, week_start in weeks:
+			yield _interned_week(week_year, week_number, week_start.toordinal())
+		return
+
+	from itertools import islice  # pylint: disable=import-outside-toplevel
+	while True:
+		chunk = [ (week_year, week_number) for week_year, week_number, _ in islice(weeks, WEEK_PREFETCH_SIZE) ]
+		if not chunk:
+			return
+		for week_dict in _read_many_weeks(chunk):
+			yield Week(week_dict['year'],
+			           week_dict['week_number'],
+			           week_dict['week_dates'],
+			           week_dict['week_start'],
+			           week_dict['week_end'])
+
+
+def _read_many_weeks(year_week_pairs):
+	""" Returns the stored Week dictionaries for a list of (year, week_number), in one round trip.  Rebuilds once, if any are missing. """
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	week_dicts = temporal_redis.read_many_weeks(year_week_pairs)
+	if not all(week_dicts):
+		from temporal import metrics  # pylint: disable=import-outside-toplevel
+		print(f"Warning: Missing weeks in Redis between {year_week_pairs[0]} and {year_week_pairs[-1]}.  Rebuilding...")
+		with metrics.rebuild_timer('week_miss'):
+			Builder.build_all()
+		week_dicts = temporal_redis.read_many_weeks(year_week_pairs)
+		if not all(week_dicts):
+			missing = [ pair for pair, week_dict in zip(year_week_pairs, week_dicts) if not week_dict ]
+			raise KeyError(f"Unable to find Weeks in Temporal Redis for (year, week number) {missing}")
+	return week_dicts
 
 
 # ----------------
@@ -710,288 +938,17 @@ def get_date_metadata(any_date):
 		bench execute --args "{'2021-04-18'}" temporal.get_date_metadata
 
 	 """
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
 	if isinstance(any_date, str):
 		any_date = datetime.datetime.strptime(any_date, '%Y-%m-%d').date()
 	if not isinstance(any_date, datetime.date):
 		raise TypeError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
 
+	mapped_calendar = _get_calendar_file()
+	if mapped_calendar and mapped_calendar.has_date(any_date):
+		return mapped_calendar.read_day(any_date)
 	return temporal_redis.read_single_day(date_to_datekey(any_date))
 
-def get_earliest_date(list_of_dates):
-	if not all(isinstance(x, datetime.date) for x in list_of_dates):
-		raise ValueError("All values in argument must be datetime dates.")
-	return min(list_of_dates)
-
-def get_latest_date(list_of_dates):
-	if not all(isinstance(x, datetime.date) for x in list_of_dates):
-		raise ValueError("All values in argument must be datetime dates.")
-	return max(list_of_dates)
-
-# ----------------
-# DATETIME and STRING CONVERSION
-# ----------------
-
-def any_to_date(date_as_unknown):
-	"""
-	Given an argument of unknown Type, try to return a Date.
-	"""
-	try:
-		if not date_as_unknown:
-			return None
-		if isinstance(date_as_unknown, str):
-			return datetime.datetime.strptime(date_as_unknown,"%Y-%m-%d").date()
-		if isinstance(date_as_unknown, datetime.date):
-			return date_as_unknown
-
-	except dateutil.parser._parser.ParserError as ex:  # pylint: disable=protected-access
-		raise ValueError(f"'{date_as_unknown}' is not a valid date string.") from ex
-
-	raise TypeError(f"Unhandled type ({type(date_as_unknown)}) for argument to function any_to_date()")
-
-def any_to_time(generic_time):
-	"""
-	Given an argument of a generic, unknown Type, try to return a Time.
-	"""
-	try:
-		if not generic_time:
-			return None
-		if isinstance(generic_time, str):
-			return timestr_to_time(generic_time)
-		if isinstance(generic_time, datetime.time):
-			return generic_time
-
-	except dateutil.parser._parser.ParserError as ex:  # pylint: disable=protected-access
-		raise ValueError(f"'{generic_time}' is not a valid Time string.") from ex
-
-	raise TypeError(f"Function argument 'generic_time' in any_to_time() has an unhandled data type: '{type(generic_time)}'")
-
-def any_to_datetime(datetime_as_unknown):
-	"""
-	Given an argument of unknown Type, try to return a DateTime.
-	"""
-	datetime_string_format = "%Y-%m-%d %H:%M:%S"
-	try:
-		if not datetime_as_unknown:
-			return None
-		if isinstance(datetime_as_unknown, str):
-			return datetime.datetime.strptime(datetime_as_unknown, datetime_string_format)
-		if isinstance(datetime_as_unknown, datetime.datetime):
-			return datetime_as_unknown
-
-	except dateutil.parser._parser.ParserError as ex:  # pylint: disable=protected-access
-		raise ValueError(f"'{datetime_as_unknown}' is not a valid datetime string.") from ex
-
-	raise TypeError(f"Unhandled type ({type(datetime_as_unknown)}) for argument to function any_to_datetime()")
-
-def any_to_iso_date_string(any_date):
-	"""
-	Given a date, create a String that MariaDB understands for queries (YYYY-MM-DD)
-	"""
-	if isinstance(any_date, datetime.date):
-		return any_date.strftime("%Y-%m-%d")
-	if isinstance(any_date, str):
-		return any_date
-	raise TypeError(f"Argument 'any_date' can be a String or datetime.date only (found '{type(any_date)}')")
-
-def datestr_to_date(date_as_string):
-	"""
-	Converts string date (YYYY-MM-DD) to datetime.date object.
-	"""
-
-	# ERPNext is very inconsistent with Date typing.  We should handle several possibilities:
-	if not date_as_string:
-		return None
-	if isinstance(date_as_string, datetime.date):
-		return date_as_string
-	if not isinstance(date_as_string, str):
-		raise TypeError(f"Argument 'date_as_string' should be of type String, not '{type(date_as_string)}'")
-	if not is_date_string_valid(date_as_string):
-		return None
-
-	try:
-		# Explicit is Better than Implicit.  The format should be YYYY-MM-DD.
-
-		# The function below is completely asinine.
-		# If you pass a day of week string (e.g. "Friday"), it returns the next Friday in the calendar.  Instead of an error.
-		# return dateutil.parser.parse(date_as_string, yearfirst=True, dayfirst=False).date()
-
-		# So I'm now using this instead.
-		return datetime.datetime.strptime(date_as_string,"%Y-%m-%d").date()
-
-	except dateutil.parser._parser.ParserError as ex:  # pylint: disable=protected-access
-		raise ValueError("Value '{date_as_string}' is not a valid date string.") from ex
-
-def date_to_iso_string(any_date):
-	"""
-	Given a date, create an ISO String.  For example, 2021-12-26.
-	"""
-	if not isinstance(any_date, datetime.date):
-		raise ValueError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
-	return any_date.strftime("%Y-%m-%d")
-
-def datetime_to_iso_string(any_datetime):
-	"""
-	Given a datetime, create a ISO String
-	"""
-	if not isinstance(any_datetime, datetime_type):
-		raise ValueError(f"Argument 'any_date' should have type 'datetime', not '{type(any_datetime)}'")
-
-	return any_datetime.isoformat(sep=' ')  # Note: Frappe not using 'T' as a separator, but a space ''
-
-def is_date_string_valid(date_string):
-	# dateutil parser does not agree with dates like "0001-01-01" or "0000-00-00"
-	if (not date_string) or (date_string or "").startswith(("0001-01-01", "0000-00-00")):
-		return False
-	return True
-
-def timestr_to_time(time_as_string):
-	"""
-	Converts a string time (8:30pm) to datetime.time object.
-	Examples:
-		8pm
-		830pm
-		830 pm
-		8:30pm
-		20:30
-		8:30 pm
-	"""
-	time_as_string = time_as_string.lower()
-	time_as_string = time_as_string.replace(':', '')
-	time_as_string = time_as_string.replace(' ', '')
-
-	am_pm = None
-	hour = None
-	minute = None
-	second = 0
-
-	if 'am' in time_as_string:
-		am_pm = 'am'
-		time_as_string = time_as_string.replace('am', '')
-	elif 'pm' in time_as_string:
-		am_pm = 'pm'
-		time_as_string = time_as_string.replace('pm', '')
-	time_as_string = time_as_string.replace(' ', '')
-
-	# Based on length of string, make some assumptions:
-	if len(time_as_string) == 0:
-		raise ValueError(f"Invalid time string '{time_as_string}'")
-	if len(time_as_string) in (1,2):
-		hour = int(time_as_string)
-		minute = 0
-	elif len(time_as_string) == 3:
-		hour = int(time_as_string[0])
-		minute = int(time_as_string[1:3])  # NOTE: Python string splicing; last index is not included.
-	elif len(time_as_string) == 4:
-		hour = int(time_as_string[0:2])  # NOTE: Python string splicing; last index is not included.
-		minute = int(time_as_string[2:4]) # NOTE: Python string splicing; last index is not included.
-	elif len(time_as_string) == 6:
-		hour = int(time_as_string[0:2])  # NOTE: Python string splicing; last index is not included.
-		minute = int(time_as_string[2:4]) # NOTE: Python string splicing; last index is not included.
-		second = int(time_as_string[4:6]) # NOTE: Python string splicing; last index is not included.
-	else:
-		raise ValueError(f"Invalid time string '{time_as_string}'")
-
-	if hour > 23:
-		raise ValueError(f"Invalid time string '{time_as_string}'")
-	if minute > 59:
-		raise ValueError(f"Invalid time string '{time_as_string}'")
-	if int(hour) > 12 and am_pm == 'am':
-		raise ValueError(f"Invalid time string '{time_as_string}'")
-
-	if not am_pm:
-		if hour > 12:
-			am_pm = 'pm'
-		else:
-			am_pm = 'am'
-	if am_pm == 'pm' and hour < 12:
-		hour += 12
-
-	return datetime.time(int(hour), int(minute), second)
-
-# ----------------
-# Weekdays
-# ----------------
-
-def next_weekday_after_date(weekday, any_date):
-	"""
-	Find the next day of week (MON, SUN, etc) after a target date.
-	"""
-	weekday_int = None
-	if isinstance(weekday, int):
-		weekday_int = weekday
-	elif isinstance(weekday, str):
-		weekday_int = weekday_int_from_name(weekday, first_day_of_week='MON')  # Monday-based math below
-
-	days_ahead = weekday_int - any_date.weekday()
-	if days_ahead <= 0:  # Target day already happened this week
-		days_ahead += 7
-	return any_date + datetime.timedelta(days_ahead)
-
-
-def validate_datatype(argument_name, argument_value, expected_type, mandatory=False):
-	"""
-	A helpful generic function for checking a variable's datatype, and throwing an error on mismatches.
-	Absolutely necessary when dealing with extremely complex Python programs that talk to SQL, HTTP, Redis, etc.
-
-	NOTE: expected_type can be a single Type, or a tuple of Types.
-	"""
-
-	# TODO: Support passing arguments for "expected_precise_type" (e.g. DailyOrder), and "expected_base_type" (e.g. Document)
-
-	# Throw error if missing mandatory argument.
-	NoneType = type(None)
-	if mandatory and isinstance(argument_value, NoneType):
-		raise ArgumentMissing(f"Argument '{argument_name}' is mandatory.")
-
-	if not argument_value:
-		return argument_value  # datatype is going to be a NoneType, which is okay if not mandatory.
-
-	# Check argument type
-	if not isinstance(argument_value, expected_type):
-		if isinstance(expected_type, tuple):
-			expected_type_names = [ each.__name__ for each in expected_type ]
-			msg = f"Argument '{argument_name}' should be one of these types: '{', '.join(expected_type_names)}'"
-			msg += f"<br>Found a {type(argument_value).__name__} with value '{argument_value}' instead."
-		else:
-			msg = f"Argument '{argument_name}' should be of type = '{expected_type.__name__}'"
-			msg += f"<br>Found a {type(argument_value).__name__} with value '{argument_value}' instead."
-		raise ArgumentType(msg)
-
-	# Otherwise, return the argument to the caller.
-	return argument_value
-
-
-def weekday_string_to_shortname(weekday_string):
-	"""
-	Given a weekday name (MON, Monday, MONDAY), convert it to the short name.
-	"""
-	if weekday_string.upper() in (day['name_short'] for day in WEEKDAYS):
-		return weekday_string.upper()
-
-	ret = next(day['name_short'] for day in WEEKDAYS if day['name_long'].upper() == weekday_string.upper())
-	return ret
-
-
-def weekday_int_from_name(weekday_name, first_day_of_week='SUN'):
-	"""
-	Return the position of a Weekday in a Week.
-	"""
-	weekday_short_name = weekday_string_to_shortname(weekday_name)
-	if first_day_of_week == 'SUN':
-		result = next(weekday['pos'] for weekday in WEEKDAYS_SUN0 if weekday['name_short'] == weekday_short_name)
-	elif first_day_of_week == 'MON':
-		result = next(weekday['pos'] for weekday in WEEKDAYS_MON0 if weekday['name_short'] == weekday_short_name)
-	else:
-		raise ValueError("Invalid first day of week (expected SUN or MON)")
-	return result
-
-
-def date_to_datetime(any_date):
-	"""
-	Return a Date as a Datetime set to midnight.
-	"""
-	return datetime_type.combine(any_date, datetime_type.min.time())
-
 
 def date_to_scalar(any_date):
 	"""
@@ -1001,22 +958,8 @@ def date_to_scalar(any_date):
 
 	Given all the calendar dates stored in a Table, a simple identity column would suffice.
 	"""
+	import frappe  # pylint: disable=import-outside-toplevel
 	scalar_value = frappe.db.get_value("Temporal Dates", filters={"calendar_date": any_date}, fieldname="scalar_value", cache=True)
 	return scalar_value
 
 
-def make_ordinal(some_integer) -> str:
-	"""
-	Convert an integer into its ordinal representation::
-		make_ordinal(0)   => '0th'
-		make_ordinal(3)   => '3rd'
-		make_ordinal(122) => '122nd'
-		make_ordinal(213) => '213th'
-	"""
-	# Shamelessly borrowed from here: https://stackoverflow.com/questions/9647202/ordinal-numbers-replacement
-	some_integer = int(some_integer)
-	if 11 <= (some_integer % 100) <= 13:
-		suffix = 'th'
-	else:
-		suffix = ['th', 'st', 'nd', 'rd', 'th'][min(some_integer % 10, 4)]
-	return str(some_integer) + suffix
@@ -0,0 +1,181 @@
+""" temporal/aio.py
+
+Asyncio versions of Temporal's calendar reads, for services that run an event loop (outside of Frappe's gunicorn workers).
+
+Reads go directly to Redis with the asyncio client from redis-py (version 4.2 or later), not through frappe.cache().
+Each call is a single round trip; functions that read many keys send them together in one pipeline.
+For concurrent fan-out, await many calls at once:
+
+	async with AsyncTemporal("redis://localhost:13000", key_prefix="_a1b2c3d4e5f6") as calendar:
+		weeks = await asyncio.gather(*[ calendar.get_week_by_anydate(each) for each in dates ])
+		async for week in calendar.week_generator("2021-01-01", "2021-03-31"):
+			...
+
+'key_prefix' is the prefix Frappe adds to every Redis key:  the site's database name (see 'db_name' in site_config.json)
+'key_scheme' must match the site's 'temporal_key_scheme' ('standard' or 'cluster'; see temporal/keys.py)
+
+The calendar must already exist in Redis (see Builder.build_all).  Unlike the synchronous functions, a missing key is
+not rebuilt on demand; a KeyError is raised instead.
+"""
+
+# Standard Library
+import asyncio
+from datetime import date as dtdate
+
+# Temporal
+from temporal import Week, any_to_date, codec, keys, MIN_YEAR, MAX_YEAR
+from temporal.storage import RedisBackend
+
+# Maximum number of keys sent in a single pipeline.
+PIPELINE_BATCH_SIZE = 500
+
+
+class AsyncTemporal():
+	"""
+	Asynchronous reader for the Temporal calendar in Redis.
+
+	Pass either a Redis 'url', or an existing 'client' (any redis.asyncio compatible client; e.g. fakeredis for tests).
+	With a 'url', at most 'max_connections' commands are in flight; further concurrent calls wait for a free connection.
+	"""
+	def __init__(self, url=None, key_prefix=None, client=None, max_connections=50, key_scheme=keys.STANDARD):
+		if key_scheme not in keys.KEY_SCHEMES:
+			raise ValueError(f"Invalid value '{key_scheme}' for argument 'key_scheme'")
+		self.key_scheme = key_scheme
+		self._pool = None  # only set when this instance owns the connection pool
+		if client is None:
+			if not url:
+				raise ValueError("Either argument 'url' or 'client' is required.")
+			from redis import asyncio as redis_asyncio  # pylint: disable=import-outside-toplevel
+			self._pool = redis_asyncio.BlockingConnectionPool.from_url(url, max_connections=max_connections)
+			client = redis_asyncio.Redis(connection_pool=self._pool)
+		self.client = client
+		self.key_prefix = key_prefix
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def close(self):
+		if hasattr(self.client, 'aclose'):  # redis-py 5.0.1 and later
+			await self.client.aclose()
+		else:
+			await self.client.close()
+		if self._pool is not None:
+			await self._pool.disconnect()
+
+	def make_key(self, key):
+		if self.key_prefix:
+			return f"{self.key_prefix}|{key}"
+		return key
+
+	# ----------------
+	# Redis
+	# ----------------
+
+	async def read_hash(self, key):
+		""" Returns a dictionary, or None if the key does not exist. """
+		return codec.decode(RedisBackend.decode_hash(await self.client.hgetall(self.make_key(key)))) or None
+
+	async def read_hashes(self, keys):
+		""" Returns a list of dictionaries (or None for missing keys), in the same order as 'keys'.  Pipelined. """
+		results = []
+		for offset in range(0, len(keys), PIPELINE_BATCH_SIZE):
+			pipeline = self.client.pipeline(transaction=False)
+			for key in keys[offset:offset + PIPELINE_BATCH_SIZE]:
+				pipeline.hgetall(self.make_key(key))
+			results.extend((codec.decode(RedisBackend.decode_hash(each)) or None) for each in await pipeline.execute())
+		return results
+
+	# ----------------
+	# Days
+	# ----------------
+
+	async def get_date_metadata(self, any_date):
+		""" Returns a date dictionary from Redis (see temporal.get_date_metadata) """
+		return await self.read_hash(keys.day_key(_to_date(any_date), self.key_scheme))
+
+	async def get_many_date_metadata(self, dates):
+		""" Returns a list of date dictionaries, in the same order as 'dates', using a single pipeline. """
+		return await self.read_hashes([ keys.day_key(_to_date(each), self.key_scheme) for each in dates ])
+
+	# ----------------
+	# Years and Weeks
+	# ----------------
+
+	async def get_calendar_year(self, year):
+		return await self.read_hash(keys.year_key(int(year), self.key_scheme))
+
+	async def get_week_by_weeknum(self, year, week_number):
+		""" Returns a class Week, or None when the week is not in Redis. """
+		return _week_dict_to_week(await self.read_hash(keys.week_key(int(year), int(week_number), self.key_scheme)))
+
+	async def get_week_by_anydate(self, any_date):
+		""" Given a date, returns a class Week. """
+		date_dict = await self.get_date_metadata(any_date)
+		if not date_dict:
+			raise KeyError(f"Unable to find calendar date {any_date} in Temporal Redis.")
+		result_week = await self.get_week_by_weeknum(date_dict['week_year'], date_dict['week_number'])
+		if not result_week:
+			raise KeyError(f"Unable to find Week in Temporal Redis for calendar date {any_date}.")
+		return result_week
+
+	async def get_weeks_as_dict(self, year, from_week_num, to_week_num):
+		""" Given a range of Week numbers, return a List of dictionaries (see temporal.get_weeks_as_dict) """
+		year = int(year)
+		from_week_num = int(from_week_num)
+		to_week_num = int(to_week_num)
+		if year not in range(MIN_YEAR, MAX_YEAR):
+			raise ValueError(f"Invalid value '{year}' for argument 'year'")
+		if from_week_num not in range(1, 54):  # 53 possible week numbers.
+			raise ValueError(f"Invalid value '{from_week_num}' for argument 'from_week_num'")
+		if to_week_num not in range(1, 54):
+			raise ValueError(f"Invalid value '{to_week_num}' for argument 'to_week_num'")
+
+		week_keys = [ keys.week_key(year, week_num, self.key_scheme) for week_num in range(from_week_num, to_week_num + 1) ]
+		return [ week_dict for week_dict in await self.read_hashes(week_keys) if week_dict ]
+
+	async def week_generator(self, from_date, to_date):
+		"""
+		Async generator of all the Weeks in a date range.  Each year's weeks are fetched with one pipeline.
+		"""
+		from_date = any_to_date(from_date)
+		to_date = any_to_date(to_date)
+		if from_date > to_date:
+			raise ValueError("Argument 'from_date' cannot be greater than argument 'to_date'")
+
+		from_week, to_week = await asyncio.gather(self.get_week_by_anydate(from_date), self.get_week_by_anydate(to_date))
+		for year in range(from_week.week_year, to_week.week_year + 1):
+			start_index = from_week.week_number if year == from_week.week_year else 1
+			if year == to_week.week_year:
+				end_index = to_week.week_number
+			else:
+				year_dict = await self.get_calendar_year(year)
+				if not year_dict:
+					raise KeyError(f"Unable to find year {year} in Temporal Redis.")
+				end_index = year_dict['max_week_number']
+
+			week_keys = [ keys.week_key(year, week_num, self.key_scheme) for week_num in range(start_index, end_index + 1) ]
+			for week_dict in await self.read_hashes(week_keys):
+				if not week_dict:
+					raise KeyError(f"Unable to find a Week for year {year} in Temporal Redis.")
+				yield _week_dict_to_week(week_dict)
+
+
+def _to_date(any_date):
+	if isinstance(any_date, str):
+		return any_to_date(any_date)
+	if not isinstance(any_date, dtdate):
+		raise TypeError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
+	return any_date
+
+
+def _week_dict_to_week(week_dict):
+	if not week_dict:
+		return None
+	return Week(week_dict['year'],
+	            week_dict['week_number'],
+	            week_dict['week_dates'],
+	            week_dict['week_start'],
+	            week_dict['week_end'])
@@ -0,0 +1,208 @@
+""" temporal/benchmark.py
+
+Throughput benchmarks for Temporal's hot paths.
+
+Redis is replaced by a local storage backend (see temporal/storage.py), so results measure Temporal itself, not the network.
+The 'backend' argument chooses between 'memory' (default), 'sqlite', and 'fakeredis' (requires the 'fakeredis' package),
+so backends can also be compared against each other on the same data.
+
+To run:
+	bench execute temporal.benchmark.run
+	bench execute temporal.benchmark.run --kwargs "{'output_path': 'bench.json', 'baseline_path': 'bench_previous.json'}"
+	bench execute temporal.benchmark.run --kwargs "{'backend': 'sqlite'}"
+"""
+
+# Standard Library
+from contextlib import contextmanager
+from datetime import date, timedelta
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+
+# Temporal
+import temporal
+from temporal import settings, storage
+from temporal.result import ResultBase, MessageAudience, MessageLevel
+
+# A benchmark is flagged as a regression when its throughput drops by more than this fraction versus the baseline.
+REGRESSION_THRESHOLD = 0.10
+
+
+# Blank 'Temporal Manager' settings, so that benchmarks use the Builder's default years, and do not read the database.
+BENCHMARK_SETTINGS = settings.TemporalSettings(debug_mode=False, start_year=None, end_year=None)
+
+
+def make_backend(backend_name, directory):
+	"""
+	Create a local StorageBackend for benchmarking:  'memory', 'sqlite' (a file in 'directory'), or 'fakeredis'.
+	"""
+	if backend_name == 'memory':
+		return storage.MemoryBackend()
+	if backend_name == 'sqlite':
+		return storage.SQLiteBackend(os.path.join(directory, 'temporal.sqlite3'))
+	if backend_name == 'fakeredis':
+		import fakeredis  # pylint: disable=import-outside-toplevel
+		return storage.RedisBackend(client=fakeredis.FakeStrictRedis(), key_prefix='benchmark')
+	raise ValueError(f"Unknown benchmark backend '{backend_name}'")
+
+
+@contextmanager
+def local_environment(backend_name='memory'):
+	"""
+	Context manager that points Temporal at a local storage backend, and blank settings, instead of the site's Redis and database.
+	Temporary files are removed on exit.
+	"""
+	with tempfile.TemporaryDirectory(prefix='temporal_benchmark_') as directory:
+		backend = make_backend(backend_name, directory)
+		storage.set_backend(backend)
+		try:
+			with settings.use_settings(BENCHMARK_SETTINGS):
+				yield backend
+		finally:
+			storage.set_backend(None)
+
+
+def measure(function, repeat=5, operations=1):
+	"""
+	Call 'function' several times, and return timing statistics.
+	'operations' is the number of logical operations performed by a single call (used for throughput).
+	"""
+	durations = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function()
+		durations.append(time.perf_counter() - start)
+	best = min(durations)
+	return {
+		"operations": operations,
+		"repeat": repeat,
+		"best_seconds": best,
+		"median_seconds": statistics.median(durations),
+		"ops_per_second": (operations / best) if best else None
+	}
+
+# ----------------
+# Benchmarks
+# ----------------
+
+def _sample_dates(quantity, from_year, to_year, seed=42):
+	randomizer = random.Random(seed)
+	first = date(from_year, 1, 1).toordinal()
+	last = date(to_year, 12, 31).toordinal()
+	return [ date.fromordinal(randomizer.randint(first, last)) for _ in range(quantity) ]
+
+
+def _sample_result(quantity):
+	result = ResultBase()
+	result._available_message_tags = { 'line-error' }  # pylint: disable=protected-access
+	for index in range(quantity):
+		result.add_message(MessageAudience.INTERNAL, MessageLevel.WARNING, f"Line {index} adjusted.", tags='line-error')
+	result.add_data('lines', [ { 'line': index, 'ship_date': date(2023, 1, 1) + timedelta(days=index % 365), 'qty': index }
+	                           for index in range(quantity) ])
+	return result
+
+
+def _sample_calendar_file(directory):
+	from temporal.calendar_file import CalendarFile, write_calendar_file  # pylint: disable=import-outside-toplevel
+	return CalendarFile(write_calendar_file(os.path.join(directory, 'temporal_calendar.bin')))
+
+
+def get_benchmarks(from_year, to_year, lookups, directory):
+	"""
+	Returns a dictionary of benchmark name: (callable, number of operations per call).  Files are written in 'directory'.
+	"""
+	sample_dates = _sample_dates(lookups, from_year, to_year)
+	date_strings = [ each.strftime("%Y-%m-%d") for each in sample_dates ]
+	time_strings = [ '8pm', '830pm', '8:30 pm', '20:30', '083015', '7am' ] * (lookups // 6)
+	date_ranges = [ (each, each + timedelta(days=30)) for each in sample_dates[:100] ]
+	range_start = date(from_year, 1, 1)
+	range_end = date(to_year, 12, 31)
+	result = _sample_result(lookups // 10)
+	years_built = to_year - from_year + 1
+	mapped_calendar = _sample_calendar_file(directory)
+
+	return {
+		"builder_build_all": (lambda: temporal.Builder.build_all(epoch_year=from_year, end_year=to_year), years_built),
+		"builder_build_all_parallel": (lambda: temporal.Builder.build_all(epoch_year=from_year, end_year=to_year, parallel=True), years_built),
+		"get_date_metadata": (lambda: [ temporal.get_date_metadata(each) for each in sample_dates ], len(sample_dates)),
+		"calendar_file_read_day": (lambda: [ mapped_calendar.read_day(each) for each in sample_dates ], len(sample_dates)),
+		"get_week_by_anydate": (lambda: [ temporal.get_week_by_anydate(each) for each in sample_dates ], len(sample_dates)),
+		"week_generator": (lambda: list(temporal.week_generator(range_start, range_end - timedelta(days=7))), 52 * years_built),
+		"date_to_week_tuple": (lambda: [ temporal.Internals.date_to_week_tuple(each) for each in sample_dates ], len(sample_dates)),
+		"dates_to_week_arrays": (lambda: temporal.dates_to_week_arrays(sample_dates), len(sample_dates)),
+		"date_range": (lambda: list(temporal.date_range(range_start, range_end)), (range_end - range_start).days + 1),
+		"date_ranges_to_dates": (lambda: temporal.date_ranges_to_dates(date_ranges), len(date_ranges)),
+		"any_to_date": (lambda: [ temporal.any_to_date(each) for each in date_strings ], len(date_strings)),
+		"timestr_to_time": (lambda: [ temporal.timestr_to_time(each) for each in time_strings ], len(time_strings)),
+		"result_as_json": (result.as_json, 1),
+	}
+
+
+def compare_to_baseline(results, baseline):
+	"""
+	Add a 'baseline' section to each benchmark, with the relative change in throughput.
+	"""
+	regressions = []
+	for name, current in results["benchmarks"].items():
+		previous = baseline.get("benchmarks", {}).get(name)
+		if not previous or not previous.get("ops_per_second") or not current.get("ops_per_second"):
+			continue
+		change = (current["ops_per_second"] - previous["ops_per_second"]) / previous["ops_per_second"]
+		current["baseline_ops_per_second"] = previous["ops_per_second"]
+		current["change"] = round(change, 4)
+		if change < -REGRESSION_THRESHOLD:
+			regressions.append(name)
+	results["baseline_version"] = baseline.get("temporal_version")
+	results["regressions"] = regressions
+	return results
+
+
+def run(output_path=None, baseline_path=None, from_year=2020, to_year=2030, lookups=10000, repeat=5, only=None, backend='memory'):
+	"""
+	Run the benchmarks, and return (or write) a JSON document of results.
+
+	Arguments
+		output_path:    Optional file path for the JSON results.
+		baseline_path:  Optional file path of a previous run's JSON results, for comparison.
+		only:           Optional list (or comma-separated string) of benchmark names to run.
+		backend:        Storage backend to benchmark against: 'memory', 'sqlite', or 'fakeredis'
+	"""
+	if isinstance(only, str):
+		only = [ each.strip() for each in only.split(',') ]
+
+	with local_environment(backend), tempfile.TemporaryDirectory(prefix='temporal_benchmark_') as directory:
+		# The calendar must exist before any of the read benchmarks.
+		temporal.Builder.build_all(epoch_year=int(from_year), end_year=int(to_year))
+		benchmarks = get_benchmarks(int(from_year), int(to_year), int(lookups), directory)
+		results = {
+			"temporal_version": temporal.__version__,
+			"python_version": platform.python_version(),
+			"storage_backend": backend,
+			"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+			"parameters": { "from_year": from_year, "to_year": to_year, "lookups": lookups, "repeat": repeat },
+			"benchmarks": {}
+		}
+		for name, (function, operations) in benchmarks.items():
+			if only and name not in only:
+				continue
+			results["benchmarks"][name] = measure(function, repeat=int(repeat), operations=operations)
+			print(f"{name:<24} {results['benchmarks'][name]['ops_per_second']:>14,.1f} ops/sec")
+
+	if baseline_path:
+		with open(baseline_path, encoding="utf-8") as fstream:
+			compare_to_baseline(results, json.load(fstream))
+		for name in results["regressions"]:
+			print(f"REGRESSION: {name} changed by {results['benchmarks'][name]['change']:.1%}")
+
+	if output_path:
+		with open(output_path, 'w', encoding="utf-8") as fstream:
+			json.dump(results, fstream, indent=4)
+	return results
+
+
+if __name__ == '__main__':
+	print(json.dumps(run(), indent=4))
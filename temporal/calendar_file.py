@@ -0,0 +1,189 @@
+""" temporal/calendar_file.py
+
+A precomputed, fixed-layout binary calendar file, covering every day from MIN_DATE to MAX_DATE.
+
+Builder.build_all() writes this file when site config 'temporal_calendar_file' is set:
+	bench --site <sitename> set-config temporal_calendar_file 1                           (default path: <site>/private/temporal_calendar.bin)
+	bench --site <sitename> set-config temporal_calendar_file /path/to/temporal_calendar.bin
+
+Every worker process memory-maps the file read-only, so all processes on a host share one copy in the OS page cache.
+Day, week and year lookups are then a struct read at a computed offset:  no Redis round trip, and no per-process calendar.
+
+File Layout (little-endian):
+	Header		magic, format version, first ordinal, day count, first year, year count
+	Days		one DAY_RECORD per calendar day, in order; the record for a date is at (date.toordinal() - first ordinal)
+	Years		one YEAR_RECORD per week-year, in order; the record for a year is at (year - first year)
+"""
+
+# Standard Library
+from datetime import date as dtdate
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Temporal
+from temporal import codec
+from temporal.core import MIN_DATE, MAX_DATE, first_week_start_ordinal, week_tuples_between
+
+MAGIC = b'TEMPCAL\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHIIHH')  # magic, version, first ordinal, day count, first year, year count
+DAY_RECORD = struct.Struct('<HBB')  # week year, week number, index in week (1 = Sunday)
+YEAR_RECORD = struct.Struct('<IBB')  # ordinal of the first day in week 1, max week number, January 1st's position in its week
+
+# How often (in seconds) a process checks whether the Builder has replaced the file.
+REOPEN_CHECK_SECONDS = 5
+
+_open_files = {}  # path : CalendarFile
+_open_files_lock = threading.Lock()
+
+
+def _build_day_records(from_date, to_date):
+	""" Returns bytes of DAY_RECORDs. """
+	records = bytearray(DAY_RECORD.size * ((to_date - from_date).days + 1))
+	offset = 0
+	for calendar_date, week_year, week_number in week_tuples_between(from_date, to_date):
+		DAY_RECORD.pack_into(records, offset, week_year, week_number, (calendar_date.toordinal() % 7) + 1)
+		offset += DAY_RECORD.size
+	return records
+
+
+def _build_year_records(first_year, last_year):
+	records = bytearray()
+	for year in range(first_year, last_year + 1):
+		first_week_start = first_week_start_ordinal(year)
+		max_week_number = (first_week_start_ordinal(year + 1) - first_week_start) // 7
+		jan_one_weekpos = (dtdate(year, 1, 1).toordinal() % 7) + 1
+		records += YEAR_RECORD.pack(first_week_start, max_week_number, jan_one_weekpos)
+	return records
+
+
+def write_calendar_file(path=None, from_date=MIN_DATE, to_date=MAX_DATE):
+	"""
+	Write the binary calendar file.  The new file atomically replaces any previous one, so readers never see a partial file.
+	Returns the path written.
+	"""
+	path = path or get_calendar_file_path()
+	if not path:
+		raise ValueError("No path for the Temporal calendar file; set site config 'temporal_calendar_file'")
+	first_ordinal = from_date.toordinal()
+	last_ordinal = to_date.toordinal()
+	first_year = from_date.year
+	last_year = to_date.year + 1  # the final days of a year can belong to Week #1 of the next one
+
+	header = HEADER.pack(MAGIC, FORMAT_VERSION, first_ordinal, last_ordinal - first_ordinal + 1, first_year, last_year - first_year + 1)
+	temporary_path = f"{path}.{os.getpid()}.tmp"
+	with open(temporary_path, 'wb') as fstream:
+		fstream.write(header)
+		fstream.write(_build_day_records(from_date, to_date))
+		fstream.write(_build_year_records(first_year, last_year))
+	os.replace(temporary_path, path)
+	return path
+
+
+class CalendarFile():
+	"""
+	A read-only, memory-mapped calendar file.  Methods return the same dictionaries as the readers in temporal.redis
+	"""
+	def __init__(self, path):
+		self.path = path
+		with open(path, 'rb') as fstream:
+			self.inode = os.fstat(fstream.fileno()).st_ino
+			self._map = mmap.mmap(fstream.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, self.first_ordinal, self.day_count, self.first_year, self.year_count = HEADER.unpack_from(self._map, 0)
+		if magic != MAGIC or version != FORMAT_VERSION:
+			self._map.close()
+			raise ValueError(f"File '{path}' is not a Temporal calendar file (version {FORMAT_VERSION}).")
+		self._days_offset = HEADER.size
+		self._years_offset = HEADER.size + DAY_RECORD.size * self.day_count
+		self._last_checked = time.monotonic()
+
+	def close(self):
+		self._map.close()
+
+	def has_date(self, any_date):
+		return 0 <= (any_date.toordinal() - self.first_ordinal) < self.day_count
+
+	def has_year(self, year):
+		return 0 <= (year - self.first_year) < self.year_count
+
+	def read_day_record(self, any_date):
+		""" Returns a tuple (week_year, week_number, index_in_week), or None if the date is outside the file. """
+		position = any_date.toordinal() - self.first_ordinal
+		if not 0 <= position < self.day_count:
+			return None
+		return DAY_RECORD.unpack_from(self._map, self._days_offset + position * DAY_RECORD.size)
+
+	def read_year_record(self, year):
+		""" Returns a tuple (first_week_start_ordinal, max_week_number, jan_one_weekpos), or None if the year is outside the file. """
+		position = year - self.first_year
+		if not 0 <= position < self.year_count:
+			return None
+		return YEAR_RECORD.unpack_from(self._map, self._years_offset + position * YEAR_RECORD.size)
+
+	def read_day(self, any_date):
+		""" Returns a Day dictionary (see Builder.build_days) """
+		position = any_date.toordinal() - self.first_ordinal
+		if not 0 <= position < self.day_count:
+			return None
+		return codec.day_dict(any_date, *DAY_RECORD.unpack_from(self._map, self._days_offset + position * DAY_RECORD.size))
+
+	def read_week(self, year, week_number):
+		""" Returns a Week dictionary (see Builder.build_weeks) """
+		record = self.read_year_record(int(year))
+		if not record or not 1 <= int(week_number) <= record[1]:
+			return None
+		return codec.week_dict(int(year), int(week_number), dtdate.fromordinal(record[0] + (int(week_number) - 1) * 7))
+
+	def read_year(self, year):
+		""" Returns a Year dictionary (see Builder.build_year) """
+		record = self.read_year_record(year)
+		if not record:
+			return None
+		return codec.year_dict(year, record[2], record[1])
+
+	def is_stale(self):
+		""" True when the file on disk was replaced since it was opened.  Checked at most every REOPEN_CHECK_SECONDS. """
+		now = time.monotonic()
+		if now - self._last_checked < REOPEN_CHECK_SECONDS:
+			return False
+		self._last_checked = now
+		try:
+			return os.stat(self.path).st_ino != self.inode
+		except FileNotFoundError:
+			return False  # keep using the mapping we have
+
+
+def get_calendar_file_path():
+	""" Path from site config 'temporal_calendar_file', or None when the calendar file is not enabled. """
+	import frappe  # pylint: disable=import-outside-toplevel
+	try:
+		setting = (frappe.local.conf or {}).get('temporal_calendar_file')
+	except (AttributeError, RuntimeError):  # no site is initialized
+		return None
+	if not setting:
+		return None
+	if isinstance(setting, str) and not setting.isdigit():
+		return setting
+	return os.path.join(frappe.get_site_path('private'), 'temporal_calendar.bin')
+
+
+def get_calendar_file(path=None):
+	"""
+	Returns the memory-mapped CalendarFile for this site, or None when it is not enabled or not yet written.
+	"""
+	path = path or get_calendar_file_path()
+	if not path:
+		return None
+	calendar_file = _open_files.get(path)
+	if calendar_file is not None and not calendar_file.is_stale():
+		return calendar_file
+	with _open_files_lock:
+		if not os.path.exists(path):
+			return calendar_file
+		# NOTE: A replaced mapping is not closed; another thread may still be reading it.  It is released once unreferenced.
+		calendar_file = CalendarFile(path)
+		_open_files[path] = calendar_file
+	return calendar_file
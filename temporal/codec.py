@@ -0,0 +1,141 @@
+""" temporal/codec.py
+
+A compact encoding for the calendar's Day, Week, and Year records.
+
+Each record is stored as a hash with a single field, 'record':  a few bytes packed with struct.  The first two bytes are
+the codec version and the record's kind ('D', 'W', or 'Y').  Decoding formats every value from the packed integers;  no
+string is parsed.
+
+	Day		version, 'D', date ordinal, week year, week number, index in week		10 bytes
+	Week	version, 'W', year, week number, ordinal of the week's first day			9 bytes
+	Year	version, 'Y', year, January 1st's position in its week, max week number		6 bytes
+
+Decoding returns the dictionaries Temporal has always returned, so existing callers are unchanged.  Weeks are fully typed.
+But for compatibility, a Day's 'date' is still a string YYYY-MM-DD, its 'day_of_month', 'month_in_year_int', and 'day_of_year'
+are zero-padded strings, and a Year's 'date_start' and 'date_end' are strings MM/DD/YYYY.  Code that needs a Day's date
+should use record_date() (or temporal.redis.read_days_by_date_between), rather than parse the string.
+
+Hashes written before this encoding (one field per value) are returned unchanged, so a calendar can be re-encoded
+gradually (see Builder.reconcile).
+"""
+
+# Standard Library
+from datetime import date as dtdate, timedelta
+import struct
+
+CODEC_VERSION = 1
+RECORD_FIELD = 'record'
+
+DAY_RECORD = struct.Struct('<BcIHBB')
+WEEK_RECORD = struct.Struct('<BcHBI')
+YEAR_RECORD = struct.Struct('<BcHBB')
+
+# Names are formatted once, exactly as the Builder formats them with strftime().  Indexed by (ordinal % 7) and month.
+WEEKDAY_NAMES = tuple(dtdate.fromordinal(7 + index).strftime("%A") for index in range(7))
+WEEKDAY_SHORT_NAMES = tuple(dtdate.fromordinal(7 + index).strftime("%a") for index in range(7))
+MONTH_NAMES = (None,) + tuple(dtdate(2000, month, 1).strftime("%B") for month in range(1, 13))
+
+
+# ----------------
+# Dictionaries from integers
+# ----------------
+
+def day_dict(any_date, week_year, week_number, index_in_week):
+	""" A Day dictionary, as stored (see Builder.day_dicts_for_year; the 'date' is a string YYYY-MM-DD) """
+	ordinal = any_date.toordinal()
+	year, month, day = any_date.year, any_date.month, any_date.day
+	date_as_string = f"{year:04d}-{month:02d}-{day:02d}"
+	return {
+		'date': date_as_string,
+		'date_as_string': date_as_string,
+		'weekday_name': WEEKDAY_NAMES[ordinal % 7],
+		'weekday_name_short': WEEKDAY_SHORT_NAMES[ordinal % 7],
+		'day_of_month': f"{day:02d}",
+		'month_in_year_int': f"{month:02d}",
+		'month_in_year_str': MONTH_NAMES[month],
+		'year': year,
+		'day_of_year': f"{ordinal - dtdate(year, 1, 1).toordinal() + 1:03d}",
+		'week_year': week_year,
+		'week_number': week_number,
+		'index_in_week': index_in_week
+	}
+
+
+def week_dict(year, week_number, week_start):
+	""" A Week dictionary (see Builder.week_dicts_for_year) """
+	week_dates = tuple(week_start + timedelta(days=offset) for offset in range(7))
+	return {
+		'year': year,
+		'week_number': week_number,
+		'week_start': week_start,
+		'week_end': week_dates[-1],
+		'week_dates': week_dates
+	}
+
+
+def year_dict(year, jan_one_weekpos, max_week_number):
+	""" A Year dictionary (see Builder.year_dict_for_year) """
+	date_start = dtdate(year, 1, 1)
+	date_end = dtdate(year, 12, 31)
+	return {
+		'year': year,
+		'date_start': f"{date_start.month:02d}/{date_start.day:02d}/{year:04d}",
+		'date_end': f"{date_end.month:02d}/{date_end.day:02d}/{year:04d}",
+		'days_in_year': (date_end - date_start).days + 1,
+		'jan_one_dayname': WEEKDAY_SHORT_NAMES[date_start.toordinal() % 7].upper(),
+		'jan_one_weekpos': jan_one_weekpos,
+		'max_week_number': max_week_number
+	}
+
+
+# ----------------
+# Encoding
+# ----------------
+
+def encode_day(day):
+	""" Returns the stored hash for a Day dictionary. """
+	calendar_date = day['date'] if isinstance(day['date'], dtdate) else dtdate.fromisoformat(day['date'])
+	record = DAY_RECORD.pack(CODEC_VERSION, b'D', calendar_date.toordinal(), day['week_year'], day['week_number'], day['index_in_week'])
+	return { RECORD_FIELD: record }
+
+
+def encode_week(week):
+	""" Returns the stored hash for a Week dictionary. """
+	record = WEEK_RECORD.pack(CODEC_VERSION, b'W', week['year'], week['week_number'], week['week_start'].toordinal())
+	return { RECORD_FIELD: record }
+
+
+def encode_year(year):
+	""" Returns the stored hash for a Year dictionary. """
+	record = YEAR_RECORD.pack(CODEC_VERSION, b'Y', year['year'], year['jan_one_weekpos'], year['max_week_number'])
+	return { RECORD_FIELD: record }
+
+
+def record_date(stored_hash):
+	""" Returns the date of a stored Day, unpacked from its record.  None for a hash that is not an encoded Day. """
+	record = stored_hash.get(RECORD_FIELD) if stored_hash else None
+	if record is None or record[1:2] != b'D':
+		return None
+	return dtdate.fromordinal(DAY_RECORD.unpack(record)[2])
+
+
+def decode(stored_hash):
+	"""
+	Returns the Day, Week, or Year dictionary for a stored hash.  Hashes that are not encoded (including empty ones) are returned unchanged.
+	"""
+	record = stored_hash.get(RECORD_FIELD) if stored_hash else None
+	if record is None:
+		return stored_hash
+	version, kind = record[0], record[1:2]
+	if version != CODEC_VERSION:
+		raise ValueError(f"Temporal record has codec version {version}; this version of Temporal reads version {CODEC_VERSION}.")
+	if kind == b'D':
+		_, _, ordinal, week_year, week_number, index_in_week = DAY_RECORD.unpack(record)
+		return day_dict(dtdate.fromordinal(ordinal), week_year, week_number, index_in_week)
+	if kind == b'W':
+		_, _, year, week_number, week_start = WEEK_RECORD.unpack(record)
+		return week_dict(year, week_number, dtdate.fromordinal(week_start))
+	if kind == b'Y':
+		_, _, year, jan_one_weekpos, max_week_number = YEAR_RECORD.unpack(record)
+		return year_dict(year, jan_one_weekpos, max_week_number)
+	raise ValueError(f"Unknown Temporal record kind {kind!r}")
@@ -0,0 +1,36 @@
+""" temporal/commands.py
+
+Bench commands of the Temporal App.
+"""
+
+# Third Party
+import click
+
+# Frappe
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command('temporal-export-calendar')
+@click.argument('path')
+@click.option('--format', 'export_format', type=click.Choice(['parquet', 'arrow', 'csv']), default=None,
+              help="Default: parquet when 'pyarrow' is installed, otherwise csv")
+@click.option('--from-date', default=None, help="YYYY-MM-DD.  Default: January 1st of the Temporal Manager's start year")
+@click.option('--to-date', default=None, help="YYYY-MM-DD.  Default: December 31st of the Temporal Manager's end year")
+@click.option('--batch-size', default=10000, type=int, help="Rows per batch")
+@pass_context
+def export_calendar(context, path, export_format=None, from_date=None, to_date=None, batch_size=10000):
+	""" Export the calendar as a date dimension (one row per day) to PATH.  See temporal/export.py """
+	from temporal.export import export_calendar as _export_calendar  # pylint: disable=import-outside-toplevel
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		row_count = _export_calendar(path, export_format=export_format, from_date=from_date, to_date=to_date, batch_size=batch_size)
+	finally:
+		frappe.destroy()
+	click.echo(f"Exported {row_count} calendar days to {path}")
+
+
+commands = [
+	export_calendar
+]
@@ -1,11 +1,17 @@
-""" temporal/core.py """
+""" temporal/core.py
+
+Calendar arithmetic and conversions that need nothing beyond the Python Standard Library.
+Importing this module does not import Redis, dateutil, or Frappe; it is safe for CLI tools and workers that only need date math.
+"""
 
 # ========
 # No internal dependencies allowed here.
 # ========
 
 import sys
-from datetime import datetime
+import datetime
+from datetime import timedelta
+from datetime import date as dtdate, datetime as datetime_type
 
 if sys.version_info.minor < 9:
 	import pytz  # https://pypi.org/project/pytz/
@@ -13,17 +19,88 @@ if sys.version_info.minor < 9:
 else:
 	from zoneinfo import ZoneInfo
 
-import frappe  # pylint: disable=wrong-import-position
-
 if sys.version_info.major != 3:
 	raise RuntimeError("Temporal is only available for Python 3.")
 
+# Epoch is the range of 'business active' dates.
+EPOCH_START_YEAR = 2020
+EPOCH_END_YEAR = 2050
+EPOCH_START_DATE = dtdate(EPOCH_START_YEAR, 1, 1)
+EPOCH_END_DATE = dtdate(EPOCH_END_YEAR, 12, 31)
+
+# These should be considered true Min/Max for all other calculations.
+MIN_YEAR = 2000
+MAX_YEAR = 2201
+MIN_DATE = dtdate(MIN_YEAR, 1, 1)
+MAX_DATE = dtdate(MAX_YEAR, 12, 31)
+
+# Module Typing: https://docs.python.org/3.8/library/typing.html#module-typing
+
+WEEKDAYS = (
+	{ 'name_short': 'SUN', 'name_long': 'Sunday' },
+	{ 'name_short': 'MON', 'name_long': 'Monday' },
+	{ 'name_short': 'TUE', 'name_long': 'Tuesday' },
+	{ 'name_short': 'WED', 'name_long': 'Wednesday' },
+	{ 'name_short': 'THU', 'name_long': 'Thursday' },
+	{ 'name_short': 'FRI', 'name_long': 'Friday' },
+	{ 'name_short': 'SAT', 'name_long': 'Saturday' },
+)
+
+WEEKDAYS_SUN0 = (
+	{ 'pos': 0, 'name_short': 'SUN', 'name_long': 'Sunday' },
+	{ 'pos': 1, 'name_short': 'MON', 'name_long': 'Monday' },
+	{ 'pos': 2, 'name_short': 'TUE', 'name_long': 'Tuesday' },
+	{ 'pos': 3, 'name_short': 'WED', 'name_long': 'Wednesday' },
+	{ 'pos': 4, 'name_short': 'THU', 'name_long': 'Thursday' },
+	{ 'pos': 5, 'name_short': 'FRI', 'name_long': 'Friday' },
+	{ 'pos': 6, 'name_short': 'SAT', 'name_long': 'Saturday' })
+
+WEEKDAYS_MON0 = (
+	{ 'pos': 0, 'name_short': 'MON', 'name_long': 'Monday' },
+	{ 'pos': 1, 'name_short': 'TUE', 'name_long': 'Tuesday' },
+	{ 'pos': 2, 'name_short': 'WED', 'name_long': 'Wednesday' },
+	{ 'pos': 3, 'name_short': 'THU', 'name_long': 'Thursday' },
+	{ 'pos': 4, 'name_short': 'FRI', 'name_long': 'Friday' },
+	{ 'pos': 5, 'name_short': 'SAT', 'name_long': 'Saturday' },
+	{ 'pos': 6, 'name_short': 'SUN', 'name_long': 'Sunday' })
+
+
+class _ArgumentError(ValueError):
+	"""
+	Base of Temporal's argument errors.  When Frappe is loaded at the time one is raised, the instance is also a frappe.ValidationError,
+	so 'except frappe.ValidationError' catches it, whichever of Temporal and Frappe was imported first.  Frappe is never imported here.
+	"""
+	http_status_code = 500
+	_frappe_classes = {}  # (Temporal class, frappe.ValidationError): subclass of both
+
+	def __new__(cls, *args, **kwargs):
+		validation_error = getattr(sys.modules.get('frappe'), 'ValidationError', None)
+		if validation_error and not issubclass(cls, validation_error):
+			key = (cls, validation_error)
+			if key not in _ArgumentError._frappe_classes:
+				_ArgumentError._frappe_classes[key] = type(cls.__name__, (cls, validation_error),
+				                                           { '__module__': cls.__module__, '_temporal_class': cls })
+			cls = _ArgumentError._frappe_classes[key]
+		return super().__new__(cls, *args, **kwargs)
+
+	def __reduce__(self):
+		# Pickle as the Temporal class;  the Frappe subclass is chosen again when unpickled.
+		return (getattr(type(self), '_temporal_class', type(self)), self.args)
+
+
+class ArgumentMissing(_ArgumentError):
+	pass
+
+
+class ArgumentType(_ArgumentError):
+	pass
+
 
 def is_datetime_naive(any_datetime):
 	"""
 	Returns True if the datetime is missing a Time Zone component.
 	"""
-	if not isinstance(any_datetime, datetime):
+	if not isinstance(any_datetime, datetime_type):
 		raise TypeError("Argument 'any_datetime' must be a Python datetime object.")
 
 	if any_datetime.tzinfo is None:
@@ -35,6 +112,7 @@ def get_system_timezone():
 	"""
 	Returns the Time Zone of the Site.
 	"""
+	import frappe  # pylint: disable=import-outside-toplevel
 	system_time_zone = frappe.db.get_system_setting('time_zone')
 	if not system_time_zone:
 		raise RuntimeError("Please configure a Time Zone under 'System Settings'.")
@@ -49,10 +127,10 @@ def get_system_timezone():
 def get_system_datetime_now():
 	if sys.version_info.minor < 9:
 		# Python 3.8 or less:
-		utc_datetime = datetime.now(tzutc())  # Get the current UTC datetime.
+		utc_datetime = datetime_type.now(tzutc())  # Get the current UTC datetime.
 	else:
 		# Python 3.9 or greater
-		utc_datetime = datetime.now(ZoneInfo("UTC"))  # Get the current UTC datetime.
+		utc_datetime = datetime_type.now(ZoneInfo("UTC"))  # Get the current UTC datetime.
 	return utc_datetime.astimezone( get_system_timezone())  # Convert to the site's Time Zone:
 
 
@@ -60,7 +138,7 @@ def get_system_date():
 	return get_system_datetime_now().date()
 
 
-def datetime_to_sql_datetime(any_datetime: datetime):
+def datetime_to_sql_datetime(any_datetime: datetime_type):
 	"""
 	Convert a Python DateTime into a DateTime that can be written to MariaDB/MySQL.
 	"""
@@ -97,3 +175,555 @@ def safeset(any_dict, key, value, as_value=False):
 		any_dict.extend(key, value)
 	else:
 		any_dict.__dict__[key] = value
+
+
+# ----------------
+# Dates and Ranges
+# ----------------
+
+def localize_datetime(any_datetime, any_timezone):
+	"""
+	Given a naive datetime and time zone, return the localized datetime.
+
+	Necessary because Python is -extremely- confusing when it comes to datetime + timezone.
+	"""
+	if not isinstance(any_datetime, datetime_type):
+		raise TypeError("Argument 'any_datetime' must be a Python datetime object.")
+
+	if any_datetime.tzinfo:
+		raise ValueError(f"Datetime value {any_datetime} is already localized and time zone aware (tzinfo={any_datetime.tzinfo})")
+
+	# What kind of time zone object was passed?
+	type_name = type(any_timezone).__name__
+
+	# WARNING: DO NOT USE:  naive_datetime.astimezone(timezone).  This implicitly shifts you the UTC offset.
+	if type_name == 'ZoneInfo':
+		# Only available in Python 3.9+
+		return any_datetime.replace(tzinfo=any_timezone)
+	# Python 3.8 or earlier
+	return any_timezone.localize(any_datetime)
+
+
+def date_is_between(any_date, start_date, end_date, use_epochs=True):
+	"""
+	Returns a boolean if a date is between 2 other dates.
+	The interesting part is the epoch date substitution.
+	"""
+	if (not use_epochs) and (not start_date):
+		raise ValueError("Function 'date_is_between' cannot resolve Start Date = None, without 'use_epochs' argument.")
+	if (not use_epochs) and (not end_date):
+		raise ValueError("Function 'date_is_between' cannot resolve End Date = None, without 'use_epochs' argument.")
+
+	if not start_date:
+		start_date = EPOCH_START_DATE
+	if not end_date:
+		end_date = EPOCH_END_DATE
+
+	any_date = any_to_date(any_date)
+	start_date = any_to_date(start_date)
+	end_date = any_to_date(end_date)
+
+	return bool(start_date <= any_date <= end_date)
+
+
+def date_range(start_date, end_date):
+	"""
+	Generator for an inclusive range of dates.
+	It's very weird this isn't part of Python Standard Library or datetime  :/
+	"""
+	validate_datatype("start_date", start_date, (str, dtdate), True)
+	validate_datatype("end_date", end_date, (str, dtdate), True)
+
+	# As always, convert ERPNext strings into dates...
+	start_date = any_to_date(start_date)
+	end_date = any_to_date(end_date)
+	# Important to add +1, otherwise the range is -not- inclusive.
+	for number_of_days in range(int((end_date - start_date).days) + 1):
+		yield start_date + timedelta(number_of_days)
+
+
+def first_week_start_ordinal(year):
+	"""
+	Ordinal of the Sunday that begins Temporal Week #1 of 'year' (the week containing January 1st).
+	"""
+	jan1_ordinal = dtdate(year, 1, 1).toordinal()
+	return jan1_ordinal - (jan1_ordinal % 7)  # ordinal 7 (0001-01-07) is a Sunday, so 'ordinal % 7' is days since Sunday
+
+
+def week_tuples_between(start_date, end_date):
+	"""
+	Generator of (calendar_date, week_year, week_number) for an inclusive range of dates.
+	Integer arithmetic, equivalent to Internals.date_to_week_tuple(), without reading Redis.
+	"""
+	start_date = any_to_date(start_date)
+	end_date = any_to_date(end_date)
+	week_year = None
+	year_first_week = next_year_first_week = 0
+	for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1):
+		week_start = ordinal - (ordinal % 7)
+		if week_year is None or week_start >= next_year_first_week:
+			# A week belongs to the year of its final day (Saturday).
+			week_year = dtdate.fromordinal(week_start + 6).year
+			year_first_week = first_week_start_ordinal(week_year)
+			next_year_first_week = first_week_start_ordinal(week_year + 1)
+		yield (dtdate.fromordinal(ordinal), week_year, (week_start - year_first_week) // 7 + 1)
+
+
+def weeks_between(start_date, end_date):
+	"""
+	Generator of (week_year, week_number, week_start_date) for every week that includes a day in an inclusive range of dates.
+	Integer arithmetic, one step per week; the same weeks the Builder writes.
+	"""
+	start_date = any_to_date(start_date)
+	end_date = any_to_date(end_date)
+	week_year = None
+	year_first_week = next_year_first_week = 0
+	start_ordinal = start_date.toordinal()
+	for week_start in range(start_ordinal - (start_ordinal % 7), end_date.toordinal() + 1, 7):
+		if week_year is None or week_start >= next_year_first_week:
+			week_year = dtdate.fromordinal(week_start + 6).year
+			year_first_week = first_week_start_ordinal(week_year)
+			next_year_first_week = first_week_start_ordinal(week_year + 1)
+		yield (week_year, (week_start - year_first_week) // 7 + 1, dtdate.fromordinal(week_start))
+
+
+_UNIX_EPOCH_ORDINAL = dtdate(1970, 1, 1).toordinal()  # NumPy's datetime64 counts days from here
+
+
+def dates_to_week_arrays(dates, use_numpy=None):
+	"""
+	Batch version of Internals.date_to_week_tuple():  returns parallel sequences (week_years, week_numbers).
+
+	'dates' may be a sequence of datetime.date, of date ordinals (integers), or a NumPy array of datetime64 or integer ordinals.
+	When NumPy is installed (or 'use_numpy' is True), the calculation is vectorized and NumPy arrays are returned.
+	Otherwise (or when 'use_numpy' is False), it returns two lists.
+	"""
+	numpy = None
+	if use_numpy is not False:
+		try:
+			import numpy  # pylint: disable=import-outside-toplevel,redefined-outer-name
+		except ImportError:
+			if use_numpy:
+				raise
+	if numpy is None:
+		return _dates_to_week_lists(dates)
+
+	if isinstance(dates, numpy.ndarray) and numpy.issubdtype(dates.dtype, numpy.datetime64):
+		ordinals = dates.astype('datetime64[D]').astype(numpy.int64) + _UNIX_EPOCH_ORDINAL
+	elif isinstance(dates, numpy.ndarray):
+		ordinals = dates.astype(numpy.int64)
+	else:
+		ordinals = numpy.fromiter((each.toordinal() if isinstance(each, dtdate) else int(each) for each in dates), dtype=numpy.int64, count=len(dates))
+
+	week_starts = ordinals - (ordinals % 7)
+	# A week belongs to the year of its final day (Saturday).
+	week_years = (week_starts + 6 - _UNIX_EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[Y]').astype(numpy.int64) + 1970
+	jan1_ordinals = (week_years - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(numpy.int64) + _UNIX_EPOCH_ORDINAL
+	first_week_starts = jan1_ordinals - (jan1_ordinals % 7)
+	return week_years, (week_starts - first_week_starts) // 7 + 1
+
+
+def _dates_to_week_lists(dates):
+	""" dates_to_week_arrays() without NumPy.  Integer arithmetic, remembering the first week of each year seen. """
+	week_years = []
+	week_numbers = []
+	first_week_starts = {}
+	for each in dates:
+		ordinal = each.toordinal() if isinstance(each, dtdate) else int(each)
+		week_start = ordinal - (ordinal % 7)
+		week_year = dtdate.fromordinal(week_start + 6).year
+		first_week_start = first_week_starts.get(week_year)
+		if first_week_start is None:
+			first_week_start = first_week_starts[week_year] = first_week_start_ordinal(week_year)
+		week_years.append(week_year)
+		week_numbers.append((week_start - first_week_start) // 7 + 1)
+	return week_years, week_numbers
+
+
+def date_range_from_strdates(start_date_str, end_date_str):
+	""" Generator for an inclusive range of date-strings. """
+	if not isinstance(start_date_str, str):
+		raise TypeError("Argument 'start_date_str' must be a Python string.")
+	if not isinstance(end_date_str, str):
+		raise TypeError("Argument 'end_date_str' must be a Python string.")
+	start_date = datestr_to_date(start_date_str)
+	end_date = datestr_to_date(end_date_str)
+	return date_range(start_date, end_date)
+
+
+def date_ranges_to_dates(date_ranges: list) -> set:
+	"""
+	Generator for multiple, inclusive ranges of dates.
+	It's very weird this isn't part of Python Standard Library or datetime  :/
+
+	args:
+		date_ranges: List of Tuples, for example: [ (2023-10-01, 2023-10-19) , (2023-11-15, 2023-11-30), (2023-12-09, 2023-12-13)]
+	"""
+
+	validate_datatype("date_ranges", date_ranges, (set, list))
+	if not date_ranges:
+		return set()
+
+	result = set()
+	for each_tuple in date_ranges:
+		start_date = any_to_date(each_tuple[0]) or any_to_date("1900-01-01")
+		end_date = any_to_date(each_tuple[1]) or any_to_date("2199-12-31")
+
+		# Interestingly, Python will not allow the following 2 statements to be combined; it's a syntax error
+		temp_results = list(date_range(start_date, end_date))
+		if temp_results:
+			result.update(temp_results)
+
+	return sorted(result)
+
+
+def date_generator_type_1(start_date, increments_of, earliest_result_date):
+	"""
+	Given a start date, increment N number of days.
+	First result can be no earlier than 'earliest_result_date'
+	"""
+	iterations = 0
+	next_date = start_date
+	while True:
+		iterations += 1
+		if (iterations == 1) and (start_date == earliest_result_date):  # On First Iteration, if dates match, yield Start Date.
+			yield start_date
+		else:
+			next_date = next_date + timedelta(days=increments_of)
+			if next_date >= earliest_result_date:
+				yield next_date
+
+
+def calc_future_dates(epoch_date, multiple_of_days, earliest_result_date, qty_of_result_dates):
+	"""
+		Purpose: Predict future dates, based on an epoch date and multiple.
+		Returns: A List of Dates
+
+		Arguments
+		epoch_date:           The date from which the calculation begins.
+		multiple_of_days:     In every iteration, how many days do we move forward?
+		no_earlier_than:      What is earliest result date we want to see?
+		qty_of_result_dates:  How many qualifying dates should this function return?
+	"""
+	validate_datatype('epoch_date', epoch_date, dtdate, True)
+	validate_datatype('earliest_result_date', earliest_result_date, dtdate, True)
+
+	# Convert to dates, always.
+	epoch_date = any_to_date(epoch_date)
+	earliest_result_date = any_to_date(earliest_result_date)
+	# Validate the remaining data types.
+	validate_datatype("multiple_of_days", multiple_of_days, int)
+	validate_datatype("qty_of_result_dates", qty_of_result_dates, int)
+
+	if earliest_result_date < epoch_date:
+		raise ValueError(f"Earliest_result_date '{earliest_result_date}' cannot precede the epoch date ({epoch_date})")
+
+	this_generator = date_generator_type_1(epoch_date, multiple_of_days, earliest_result_date)
+	ret = []
+	for _ in range(qty_of_result_dates):  # underscore because we don't actually need the index.
+		ret.append(next(this_generator))
+	return ret
+
+
+def get_earliest_date(list_of_dates):
+	if not all(isinstance(x, datetime.date) for x in list_of_dates):
+		raise ValueError("All values in argument must be datetime dates.")
+	return min(list_of_dates)
+
+
+def get_latest_date(list_of_dates):
+	if not all(isinstance(x, datetime.date) for x in list_of_dates):
+		raise ValueError("All values in argument must be datetime dates.")
+	return max(list_of_dates)
+
+
+# ----------------
+# DATETIME and STRING CONVERSION
+# ----------------
+
+def any_to_date(date_as_unknown):
+	"""
+	Given an argument of unknown Type, try to return a Date.
+	"""
+	try:
+		if not date_as_unknown:
+			return None
+		if isinstance(date_as_unknown, str):
+			return datetime.datetime.strptime(date_as_unknown,"%Y-%m-%d").date()
+		if isinstance(date_as_unknown, datetime.date):
+			return date_as_unknown
+
+	except ValueError as ex:  # strptime() raises ValueError for malformed strings
+		raise ValueError(f"'{date_as_unknown}' is not a valid date string.") from ex
+
+	raise TypeError(f"Unhandled type ({type(date_as_unknown)}) for argument to function any_to_date()")
+
+
+def any_to_time(generic_time):
+	"""
+	Given an argument of a generic, unknown Type, try to return a Time.
+	"""
+	if not generic_time:
+		return None
+	if isinstance(generic_time, str):
+		return timestr_to_time(generic_time)  # raises a ValueError for invalid strings
+	if isinstance(generic_time, datetime.time):
+		return generic_time
+
+	raise TypeError(f"Function argument 'generic_time' in any_to_time() has an unhandled data type: '{type(generic_time)}'")
+
+
+def any_to_datetime(datetime_as_unknown):
+	"""
+	Given an argument of unknown Type, try to return a DateTime.
+	"""
+	datetime_string_format = "%Y-%m-%d %H:%M:%S"
+	try:
+		if not datetime_as_unknown:
+			return None
+		if isinstance(datetime_as_unknown, str):
+			return datetime.datetime.strptime(datetime_as_unknown, datetime_string_format)
+		if isinstance(datetime_as_unknown, datetime.datetime):
+			return datetime_as_unknown
+
+	except ValueError as ex:  # strptime() raises ValueError for malformed strings
+		raise ValueError(f"'{datetime_as_unknown}' is not a valid datetime string.") from ex
+
+	raise TypeError(f"Unhandled type ({type(datetime_as_unknown)}) for argument to function any_to_datetime()")
+
+
+def any_to_iso_date_string(any_date):
+	"""
+	Given a date, create a String that MariaDB understands for queries (YYYY-MM-DD)
+	"""
+	if isinstance(any_date, datetime.date):
+		return any_date.strftime("%Y-%m-%d")
+	if isinstance(any_date, str):
+		return any_date
+	raise TypeError(f"Argument 'any_date' can be a String or datetime.date only (found '{type(any_date)}')")
+
+
+def datestr_to_date(date_as_string):
+	"""
+	Converts string date (YYYY-MM-DD) to datetime.date object.
+	"""
+
+	# ERPNext is very inconsistent with Date typing.  We should handle several possibilities:
+	if not date_as_string:
+		return None
+	if isinstance(date_as_string, datetime.date):
+		return date_as_string
+	if not isinstance(date_as_string, str):
+		raise TypeError(f"Argument 'date_as_string' should be of type String, not '{type(date_as_string)}'")
+	if not is_date_string_valid(date_as_string):
+		return None
+
+	try:
+		# Explicit is Better than Implicit.  The format should be YYYY-MM-DD.
+
+		# The function below is completely asinine.
+		# If you pass a day of week string (e.g. "Friday"), it returns the next Friday in the calendar.  Instead of an error.
+		# return dateutil.parser.parse(date_as_string, yearfirst=True, dayfirst=False).date()
+
+		# So I'm now using this instead.
+		return datetime.datetime.strptime(date_as_string,"%Y-%m-%d").date()
+
+	except ValueError as ex:  # strptime() raises ValueError for malformed strings
+		raise ValueError(f"Value '{date_as_string}' is not a valid date string.") from ex
+
+
+def date_to_iso_string(any_date):
+	"""
+	Given a date, create an ISO String.  For example, 2021-12-26.
+	"""
+	if not isinstance(any_date, datetime.date):
+		raise ValueError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
+	return any_date.strftime("%Y-%m-%d")
+
+
+def datetime_to_iso_string(any_datetime):
+	"""
+	Given a datetime, create a ISO String
+	"""
+	if not isinstance(any_datetime, datetime_type):
+		raise ValueError(f"Argument 'any_date' should have type 'datetime', not '{type(any_datetime)}'")
+
+	return any_datetime.isoformat(sep=' ')  # Note: Frappe not using 'T' as a separator, but a space ''
+
+
+def is_date_string_valid(date_string):
+	# dateutil parser does not agree with dates like "0001-01-01" or "0000-00-00"
+	if (not date_string) or (date_string or "").startswith(("0001-01-01", "0000-00-00")):
+		return False
+	return True
+
+
+def timestr_to_time(time_as_string):
+	"""
+	Converts a string time (8:30pm) to datetime.time object.
+	Examples:
+		8pm
+		830pm
+		830 pm
+		8:30pm
+		20:30
+		8:30 pm
+	"""
+	time_as_string = time_as_string.lower()
+	time_as_string = time_as_string.replace(':', '')
+	time_as_string = time_as_string.replace(' ', '')
+
+	am_pm = None
+	hour = None
+	minute = None
+	second = 0
+
+	if 'am' in time_as_string:
+		am_pm = 'am'
+		time_as_string = time_as_string.replace('am', '')
+	elif 'pm' in time_as_string:
+		am_pm = 'pm'
+		time_as_string = time_as_string.replace('pm', '')
+	time_as_string = time_as_string.replace(' ', '')
+
+	# Based on length of string, make some assumptions:
+	if len(time_as_string) == 0:
+		raise ValueError(f"Invalid time string '{time_as_string}'")
+	if len(time_as_string) in (1,2):
+		hour = int(time_as_string)
+		minute = 0
+	elif len(time_as_string) == 3:
+		hour = int(time_as_string[0])
+		minute = int(time_as_string[1:3])  # NOTE: Python string splicing; last index is not included.
+	elif len(time_as_string) == 4:
+		hour = int(time_as_string[0:2])  # NOTE: Python string splicing; last index is not included.
+		minute = int(time_as_string[2:4]) # NOTE: Python string splicing; last index is not included.
+	elif len(time_as_string) == 6:
+		hour = int(time_as_string[0:2])  # NOTE: Python string splicing; last index is not included.
+		minute = int(time_as_string[2:4]) # NOTE: Python string splicing; last index is not included.
+		second = int(time_as_string[4:6]) # NOTE: Python string splicing; last index is not included.
+	else:
+		raise ValueError(f"Invalid time string '{time_as_string}'")
+
+	if hour > 23:
+		raise ValueError(f"Invalid time string '{time_as_string}'")
+	if minute > 59:
+		raise ValueError(f"Invalid time string '{time_as_string}'")
+	if int(hour) > 12 and am_pm == 'am':
+		raise ValueError(f"Invalid time string '{time_as_string}'")
+
+	if not am_pm:
+		if hour > 12:
+			am_pm = 'pm'
+		else:
+			am_pm = 'am'
+	if am_pm == 'pm' and hour < 12:
+		hour += 12
+
+	return datetime.time(int(hour), int(minute), second)
+
+
+def date_to_datetime(any_date):
+	"""
+	Return a Date as a Datetime set to midnight.
+	"""
+	return datetime_type.combine(any_date, datetime_type.min.time())
+
+
+# ----------------
+# Weekdays
+# ----------------
+
+def next_weekday_after_date(weekday, any_date):
+	"""
+	Find the next day of week (MON, SUN, etc) after a target date.
+	"""
+	weekday_int = None
+	if isinstance(weekday, int):
+		weekday_int = weekday
+	elif isinstance(weekday, str):
+		weekday_int = weekday_int_from_name(weekday, first_day_of_week='MON')  # Monday-based math below
+
+	days_ahead = weekday_int - any_date.weekday()
+	if days_ahead <= 0:  # Target day already happened this week
+		days_ahead += 7
+	return any_date + datetime.timedelta(days_ahead)
+
+
+def weekday_string_to_shortname(weekday_string):
+	"""
+	Given a weekday name (MON, Monday, MONDAY), convert it to the short name.
+	"""
+	if weekday_string.upper() in (day['name_short'] for day in WEEKDAYS):
+		return weekday_string.upper()
+
+	ret = next(day['name_short'] for day in WEEKDAYS if day['name_long'].upper() == weekday_string.upper())
+	return ret
+
+
+def weekday_int_from_name(weekday_name, first_day_of_week='SUN'):
+	"""
+	Return the position of a Weekday in a Week.
+	"""
+	weekday_short_name = weekday_string_to_shortname(weekday_name)
+	if first_day_of_week == 'SUN':
+		result = next(weekday['pos'] for weekday in WEEKDAYS_SUN0 if weekday['name_short'] == weekday_short_name)
+	elif first_day_of_week == 'MON':
+		result = next(weekday['pos'] for weekday in WEEKDAYS_MON0 if weekday['name_short'] == weekday_short_name)
+	else:
+		raise ValueError("Invalid first day of week (expected SUN or MON)")
+	return result
+
+
+# ----------------
+# OTHER
+# ----------------
+
+def validate_datatype(argument_name, argument_value, expected_type, mandatory=False):
+	"""
+	A helpful generic function for checking a variable's datatype, and throwing an error on mismatches.
+	Absolutely necessary when dealing with extremely complex Python programs that talk to SQL, HTTP, Redis, etc.
+
+	NOTE: expected_type can be a single Type, or a tuple of Types.
+	"""
+
+	# TODO: Support passing arguments for "expected_precise_type" (e.g. DailyOrder), and "expected_base_type" (e.g. Document)
+
+	# Throw error if missing mandatory argument.
+	NoneType = type(None)
+	if mandatory and isinstance(argument_value, NoneType):
+		raise ArgumentMissing(f"Argument '{argument_name}' is mandatory.")
+
+	if not argument_value:
+		return argument_value  # datatype is going to be a NoneType, which is okay if not mandatory.
+
+	# Check argument type
+	if not isinstance(argument_value, expected_type):
+		if isinstance(expected_type, tuple):
+			expected_type_names = [ each.__name__ for each in expected_type ]
+			msg = f"Argument '{argument_name}' should be one of these types: '{', '.join(expected_type_names)}'"
+			msg += f"<br>Found a {type(argument_value).__name__} with value '{argument_value}' instead."
+		else:
+			msg = f"Argument '{argument_name}' should be of type = '{expected_type.__name__}'"
+			msg += f"<br>Found a {type(argument_value).__name__} with value '{argument_value}' instead."
+		raise ArgumentType(msg)
+
+	# Otherwise, return the argument to the caller.
+	return argument_value
+
+
+def make_ordinal(some_integer) -> str:
+	"""
+	Convert an integer into its ordinal representation::
+		make_ordinal(0)   => '0th'
+		make_ordinal(3)   => '3rd'
+		make_ordinal(122) => '122nd'
+		make_ordinal(213) => '213th'
+	"""
+	# Shamelessly borrowed from here: https://stackoverflow.com/questions/9647202/ordinal-numbers-replacement
+	some_integer = int(some_integer)
+	if 11 <= (some_integer % 100) <= 13:
+		suffix = 'th'
+	else:
+		suffix = ['th', 'st', 'nd', 'rd', 'th'][min(some_integer % 10, 4)]
+	return str(some_integer) + suffix
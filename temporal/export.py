@@ -0,0 +1,153 @@
+""" temporal/export.py
+
+Export the calendar as a date dimension, for loading into a data warehouse:  one row per day, in date order.
+
+The rows are calculated (the same arithmetic the Builder uses), not read from Redis or `tabTemporal Dates`, and are written
+in batches of 'batch_size' rows, so memory stays constant however long the range is.  Formats:
+
+	parquet		requires the 'pyarrow' package (the default when it is installed)
+	arrow		an Arrow IPC file (Feather v2); requires 'pyarrow'
+	csv			no extra packages (the default otherwise)
+
+	bench --site <sitename> temporal-export-calendar /tmp/date_dimension.parquet
+	bench --site <sitename> temporal-export-calendar /tmp/date_dimension.csv --from-date 2020-01-01 --to-date 2030-12-31
+
+Columns are every field of a Temporal Day (see Builder.day_dicts_for_year; day_of_month, month_in_year_int, and day_of_year
+are integers here), the first and last day of its Temporal week, its ISO 8601 week, and its 'scalar_value' (see date_to_scalar).
+"""
+
+# Standard Library
+import csv
+from datetime import date as dtdate, timedelta
+
+# Temporal
+from temporal import codec
+from temporal.core import any_to_date, week_tuples_between
+
+EXPORT_BATCH_SIZE = 10000
+EXPORT_FORMATS = ('parquet', 'arrow', 'csv')
+
+# Column name, Arrow type
+EXPORT_COLUMNS = (
+	('date', 'date32'),
+	('date_as_string', 'string'),
+	('weekday_name', 'string'),
+	('weekday_name_short', 'string'),
+	('day_of_month', 'int8'),
+	('month_in_year_int', 'int8'),
+	('month_in_year_str', 'string'),
+	('year', 'int16'),
+	('day_of_year', 'int16'),
+	('week_year', 'int16'),
+	('week_number', 'int8'),
+	('index_in_week', 'int8'),
+	('week_start', 'date32'),
+	('week_end', 'date32'),
+	('iso_year', 'int16'),
+	('iso_week', 'int8'),
+	('iso_weekday', 'int8'),
+	('scalar_value', 'int64'),
+)
+
+
+def _has_pyarrow():
+	try:
+		import pyarrow  # pylint: disable=import-outside-toplevel,unused-import
+	except ImportError:
+		return False
+	return True
+
+
+def calendar_batches(from_date, to_date, batch_size=EXPORT_BATCH_SIZE, scalar_anchor=None):
+	"""
+	Generator of batches of the date dimension.  Each batch is a dictionary of { column name: list of values }, with at most 'batch_size' rows.
+	'scalar_anchor' is a tuple (date ordinal, scalar_value); without one, 'scalar_value' is None.
+	"""
+	from_date, to_date = any_to_date(from_date), any_to_date(to_date)
+	if from_date > to_date:
+		raise ValueError("Argument 'from_date' cannot be greater than argument 'to_date'")
+	batch_start = from_date
+	while batch_start <= to_date:
+		batch_end = min(to_date, batch_start + timedelta(days=batch_size - 1))
+		columns = { name: [] for name, _ in EXPORT_COLUMNS }
+		appenders = [ columns[name].append for name, _ in EXPORT_COLUMNS ]
+		for calendar_date, week_year, week_number in week_tuples_between(batch_start, batch_end):
+			ordinal = calendar_date.toordinal()
+			year, month, day = calendar_date.year, calendar_date.month, calendar_date.day
+			week_start = ordinal - (ordinal % 7)
+			iso_year, iso_week, iso_weekday = calendar_date.isocalendar()
+			values = (calendar_date,
+			          f"{year:04d}-{month:02d}-{day:02d}",
+			          codec.WEEKDAY_NAMES[ordinal % 7],
+			          codec.WEEKDAY_SHORT_NAMES[ordinal % 7],
+			          day,
+			          month,
+			          codec.MONTH_NAMES[month],
+			          year,
+			          ordinal - dtdate(year, 1, 1).toordinal() + 1,
+			          week_year,
+			          week_number,
+			          ordinal % 7 + 1,
+			          dtdate.fromordinal(week_start),
+			          dtdate.fromordinal(week_start + 6),
+			          iso_year,
+			          iso_week,
+			          iso_weekday,
+			          scalar_anchor[1] + (ordinal - scalar_anchor[0]) if scalar_anchor else None)
+			for append, value in zip(appenders, values):
+				append(value)
+		yield columns
+		batch_start = batch_end + timedelta(days=1)
+
+
+def export_calendar(path, export_format=None, from_date=None, to_date=None, batch_size=EXPORT_BATCH_SIZE):
+	"""
+	Write the date dimension to 'path', and return the number of rows written.
+	By default, the range is every year of 'Temporal Manager' (or the Builder's defaults), and the format is Parquet when 'pyarrow' is installed, otherwise CSV.
+	"""
+	from temporal import Builder  # pylint: disable=import-outside-toplevel
+	from temporal.temporal_core.doctype.temporal_dates.temporal_dates import get_scalar_anchor  # pylint: disable=import-outside-toplevel
+
+	export_format = export_format or ('parquet' if _has_pyarrow() else 'csv')
+	if export_format not in EXPORT_FORMATS:
+		raise ValueError(f"Unknown export format '{export_format}' (expected one of {', '.join(EXPORT_FORMATS)})")
+	if export_format != 'csv' and not _has_pyarrow():
+		raise ImportError(f"Exporting to '{export_format}' requires the Python package 'pyarrow'.  Install it, or export to 'csv'.")
+	if not from_date or not to_date:
+		builder = Builder(epoch_year=None, end_year=None)
+		from_date = from_date or dtdate(builder.epoch_year, 1, 1)
+		to_date = to_date or dtdate(builder.end_year, 12, 31)
+
+	batches = calendar_batches(from_date, to_date, batch_size=int(batch_size), scalar_anchor=get_scalar_anchor())
+	if export_format == 'csv':
+		return _write_csv(path, batches)
+	return _write_arrow(path, batches, parquet=(export_format == 'parquet'))
+
+
+def _write_csv(path, batches):
+	row_count = 0
+	with open(path, 'w', newline='', encoding='utf-8') as fstream:
+		writer = csv.writer(fstream)
+		writer.writerow([ name for name, _ in EXPORT_COLUMNS ])
+		for columns in batches:
+			rows = list(zip(*columns.values()))
+			writer.writerows(rows)
+			row_count += len(rows)
+	return row_count
+
+
+def _write_arrow(path, batches, parquet):
+	import pyarrow  # pylint: disable=import-outside-toplevel
+	schema = pyarrow.schema([ (name, getattr(pyarrow, type_name)()) for name, type_name in EXPORT_COLUMNS ])
+	if parquet:
+		import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+		writer = pyarrow.parquet.ParquetWriter(path, schema)
+	else:
+		writer = pyarrow.ipc.new_file(path, schema)
+	row_count = 0
+	with writer:
+		for columns in batches:
+			record_batch = pyarrow.record_batch([ columns[name] for name in schema.names ], schema=schema)
+			writer.write_batch(record_batch)
+			row_count += record_batch.num_rows
+	return row_count
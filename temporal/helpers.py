@@ -1,30 +1,117 @@
 """ temporal.helpers.py """
 
 import copy
-from datetime import date as DateType
-from temporal import date_to_iso_string
+from datetime import date as DateType, datetime as DateTimeType, time as TimeType
+from decimal import Decimal
 
+# Types that can never contain a date, and are returned immediately.
+_ATOMIC_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+_CONTAINER_TYPES = (dict, list, tuple, set, frozenset)
 
-def dict_to_dateless_dict(some_object):
+
+def _convert_value(value):
+	"""
+	Convert a single non-container value.  Returns the same object when there is nothing to convert.
 	"""
-	Given an common object, convert any Dates to ISO Strings.
+	value_type = type(value)
+	if value_type in _ATOMIC_TYPES:
+		return value
+	# NOTE: datetime is a subclass of date, so it must be tested first.
+	if isinstance(value, DateTimeType):
+		return value.isoformat(sep=' ')  # Frappe uses a space, not a 'T', as the separator.
+	if isinstance(value, DateType):
+		return value.strftime("%Y-%m-%d")
+	if isinstance(value, TimeType):
+		return value.isoformat()
+	if isinstance(value, Decimal):
+		return float(value)
+	return value
+
+
+class _Frame():
+	""" One container being visited by dict_to_dateless_dict() """
+	__slots__ = ('container', 'items', 'changes', 'pending_key')
+
+	def __init__(self, container):
+		self.container = container
+		if isinstance(container, dict):
+			self.items = iter(container.items())
+		elif isinstance(container, (set, frozenset)):
+			self.items = ((member, member) for member in container)  # for sets, the 'key' is the original member
+		else:
+			self.items = enumerate(container)
+		self.changes = []
+		self.pending_key = None
+
+	def finish(self, in_place):
+		"""
+		Return the container with all changes applied: either the original, a shallow copy, or the original modified in-place.
+		"""
+		container = self.container
+		if not self.changes:
+			return container
+
+		if isinstance(container, (dict, list)):
+			target = container if in_place else copy.copy(container)
+			for key, new_value in self.changes:
+				target[key] = new_value
+			return target
+
+		if isinstance(container, (set, frozenset)):
+			old_members = { key for key, _ in self.changes }
+			new_members = { new_value for _, new_value in self.changes }
+			if in_place and isinstance(container, set):
+				container.difference_update(old_members)
+				container.update(new_members)
+				return container
+			return type(container)((container - old_members) | new_members)
+
+		# Tuples are immutable, so they are always rebuilt.
+		members = list(container)
+		for index, new_value in self.changes:
+			members[index] = new_value
+		if hasattr(container, '_fields'):  # NamedTuple
+			return type(container)(*members)
+		return type(container)(members)
+
+
+def dict_to_dateless_dict(some_object, in_place=False):
 	"""
-	result = copy.deepcopy(some_object)  # making a deep copy to be safe.
+	Given an common object, convert any Dates, Datetimes and Times to ISO Strings, and any Decimals to floats.
 
-	# Scenario 1: Object is a Date
-	if isinstance(result, DateType):
-		return date_to_iso_string(some_object)
+	The object is traversed once, without recursion, so deeply-nested payloads do not hit the recursion limit.
+	Containers (dict, list, tuple, set) holding nothing to convert are returned as-is, shared with the argument.
+	The others are shallow-copied; or when 'in_place' is True, dictionaries, lists and sets are modified directly.
+	"""
+	new_value = _convert_value(some_object)
+	if (new_value is not some_object) or (not isinstance(some_object, _CONTAINER_TYPES)):
+		return new_value
 
-	# Scenario 2: Object is a List
-	if isinstance(some_object, list):
-		return [dict_to_dateless_dict(v) for v in some_object]  # recursive call to this function.
+	result = some_object
+	stack = [ _Frame(some_object) ]
+	visiting = { id(some_object) }  # guards against self-referencing containers
 
-	# Scenario 3: Argument is a Dictionary
-	if isinstance(some_object, dict):
-		new_dict = {}
-		for key, value in some_object.items():
-			new_dict[ key ] = dict_to_dateless_dict(value)  # recursive call to this function.
-		return new_dict
+	while stack:
+		frame = stack[-1]
+		for key, child in frame.items:
+			new_child = _convert_value(child)
+			if new_child is not child:
+				frame.changes.append((key, new_child))
+			elif isinstance(child, _CONTAINER_TYPES) and id(child) not in visiting:
+				# Descend into the child; this frame resumes afterwards from the same iterator.
+				frame.pending_key = key
+				stack.append(_Frame(child))
+				visiting.add(id(child))
+				break
+		else:
+			stack.pop()
+			visiting.discard(id(frame.container))
+			new_container = frame.finish(in_place)
+			if stack:
+				if new_container is not frame.container:
+					parent = stack[-1]
+					parent.changes.append((parent.pending_key, new_container))
+			else:
+				result = new_container
 
-	# Scenario 4: Argument is something not covered above (e.g. Integers)
-	return some_object
+	return result
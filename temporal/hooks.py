@@ -13,3 +13,12 @@ app_icon = "octicon octicon-file-directory"
 app_color = "grey"
 app_email = "brian@datahenge.com"
 app_license = "MIT"
+
+# Prepare the calendar before traffic arrives (see temporal/warmup.py)
+after_migrate = ["temporal.warmup.after_migrate"]
+before_request = ["temporal.warmup.on_worker_start"]
+before_job = ["temporal.warmup.on_worker_start"]
+
+# Add this process's Redis statistics to the site-wide totals (see temporal/metrics.py)
+after_request = ["temporal.metrics.flush_if_due"]
+after_job = ["temporal.metrics.flush_if_due"]
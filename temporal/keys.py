@@ -0,0 +1,89 @@
+""" temporal/keys.py
+
+Names of the keys that hold the Temporal calendar.  Every other module builds key names with these functions.
+
+Two key schemes are available, chosen with site config 'temporal_key_scheme':
+
+	standard (default)		temporal/day/2024-05-01		temporal/week/2024-18		temporal/year/2024
+	cluster				temporal/{2024}/day/2024-05-01	temporal/{2024}/week/2024-18	temporal/{2024}/year
+
+The 'cluster' scheme is for Redis Cluster.  The '{2024}' hash tag places all of one year's keys (days, weeks, the year,
+its checksum, and its range indexes) in the same hash slot.  So a pipeline, a Lua script, or a multi-key command over
+one year is served by a single node.  Range reads that span several years are sent once per year (see temporal.redis)
+
+	bench --site <sitename> set-config temporal_key_scheme cluster
+
+Changing the scheme does not move existing keys.  Rebuild afterwards with:  Builder.build_all(reconcile=True)
+"""
+
+# Standard Library
+import datetime
+
+STANDARD = 'standard'
+CLUSTER = 'cluster'
+KEY_SCHEMES = (STANDARD, CLUSTER)
+
+YEARS_KEY = "temporal/years"
+SCHEMA_VERSION_KEY = "temporal/schema_version"
+
+
+def get_key_scheme():
+	""" The key scheme from site config 'temporal_key_scheme' (default 'standard') """
+	try:
+		import frappe  # pylint: disable=import-outside-toplevel
+		scheme = (frappe.local.conf or {}).get('temporal_key_scheme') or STANDARD
+	except (ImportError, AttributeError, RuntimeError):  # Frappe is not installed, or no site is initialized
+		return STANDARD
+	if scheme not in KEY_SCHEMES:
+		raise ValueError(f"Unknown value '{scheme}' for site config 'temporal_key_scheme' (expected standard or cluster)")
+	return scheme
+
+
+def _year_prefix(year, scheme):
+	""" The part of a key name that precedes 'day', 'week', etc. """
+	if (scheme or get_key_scheme()) == CLUSTER:
+		return f"temporal/{{{year}}}/"
+	return "temporal/"
+
+
+def year_key(year, scheme=None):
+	if not isinstance(year, int):
+		raise TypeError("Argument 'year' should be a Python integer.")
+	if (scheme or get_key_scheme()) == CLUSTER:
+		return f"temporal/{{{year}}}/year"
+	return f"temporal/year/{year}"
+
+
+def checksum_key(year, scheme=None):
+	if (scheme or get_key_scheme()) == CLUSTER:
+		return f"temporal/{{{year}}}/checksum"
+	return f"temporal/checksum/{year}"
+
+
+def day_key(any_date, scheme=None):
+	""" Day keys end with the date as YYYY-MM-DD, so they sort in date order. """
+	if not isinstance(any_date, datetime.date):
+		raise TypeError(f"Argument 'any_date' should have type 'datetime.date', not '{type(any_date)}'")
+	return f"{_year_prefix(any_date.year, scheme)}day/{any_date.year:04d}-{any_date.month:02d}-{any_date.day:02d}"
+
+
+def week_key(year, week_number, scheme=None):
+	""" Week keys end with the week's year, and its 2-digit week number. """
+	week_number = int(week_number)
+	if not 1 <= week_number <= 53:
+		raise ValueError("Week number must be an integer between 1 and 53.")
+	return f"{_year_prefix(year, scheme)}week/{year}-{week_number:02d}"
+
+
+def day_index_key(year, scheme=None):
+	""" The sorted set that indexes the Days of 'year'.  With the standard scheme, one index holds every year. """
+	if (scheme or get_key_scheme()) == CLUSTER:
+		return f"temporal/{{{year}}}/days"
+	return "temporal/days"
+
+
+def week_index_key(year, scheme=None):
+	""" The sorted set that indexes the Weeks labelled with 'year'.  With the standard scheme, one index holds every year. """
+	if (scheme or get_key_scheme()) == CLUSTER:
+		return f"temporal/{{{year}}}/weeks"
+	return "temporal/weeks"
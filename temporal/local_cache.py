@@ -0,0 +1,192 @@
+""" temporal/local_cache.py
+
+A process-local cache in front of temporal.redis.read_single_day(), read_single_week() and read_single_year().
+
+The calendar rarely changes, so nearly every read can be answered without a Redis round trip.  To stay correct after
+someone rebuilds the calendar, Builder.build_all() publishes a new 'generation' token to the storage backend.
+Each process compares its token with the published one (at most every GENERATION_CHECK_SECONDS), and discards its
+entire cache when they differ.  Entries also expire after a TTL, as a safety net.
+
+The cache is off by default.  Enable it for a site with:
+	bench --site <sitename> set-config temporal_local_cache 1
+	bench --site <sitename> set-config temporal_local_cache_ttl 300        (optional; seconds)
+	bench --site <sitename> set-config temporal_local_cache_size 20000     (optional; maximum entries per process)
+"""
+
+# Standard Library
+from collections import OrderedDict
+from functools import wraps
+import threading
+import time
+import uuid
+import weakref
+
+# Frappe
+import frappe
+
+# Temporal
+from temporal import metrics
+from temporal.storage import get_backend
+
+GENERATION_KEY = "temporal/generation"
+GENERATION_CHECK_SECONDS = 1
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 20000
+
+_caches = weakref.WeakKeyDictionary()  # StorageBackend : { site : LocalCache }
+_caches_lock = threading.Lock()
+
+
+def _site_config():
+	try:
+		return frappe.local.conf or {}
+	except (AttributeError, RuntimeError):  # no site is initialized
+		return {}
+
+
+def is_enabled():
+	return bool(_site_config().get('temporal_local_cache'))
+
+
+class LocalCache():
+	"""
+	Least-recently-used cache, with a time-to-live per entry, and invalidation by generation token.
+	"""
+	def __init__(self, backend, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+		self.backend = backend
+		self.ttl_seconds = ttl_seconds
+		self.max_entries = max_entries
+		self.generation = None
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()  # key : (expires_at, value)
+		self._next_generation_check = 0.0
+		self.statistics = { 'hit': 0, 'miss': 0, 'expired': 0, 'evicted': 0, 'invalidated': 0 }
+
+	def check_generation(self, now=None):
+		""" Discard every entry if the published generation has changed.  Reads the backend at most every GENERATION_CHECK_SECONDS. """
+		now = now or time.monotonic()
+		if now < self._next_generation_check:
+			return
+		self._next_generation_check = now + GENERATION_CHECK_SECONDS
+		published = self.backend.get_hash(GENERATION_KEY).get('generation')
+		if published != self.generation:
+			self.clear()
+			self.generation = published
+
+	def get(self, key):
+		""" Returns the cached value, or None. """
+		now = time.monotonic()
+		self.check_generation(now)
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.statistics['miss'] += 1
+				return None
+			if entry[0] <= now:
+				del self._entries[key]
+				self.statistics['expired'] += 1
+				self.statistics['miss'] += 1
+				return None
+			self._entries.move_to_end(key)
+			self.statistics['hit'] += 1
+			return entry[1]
+
+	def set(self, key, value):
+		with self._lock:
+			self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+				self.statistics['evicted'] += 1
+
+	def clear(self):
+		with self._lock:
+			if self._entries:
+				self.statistics['invalidated'] += 1
+			self._entries.clear()
+
+	def as_dict(self):
+		with self._lock:
+			result = dict(self.statistics)
+			result['entries'] = len(self._entries)
+		lookups = result['hit'] + result['miss']
+		result['hit_rate'] = round(result['hit'] / lookups, 4) if lookups else None
+		result['generation'] = self.generation
+		return result
+
+
+def get_local_cache():
+	"""
+	Returns the LocalCache for the current storage backend and site.
+	"""
+	backend = get_backend()
+	site = getattr(frappe.local, 'site', None)
+	site_caches = _caches.get(backend)
+	if site_caches is None or site not in site_caches:
+		with _caches_lock:
+			site_caches = _caches.setdefault(backend, {})
+			if site not in site_caches:
+				site_config = _site_config()
+				site_caches[site] = LocalCache(backend,
+				                               ttl_seconds=int(site_config.get('temporal_local_cache_ttl') or DEFAULT_TTL_SECONDS),
+				                               max_entries=int(site_config.get('temporal_local_cache_size') or DEFAULT_MAX_ENTRIES))
+	return site_caches[site]
+
+
+def publish_generation():
+	"""
+	Publish a new calendar generation, so that every process discards its local cache.  Called by Builder.build_all()
+	"""
+	generation = uuid.uuid4().hex
+	get_backend().set_hash(GENERATION_KEY, { 'generation': generation })
+	cache = get_local_cache()  # this process does not wait for its next check
+	cache.clear()
+	cache.generation = generation
+	return generation
+
+
+def preload(family, entries):
+	"""
+	Store values read elsewhere (e.g. in one round trip), as if each had been read by the 'family' function.
+	'entries' is a dictionary of { (arguments,): value }.  Used by temporal.warmup
+	"""
+	cache = get_local_cache()
+	cache.check_generation()
+	for args, value in entries.items():
+		if value:
+			cache.set((family,) + tuple(args), value)
+	return len(entries)
+
+
+def cached_read(family):
+	"""
+	Decorator for the temporal.redis functions that read a single hash.  Results are cached by (family, arguments).
+	Missing keys are never cached.  Callers receive a copy of the cached dictionary.
+	"""
+	def decorator(function):
+		@wraps(function)
+		def wrapper(*args):
+			if not is_enabled():
+				return function(*args)
+			cache = get_local_cache()
+			key = (family,) + args
+			value = cache.get(key)
+			if metrics.is_enabled():
+				metrics.get_registry().increment('local_cache', 'hit' if value is not None else 'miss')
+			if value is None:
+				value = function(*args)
+				if value:
+					cache.set(key, value)
+			return dict(value) if value else value
+		return wrapper
+	return decorator
+
+
+@frappe.whitelist()
+def get_local_cache_statistics():
+	"""
+	Hit rate and size of the local cache, for only the process answering this call.
+	(When 'temporal_metrics' is enabled, site-wide hits and misses are also reported by temporal.metrics.get_redis_statistics)
+	"""
+	frappe.only_for("System Manager")
+	return get_local_cache().as_dict()
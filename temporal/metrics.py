@@ -0,0 +1,295 @@
+""" temporal/metrics.py
+
+Counters and latency histograms for Temporal's Redis reads and writes, and for calendar rebuilds.
+
+Instrumentation is off by default.  Enable it for a site with:
+	bench --site <sitename> set-config temporal_metrics 1
+
+Each worker process keeps its own statistics, per site, and adds them to that site's shared Redis hash at the end of a request
+or background job, at most every FLUSH_INTERVAL_SECONDS (hooks 'after_request' and 'after_job').  So reads are never slowed by a flush.
+get_redis_statistics() returns either the site-wide totals (default) or the current process's statistics.
+"""
+
+# Standard Library
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import time
+
+# Frappe
+import frappe
+
+# Upper bounds of the latency histogram buckets, in milliseconds.  The final bucket is unbounded.
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+FLUSH_INTERVAL_SECONDS = 10
+METRICS_KEY = "temporal/metrics"
+
+_forced_state = None  # When not None, overrides the site configuration (see enable() and disable())
+
+
+def enable():
+	""" Turn on instrumentation for this process, regardless of site configuration. """
+	global _forced_state  # pylint: disable=global-statement
+	_forced_state = True
+
+
+def disable():
+	""" Turn off instrumentation for this process, regardless of site configuration. """
+	global _forced_state  # pylint: disable=global-statement
+	_forced_state = False
+
+
+def is_enabled():
+	if _forced_state is not None:
+		return _forced_state
+	try:
+		return bool(frappe.local.conf.get('temporal_metrics'))
+	except (AttributeError, RuntimeError):  # no site is initialized
+		return False
+
+
+class Histogram():
+	""" Latency histogram with fixed buckets. """
+	__slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+	def __init__(self):
+		self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+		self.count = 0
+		self.total_ms = 0.0
+		self.max_ms = 0.0
+
+	def observe(self, milliseconds):
+		self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+		self.count += 1
+		self.total_ms += milliseconds
+		if milliseconds > self.max_ms:
+			self.max_ms = milliseconds
+
+	def as_dict(self):
+		bucket_names = [ f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS ] + [ "le_inf" ]
+		return {
+			"count": self.count,
+			"total_ms": round(self.total_ms, 3),
+			"average_ms": round(self.total_ms / self.count, 3) if self.count else None,
+			"max_ms": round(self.max_ms, 3),
+			"buckets": dict(zip(bucket_names, self.buckets))
+		}
+
+
+class MetricsRegistry():
+	"""
+	Statistics for one process and site, keyed by family ('day', 'week', 'year', 'index', 'rebuild') and operation ('read', 'write').
+	"""
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.counters = {}  # (family, name) : integer
+		self.histograms = {}  # (family, operation) : Histogram
+		self._unflushed = {}  # (family, name) : integer, for counters only; histograms are flushed by bucket
+		self._unflushed_histograms = {}
+		self._last_flush = time.monotonic()
+
+	def increment(self, family, name, amount=1):
+		with self._lock:
+			key = (family, name)
+			self.counters[key] = self.counters.get(key, 0) + amount
+			self._unflushed[key] = self._unflushed.get(key, 0) + amount
+
+	def observe(self, family, operation, milliseconds):
+		with self._lock:
+			key = (family, operation)
+			if key not in self.histograms:
+				self.histograms[key] = Histogram()
+			if key not in self._unflushed_histograms:
+				self._unflushed_histograms[key] = Histogram()
+			self.histograms[key].observe(milliseconds)
+			self._unflushed_histograms[key].observe(milliseconds)
+
+	def as_dict(self):
+		result = {}
+		with self._lock:
+			for (family, name), value in self.counters.items():
+				result.setdefault(family, {})[name] = value
+			for (family, operation), histogram in self.histograms.items():
+				result.setdefault(family, {})[f"{operation}_latency"] = histogram.as_dict()
+		for family_stats in result.values():
+			hits, misses = family_stats.get('hit', 0), family_stats.get('miss', 0)
+			if hits or misses:
+				family_stats['hit_rate'] = round(hits / (hits + misses), 4)
+		return result
+
+	def reset(self):
+		with self._lock:
+			self.counters.clear()
+			self.histograms.clear()
+			self._unflushed.clear()
+			self._unflushed_histograms.clear()
+
+	def flush_if_due(self):
+		if (time.monotonic() - self._last_flush) >= FLUSH_INTERVAL_SECONDS:
+			self.flush()
+
+	def flush(self):
+		"""
+		Add this process's unflushed statistics to the site-wide Redis hash.  Call it only while this registry's site is initialized.
+		Uses the raw Redis client (not the instrumented functions in temporal.redis), so flushing is not itself measured.
+		"""
+		with self._lock:
+			counters, self._unflushed = self._unflushed, {}
+			histograms, self._unflushed_histograms = self._unflushed_histograms, {}
+			self._last_flush = time.monotonic()
+		if not counters and not histograms:
+			return
+		redis_key = frappe.cache().make_key(METRICS_KEY)
+		pipeline = frappe.cache().pipeline(transaction=False)
+		for (family, name), value in counters.items():
+			pipeline.hincrby(redis_key, f"{family}|{name}", value)
+		for (family, operation), histogram in histograms.items():
+			for index, bucket_count in enumerate(histogram.buckets):
+				if bucket_count:
+					pipeline.hincrby(redis_key, f"{family}|{operation}|bucket|{index}", bucket_count)
+			pipeline.hincrby(redis_key, f"{family}|{operation}|count", histogram.count)
+			pipeline.hincrbyfloat(redis_key, f"{family}|{operation}|total_ms", histogram.total_ms)
+		pipeline.execute()
+
+
+_registries = {}  # site : MetricsRegistry;  a worker process may serve several sites
+_registries_lock = threading.Lock()
+
+
+def get_registry():
+	""" The MetricsRegistry of the current site, in this process. """
+	site = getattr(frappe.local, 'site', None)
+	registry = _registries.get(site)
+	if registry is None:
+		with _registries_lock:
+			registry = _registries.setdefault(site, MetricsRegistry())
+	return registry
+
+
+def record_read(family, milliseconds, hit):
+	registry = get_registry()
+	registry.observe(family, 'read', milliseconds)
+	registry.increment(family, 'hit' if hit else 'miss')
+
+
+def record_write(family, milliseconds):
+	registry = get_registry()
+	registry.observe(family, 'write', milliseconds)
+	registry.increment(family, 'writes')
+
+
+def flush_if_due(*args, **kwargs):  # pylint: disable=unused-argument
+	""" Hooks 'after_request' and 'after_job':  flush the current site's statistics, if FLUSH_INTERVAL_SECONDS have passed. """
+	if is_enabled():
+		get_registry().flush_if_due()
+
+
+def instrument_read(family):
+	"""
+	Decorator for functions that read from Redis.  A result that is None (or empty), or a KeyError, counts as a miss.
+	When instrumentation is disabled, the only overhead is one call to is_enabled().
+	"""
+	def decorator(function):
+		@wraps(function)
+		def wrapper(*args, **kwargs):
+			if not is_enabled():
+				return function(*args, **kwargs)
+			start = time.perf_counter()
+			try:
+				result = function(*args, **kwargs)
+			except KeyError:  # raised on misses, when 'Temporal Manager' is in debug mode
+				record_read(family, (time.perf_counter() - start) * 1000, hit=False)
+				raise
+			record_read(family, (time.perf_counter() - start) * 1000, hit=bool(result))
+			return result
+		return wrapper
+	return decorator
+
+
+def instrument_write(family):
+	""" Decorator for functions that write to Redis. """
+	def decorator(function):
+		@wraps(function)
+		def wrapper(*args, **kwargs):
+			if not is_enabled():
+				return function(*args, **kwargs)
+			start = time.perf_counter()
+			result = function(*args, **kwargs)
+			record_write(family, (time.perf_counter() - start) * 1000)
+			return result
+		return wrapper
+	return decorator
+
+
+@contextmanager
+def rebuild_timer(trigger):
+	"""
+	Context manager that measures a calendar rebuild.  'trigger' describes the cause (e.g. 'day_miss', 'week_miss', 'manual')
+	"""
+	if not is_enabled():
+		yield
+		return
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		registry = get_registry()
+		registry.increment('rebuild', trigger)
+		registry.observe('rebuild', 'build_all', (time.perf_counter() - start) * 1000)
+		registry.flush()  # rebuilds are rare, and worth reporting immediately
+
+
+def _redis_hash_to_statistics(redis_hash):
+	""" Convert the flat, site-wide Redis hash back into the same shape as MetricsRegistry.as_dict() """
+	counters = {}
+	histograms = {}
+	for field, value in redis_hash.items():
+		parts = (field.decode() if isinstance(field, bytes) else field).split('|')
+		if len(parts) == 2:
+			counters[(parts[0], parts[1])] = int(value)
+			continue
+		histogram = histograms.setdefault((parts[0], parts[1]), Histogram())
+		if parts[2] == 'bucket':
+			histogram.buckets[int(parts[3])] = int(value)
+		elif parts[2] == 'count':
+			histogram.count = int(value)
+		elif parts[2] == 'total_ms':
+			histogram.total_ms = float(value)
+	registry = MetricsRegistry()
+	registry.counters = counters
+	registry.histograms = histograms
+	result = registry.as_dict()
+	for family_stats in result.values():
+		for each in family_stats.values():
+			if isinstance(each, dict):
+				each.pop('max_ms', None)  # not tracked site-wide
+	return result
+
+
+@frappe.whitelist()
+def get_redis_statistics(scope='site'):
+	"""
+	Return hit/miss counters and latency histograms, by key family.
+
+	scope:	'site' for totals across all worker processes, or 'process' for only the process answering this call.
+
+	bench execute temporal.metrics.get_redis_statistics
+	"""
+	frappe.only_for("System Manager")
+	if scope == 'process':
+		return get_registry().as_dict()
+	get_registry().flush()
+	# NOTE: The values were written with HINCRBY, so they are not pickled; bypass RedisWrapper.hgetall(), which would unpickle them.
+	pipeline = frappe.cache().pipeline(transaction=False)
+	pipeline.hgetall(frappe.cache().make_key(METRICS_KEY))
+	redis_hash = pipeline.execute()[0]
+	return _redis_hash_to_statistics(redis_hash or {})
+
+
+@frappe.whitelist()
+def reset_redis_statistics():
+	""" Clear the site-wide statistics, and this process's statistics. """
+	frappe.only_for("System Manager")
+	get_registry().reset()
+	frappe.cache().delete_key(METRICS_KEY)
@@ -0,0 +1,153 @@
+""" temporal/rebuild_job.py
+
+Rebuild the Temporal calendar in a background job, one year at a time.
+
+Each completed year is recorded in a checkpoint (the hash 'temporal/rebuild' in the storage backend).
+If the job crashes or times out, enqueueing the same rebuild again resumes from the first unfinished year.
+After each year, progress is published to the 'Temporal Manager' form as the realtime event 'temporal_rebuild_progress'.
+
+	bench execute temporal.rebuild_job.enqueue_rebuild
+"""
+
+# Standard Library
+import time
+
+# Frappe
+import frappe
+from frappe import _
+
+# Temporal
+from temporal import CALENDAR_SCHEMA_VERSION, Builder, local_cache, metrics
+from temporal import redis as temporal_redis
+from temporal.storage import get_backend
+
+CHECKPOINT_KEY = "temporal/rebuild"
+PROGRESS_EVENT = "temporal_rebuild_progress"
+JOB_TIMEOUT_SECONDS = 3600
+# A running job refreshes its checkpoint after every year.  One that has not done so for this long is assumed dead.
+STALE_AFTER_SECONDS = 600
+
+
+def read_checkpoint():
+	return get_backend().get_hash(CHECKPOINT_KEY)
+
+
+def _write_checkpoint(checkpoint):
+	checkpoint['heartbeat'] = time.time()
+	get_backend().set_hash(CHECKPOINT_KEY, checkpoint)
+
+
+def is_running():
+	checkpoint = read_checkpoint()
+	return checkpoint.get('status') == 'running' and (time.time() - checkpoint.get('heartbeat', 0)) < STALE_AFTER_SECONDS
+
+
+@frappe.whitelist()
+def enqueue_rebuild(epoch_year=None, end_year=None, incremental=True):
+	"""
+	Start a background rebuild of the calendar.  Returns False if a rebuild is already running.
+	"""
+	frappe.only_for("System Manager")
+	if is_running():
+		return False
+	frappe.enqueue("temporal.rebuild_job.run_rebuild",
+	               queue="long",
+	               timeout=JOB_TIMEOUT_SECONDS,
+	               job_name="temporal_rebuild",
+	               epoch_year=int(epoch_year) if epoch_year else None,
+	               end_year=int(end_year) if end_year else None,
+	               incremental=frappe.utils.cint(incremental))
+	return True
+
+
+def _new_checkpoint(builder, incremental):
+	"""
+	Decide which years to build, removing dropped years immediately.  Returns a new checkpoint.
+	"""
+	years_to_build = builder.years
+	if incremental:
+		stored_years, added_years, dropped_years = builder.plan_changes()
+		if stored_years:
+			builder.remove_years(dropped_years, stored_end_year=stored_years[-1])
+			years_to_build = added_years
+	return {
+		'status': 'running',
+		'epoch_year': builder.epoch_year,
+		'end_year': builder.end_year,
+		'incremental': bool(incremental),
+		'years': list(years_to_build),
+		'completed_years': [],
+		'keys_written': 0,
+		'started': time.time()
+	}
+
+
+def run_rebuild(epoch_year=None, end_year=None, incremental=True):
+	"""
+	Background job:  build the calendar one year at a time, resuming from the checkpoint of an unfinished, identical rebuild.
+	"""
+	with get_backend().use_primary():  # the checkpoint and the stored years must not be read from a lagging replica
+		_run_rebuild(epoch_year, end_year, incremental)
+
+
+def _run_rebuild(epoch_year, end_year, incremental):
+	builder = Builder(epoch_year=epoch_year, end_year=end_year)
+	checkpoint = read_checkpoint()
+	resuming = (checkpoint.get('status') in ('running', 'failed')
+	            and checkpoint.get('epoch_year') == builder.epoch_year
+	            and checkpoint.get('end_year') == builder.end_year
+	            and checkpoint.get('incremental') == bool(incremental))
+	if not resuming:
+		checkpoint = _new_checkpoint(builder, incremental)
+	checkpoint['status'] = 'running'
+	_write_checkpoint(checkpoint)
+
+	remaining_years = [ year for year in checkpoint['years'] if year not in checkpoint['completed_years'] ]
+	start_time = time.monotonic()
+	keys_this_run = 0
+	try:
+		with metrics.rebuild_timer('background'):
+			for index, year in enumerate(remaining_years, start=1):
+				keys_written = builder.build_year_chunk(year)
+				keys_this_run += keys_written
+				checkpoint['completed_years'].append(year)
+				checkpoint['keys_written'] += keys_written
+				_write_checkpoint(checkpoint)
+
+				elapsed = time.monotonic() - start_time
+				_publish_progress(checkpoint,
+				                  keys_per_second=round(keys_this_run / elapsed) if elapsed else None,
+				                  eta_seconds=round(elapsed / index * (len(remaining_years) - index)))
+
+			if not checkpoint['incremental']:
+				temporal_redis.write_years(builder.years)  # the list of years is exactly this range
+			if set(checkpoint['years']) == set(builder.years):
+				temporal_redis.write_schema_version(CALENDAR_SCHEMA_VERSION)  # every year was rewritten
+			builder.build_calendar_file()
+	except Exception:
+		checkpoint['status'] = 'failed'
+		_write_checkpoint(checkpoint)
+		_publish_progress(checkpoint)
+		raise
+
+	local_cache.publish_generation()
+	checkpoint['status'] = 'complete'
+	_write_checkpoint(checkpoint)
+	_publish_progress(checkpoint, eta_seconds=0)
+
+
+def _publish_progress(checkpoint, keys_per_second=None, eta_seconds=None):
+	years_done = len(checkpoint['completed_years'])
+	years_total = len(checkpoint['years'])
+	frappe.publish_realtime(PROGRESS_EVENT,
+	                        message={
+	                            'status': checkpoint['status'],
+	                            'years_done': years_done,
+	                            'years_total': years_total,
+	                            'percent': round(100 * years_done / years_total, 1) if years_total else 100,
+	                            'keys_per_second': keys_per_second,
+	                            'eta_seconds': eta_seconds,
+	                            'message': _("Built {0} of {1} years").format(years_done, years_total)
+	                        },
+	                        doctype="Temporal Manager",
+	                        docname="Temporal Manager")
@@ -8,12 +8,15 @@
 from pprint import pprint
 import datetime
 
-# Third Party
-from six import iteritems
-
 # Frappe
-import frappe
-from frappe import cache, msgprint, safe_decode
+from frappe import msgprint, safe_decode
+
+# Temporal
+from temporal import codec, keys
+from temporal.local_cache import cached_read
+from temporal.metrics import instrument_read, instrument_write
+from temporal.settings import get_settings
+from temporal.storage import get_backend
 
 #  Redis Data Model:
 #  I'm choosing to uses forward slash (/) to build Compound Keys
@@ -25,12 +28,20 @@ from frappe import cache, msgprint, safe_decode
 #  calyear:2020:wk1 : { 'firstday': '4/1/2020', lastday: '4/7/2020' }
 #  calyear:2020:12:26 : { 'week' : 34 , 'dayname': Monday }
 
+#  Range indexes (sorted sets), so Redis can answer "every day or week between A and B":
+#  temporal/days		{ 'temporal/day/2020-12-26': 737785, ... }		scored by the date's ordinal
+#  temporal/weeks		{ 'temporal/week/2020-52': 737780, ... }		scored by the ordinal of the week's first day
+
+#  Day, Week, and Year hashes hold a single packed 'record' field (see temporal/codec.py); readers here return the decoded dictionaries.
+#  Key names come from temporal/keys.py.  With the 'cluster' key scheme, every name includes a year hash tag (temporal/{2020}/day/...)
+#  and each year has its own pair of range indexes.
+
 
 def redis_hash_to_dict(redis_hash, mandatory_arg=True):
 	if not redis_hash:
 		raise ValueError("Missing required argument 'redis_hash'")
 	ret = {}
-	for key, data in iteritems(redis_hash):
+	for key, data in redis_hash.items():
 		key = safe_decode(key)
 		ret[key] = data
 	if mandatory_arg and (not ret):
@@ -42,155 +53,326 @@ def redis_hash_to_dict(redis_hash, mandatory_arg=True):
 # ---------------
 
 def _year_to_yearkey(year):
-	if not isinstance(year, int):
-		raise TypeError("Argument 'year' should be a Python integer.")
-	return f"temporal/year/{year}"
+	return keys.year_key(year)
+
+def _year_to_checksumkey(year):
+	return keys.checksum_key(year)
 
 def _date_to_daykey(date):
 	# For rationality, key format will be YYYY-MM-DD
-	if not isinstance(date, datetime.date):
-		raise TypeError("Argument 'date' should be a Python datetime Date.")
-	date_as_string = date.strftime("%Y-%m-%d")
-	day_key = f"temporal/day/{date_as_string}"
-	return day_key
+	return keys.day_key(date)
 
 def _get_weekkey(year, week_number):
 	""" Return a Redis weekkey """
-	if not isinstance(week_number, int):
-		week_number = int(week_number)
-	if week_number > 53:
-		raise ValueError("Week number must be an integer between 1 and 53.")
-	if week_number < 1:
-		raise ValueError("Week number must be an integer between 1 and 53.")
-	week_number_str = str(week_number).zfill(2)
-	return f"temporal/week/{year}-{week_number_str}"
+	return keys.week_key(year, week_number)
+
+def _index_keys_between(index_key_function, first_year, last_year):
+	""" The range indexes to read for years 'first_year' through 'last_year':  one per year (cluster scheme), otherwise just one. """
+	index_keys = []
+	for year in range(first_year, last_year + 1):
+		index_key = index_key_function(year)
+		if index_key not in index_keys:
+			index_keys.append(index_key)
+	return index_keys
 
 # ------------
 # WRITING TO REDIS
 # ------------
+# NOTE: Despite this module's name, all reads and writes go through the configured StorageBackend (see temporal/storage.py)
+# Redis is the default backend.
+
+def _index_weeks(week_dicts):
+	""" Add Weeks to their range index. """
+	scores_by_index = {}
+	for week_dict in week_dicts:
+		week_key = _get_weekkey(week_dict['year'], week_dict['week_number'])
+		scores_by_index.setdefault(keys.week_index_key(week_dict['year']), {})[week_key] = week_dict['week_start'].toordinal()
+	for index_key, scores in scores_by_index.items():
+		get_backend().add_to_sorted_set(index_key, scores)
+
 
+def _index_days(day_dicts):
+	""" Add Days to their range index. """
+	scores_by_index = {}
+	for day_dict in day_dicts:
+		scores_by_index.setdefault(keys.day_index_key(day_dict['date'].year), {})[_date_to_daykey(day_dict['date'])] = day_dict['date'].toordinal()
+	for index_key, scores in scores_by_index.items():
+		get_backend().add_to_sorted_set(index_key, scores)
+
+
+def _day_dict_to_hash(day_dict):
+	return codec.encode_day(day_dict)
+
+
+@instrument_write('index')
 def write_years(years_tuple, verbose=False):
 	""" Create Redis list of Calendar Years. """
 	if not isinstance(years_tuple, tuple):
 		raise TypeError("Argument 'years_tuple' should be a Python Tuple.")
-	cache().delete_key("temporal/years")
-	for year in years_tuple:
-		cache().sadd("temporal/years", year)  # add to set.
+	get_backend().set_set(keys.YEARS_KEY, years_tuple)
 	if verbose:
 		msgprint(f"Temporal Years: {read_years()}")
 
 
+@instrument_write('index')
+def write_schema_version(version):
+	""" Record the calendar schema version (temporal.CALENDAR_SCHEMA_VERSION) that every stored year was written with. """
+	get_backend().set_hash(keys.SCHEMA_VERSION_KEY, { 'version': version })
+
+
+def read_schema_version():
+	""" Returns the calendar schema version of the stored years, or None when it was never recorded (e.g. an older version of Temporal built them) """
+	return get_backend().get_hash(keys.SCHEMA_VERSION_KEY).get('version')
+
+
+@instrument_write('index')
+def add_years(years_tuple):
+	""" Add years to the Redis list of Calendar Years, keeping the others. """
+	get_backend().add_to_set(keys.YEARS_KEY, years_tuple)
+
+
+@instrument_write('index')
+def remove_years(years_tuple):
+	""" Remove years from the Redis list of Calendar Years, and delete their Year, Week, and Day keys. """
+	for year in years_tuple:  # one year at a time, so that each command stays within one slot (cluster scheme)
+		week_keys = [ _get_weekkey(year, week_number) for week_number in range(1, 54) ]
+		day_ordinals = range(datetime.date(year, 1, 1).toordinal(), datetime.date(year, 12, 31).toordinal() + 1)
+		day_keys = [ _date_to_daykey(datetime.date.fromordinal(ordinal)) for ordinal in day_ordinals ]
+		get_backend().delete(_year_to_yearkey(year), _year_to_checksumkey(year), *week_keys, *day_keys)
+		get_backend().remove_from_sorted_set(keys.week_index_key(year), week_keys)
+		get_backend().remove_from_sorted_set(keys.day_index_key(year), day_keys)
+	get_backend().remove_from_set(keys.YEARS_KEY, years_tuple)
+
+
+@instrument_write('year')
 def write_single_year(year_dict, verbose=False):
 	""" Store a year in Redis as a Hash. """
 	if not isinstance(year_dict, dict):
 		raise TypeError("Argument 'year_dict' should be a Python Dictionary.")
 	year_key = _year_to_yearkey(int(year_dict['year']))
-	cache().delete_key(year_key)
-	for key,value in year_dict.items():
-		cache().hset(year_key, key, value)
+	get_backend().set_hash(year_key, codec.encode_year(year_dict))
 	if verbose:
 		print(f"\u2713 Created temporal year '{year_key}' in Redis.")
 
 
+@instrument_write('year')
 def update_year(year, key, value, verbose=False):
 	""" Update one of the hash values in the Redis Year. """
 	# Example: Update the 'last_week_number' key, once Weeks have been generated.
 	if not isinstance(year, int):
 		raise TypeError("Argument 'year' should be a Python integer.")
 	year_key = _year_to_yearkey(year)
-	cache().hset(year_key, key, value)
+	year_dict = codec.decode(get_backend().get_hash(year_key))
+	year_dict[key] = value
+	get_backend().set_hash(year_key, year_dict)  # a year with extra values is stored unencoded, one field per value
 	if verbose:
 		pass
 
-def write_weeks(weeks_tuple, verbose=False):
-	""" Create Redis list of Weeks. """
-	if not isinstance(weeks_tuple, tuple):
-		raise TypeError("Argument 'weeks_tuple' should be a Python Tuple.")
-	cache().delete_key("temporal/weeks")
-	for week in weeks_tuple:
-		cache().sadd("temporal/weeks", week)  # add to set.
-	if verbose:
-		msgprint(f"Temporal Weeks: {read_weeks()}")
-
+@instrument_write('week')
 def write_single_week(week_dict, verbose=False):
 	""" Store a Week in Redis as a hash. """
 	if not isinstance(week_dict, dict):
 		raise TypeError("Argument 'week_dict' should be a Python Dictionary.")
 	week_key = _get_weekkey(week_dict['year'], week_dict['week_number'])
-	cache().delete_key(week_key)
-	for key,value in week_dict.items():
-		cache().hset(week_key, key, value)
+	get_backend().set_hash(week_key, codec.encode_week(week_dict))
+	_index_weeks([ week_dict ])
 	if verbose:
 		print("Created a Temporal Week '{week_key}' in Redis:\n")
 		pprint(read_single_week(week_dict['year'], week_dict['week_number']), depth=6)
 
+@instrument_write('week')
+def write_many_weeks(week_dicts):
+	""" Store several Weeks in one round trip. """
+	get_backend().set_hashes({ _get_weekkey(week_dict['year'], week_dict['week_number']): codec.encode_week(week_dict) for week_dict in week_dicts })
+	_index_weeks(week_dicts)
+
+@instrument_write('week')
+def delete_single_week(year, week_number):
+	week_key = _get_weekkey(year, week_number)
+	get_backend().delete(week_key)
+	get_backend().remove_from_sorted_set(keys.week_index_key(year), [ week_key ])
+
+@instrument_write('year')
+def write_checksum(year, digest):
+	""" Store the content checksum of a year (see Builder.reconcile) """
+	get_backend().set_hash(_year_to_checksumkey(year), { 'digest': digest })
+
+@instrument_write('day')
 def write_single_day(day_dict):
 	""" Store a Day in Redis as a hash. """
 	if not isinstance(day_dict, dict):
 		raise TypeError("Argument 'day_dict' should be a Python Dictionary.")
+	get_backend().set_hash(_date_to_daykey(day_dict['date']), _day_dict_to_hash(day_dict))
+	_index_days([ day_dict ])
 
-	hash_key = _date_to_daykey(day_dict['date'])
-	cache().delete_key(hash_key)
-
-	date_as_string = day_dict['date'].strftime("%Y-%m-%d")
-	for key,value in day_dict.items():
-		if key == 'date':
-			# No point storing datetime.date; just store a sortable date string: YYYY-MM-DD
-			cache().hset(hash_key, key, date_as_string)
-		else:
-			cache().hset(hash_key, key, value)
+@instrument_write('day')
+def write_many_days(day_dicts):
+	""" Store several Days in one round trip. """
+	get_backend().set_hashes({ _date_to_daykey(day_dict['date']): _day_dict_to_hash(day_dict) for day_dict in day_dicts })
+	_index_days(day_dicts)
 
 # ------------
 # READING FROM REDIS
 # ------------
 
+def _missing_key(key):
+	""" Called when a key does not exist.  Raises a KeyError when 'Temporal Manager' is in debug mode; otherwise returns None. """
+	if get_settings().debug_mode:
+		raise KeyError(f"Temporal was unable to find Redis key with name = {key}")
+
+
+@instrument_read('index')
 def read_years():
 	""" Returns a Python Tuple containing year integers. """
-	year_tuple = tuple( int(year) for year in cache().smembers('temporal/years') )
+	year_tuple = tuple( int(year) for year in get_backend().get_set(keys.YEARS_KEY) )
 	return sorted(year_tuple)  # redis does not naturally store Sets as sorted.
 
 
+@cached_read('year')
+@instrument_read('year')
 def read_single_year(year):
 	""" Returns a Python Dictionary containing year-by-year data. """
 	year_key = _year_to_yearkey(year)
-	redis_hash =  cache().hgetall(year_key)
-	if not redis_hash:
-		if frappe.db.get_single_value('Temporal Manager', 'debug_mode'):
-			raise KeyError(f"Temporal was unable to find Redis key with name = {year_key}")
-		return None
-	return redis_hash_to_dict(redis_hash)
+	year_dict = codec.decode(get_backend().get_hash(year_key))
+	if not year_dict:
+		return _missing_key(year_key)
+	return year_dict
 
 
+@instrument_read('index')
 def read_days():
-	""" Returns a Python Tuple containing Day Keys. """
-	day_tuple = tuple( day_key for day_key in cache().smembers('temporal/days') )
-	return sorted(day_tuple)  # Redis Sets are not stored in the Redis database.
-
-
+	""" Returns a Python Tuple containing Day Keys, in date order. """
+	years = read_years()
+	if not years:
+		return ()
+	day_keys = []
+	for index_key in _index_keys_between(keys.day_index_key, years[0], years[-1]):
+		day_keys.extend(get_backend().get_sorted_range(index_key, float('-inf'), float('inf')))
+	return tuple(day_keys)
+
+
+@cached_read('day')
+@instrument_read('day')
 def read_single_day(day_key):
 	""" Returns a Python Dictionary containing a Single Day. """
 	if not day_key.startswith('temporal'):
 		raise ValueError("All Redis key arguments should begin with 'temporal'")
-	redis_hash =  cache().hgetall(day_key)
-	if not redis_hash:
-		if frappe.db.get_single_value('Temporal Manager', 'debug_mode'):
-			raise KeyError(f"Temporal was unable to find Redis key with name = {day_key}")
-		return None
-	return redis_hash_to_dict(redis_hash)
+	day_dict = codec.decode(get_backend().get_hash(day_key))
+	if not day_dict:
+		return _missing_key(day_key)
+	return day_dict
 
 
+@instrument_read('index')
 def read_weeks():
-	""" Returns a Python Tuple containing Week Keys. """
-	week_tuple = tuple( week for week in cache().smembers('temporal/weeks') )
-	return sorted(week_tuple)  # redis does not naturally store Sets as sorted.
-
-
+	""" Returns a Python Tuple containing Week Keys, in date order. """
+	years = read_years()
+	if not years:
+		return ()
+	week_keys = []
+	for index_key in _index_keys_between(keys.week_index_key, years[0], years[-1] + 1):  # + 1 for the boundary week
+		week_keys.extend(get_backend().get_sorted_range(index_key, float('-inf'), float('inf')))
+	return tuple(week_keys)
+
+
+@cached_read('week')
+@instrument_read('week')
 def read_single_week(year, week_number):
 	""" Reads Redis, and returns a Python Dictionary containing a single Week. """
 	week_key = _get_weekkey(year, week_number)
-	redis_hash =  cache().hgetall(week_key)
-	if not redis_hash:
-		if frappe.db.get_single_value('Temporal Manager', 'debug_mode'):
-			raise KeyError(f"Temporal was unable to find Redis key with name = {week_key}")
-		return None
-	return redis_hash_to_dict(redis_hash)
+	week_dict = codec.decode(get_backend().get_hash(week_key))
+	if not week_dict:
+		return _missing_key(week_key)
+	return week_dict
+
+
+@instrument_read('week')
+def read_many_weeks(year_week_pairs):
+	""" Returns a list of Week dictionaries (empty for missing weeks), for a list of (year, week_number).  One round trip. """
+	return [ codec.decode(each) for each in get_backend().get_hashes([ _get_weekkey(year, week_number) for year, week_number in year_week_pairs ]) ]
+
+
+@instrument_read('day')
+def read_days_between(from_date, to_date):
+	"""
+	Returns a list of the Day dictionaries from 'from_date' through 'to_date' (inclusive), in date order.
+	On Redis, a single round trip per range index (a Lua script reads the Day index, then the Day hashes).
+	"""
+	return [ codec.decode(each) for each in _day_hashes_between(from_date, to_date) ]
+
+
+@instrument_read('day')
+def read_days_by_date_between(from_date, to_date):
+	"""
+	Like read_days_between(), but returns a dictionary of { date: Day dictionary }.  Each date is unpacked from its stored record,
+	so no date string is parsed.  Days stored before the packed encoding (see temporal/codec.py) are omitted.
+	"""
+	day_dicts = {}
+	for each in _day_hashes_between(from_date, to_date):
+		day_date = codec.record_date(each)
+		if day_date:
+			day_dicts[day_date] = codec.decode(each)
+	return day_dicts
+
+
+def _day_hashes_between(from_date, to_date):
+	""" The stored Day hashes from 'from_date' through 'to_date', in date order. """
+	for index_key in _index_keys_between(keys.day_index_key, from_date.year, to_date.year):
+		yield from get_backend().get_sorted_range_hashes(index_key, from_date.toordinal(), to_date.toordinal())
+
+
+@instrument_read('week')
+def read_weeks_between(from_date, to_date):
+	"""
+	Returns a list of the Week dictionaries that include any day from 'from_date' through 'to_date', in date order.
+	On Redis, a single round trip per range index (a Lua script reads the Week index, then the Week hashes).
+	"""
+	week_dicts = []
+	# A Week is labelled with the year of its final day, so the year after 'to_date' may also have one.
+	for index_key in _index_keys_between(keys.week_index_key, from_date.year, to_date.year + 1):
+		week_dicts.extend(map(codec.decode, get_backend().get_sorted_range_hashes(index_key, from_date.toordinal() - 6, to_date.toordinal())))
+	return week_dicts
+
+
+@instrument_read('index')
+def count_weekdays_between(from_date, to_date):
+	"""
+	Count the calendar days from 'from_date' through 'to_date', by day of week.  Returns a list of 7 counts, beginning with Sunday.
+	Only the Day index is read (a date's ordinal modulo 7 is its day of week, with 0 = Sunday); on Redis, inside a Lua script.
+	"""
+	counts = [0] * 7
+	for index_key in _index_keys_between(keys.day_index_key, from_date.year, to_date.year):
+		index_counts = get_backend().count_sorted_range_by_modulus(index_key, from_date.toordinal(), to_date.toordinal(), 7)
+		counts = [ total + count for total, count in zip(counts, index_counts) ]
+	return counts
+
+
+@instrument_read('week')
+def week_containing(any_date):
+	"""
+	Returns the Week dictionary that includes 'any_date', or None:  the Week with the latest start on or before that date.
+	"""
+	for index_key in _index_keys_between(keys.week_index_key, any_date.year, any_date.year + 1):
+		week_keys = get_backend().get_sorted_range(index_key, any_date.toordinal() - 6, any_date.toordinal(), reverse=True, limit=1)
+		if week_keys:
+			return codec.decode(get_backend().get_hash(week_keys[0])) or _missing_key(week_keys[0])
+	return _missing_key(f"{keys.week_index_key(any_date.year)} (week containing {any_date})")
+
+
+@instrument_read('year')
+def read_checksums(years):
+	""" Returns a dictionary of year: content checksum, for the years that have one.  One round trip. """
+	checksum_hashes = get_backend().get_hashes([ _year_to_checksumkey(year) for year in years ])
+	return { year: each['digest'] for year, each in zip(years, checksum_hashes) if each }
+
+
+def find_changed_keys(week_dicts, day_dicts, year_dict):
+	"""
+	Read one year's keys back from storage, and return the keys whose stored value differs from the expected one.
+	Not instrumented:  these reads are not calendar lookups, and would distort the hit rates in temporal.metrics.
+	"""
+	expected = { _get_weekkey(week_dict['year'], week_dict['week_number']): codec.encode_week(week_dict) for week_dict in week_dicts }
+	expected.update({ _date_to_daykey(day_dict['date']): codec.encode_day(day_dict) for day_dict in day_dicts })
+	expected[_year_to_yearkey(int(year_dict['year']))] = codec.encode_year(year_dict)
+	expected_keys = list(expected)
+	return [ key for key, stored in zip(expected_keys, get_backend().get_hashes(expected_keys)) if stored != expected[key] ]
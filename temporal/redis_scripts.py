@@ -0,0 +1,60 @@
+""" temporal/redis_scripts.py
+
+Lua scripts that answer calendar range queries inside Redis, in a single round trip (and one that releases a lock atomically).
+
+Each script is registered with redis-py once per process, then called with EVALSHA (redis-py loads it again, if Redis
+was restarted and no longer has it).  The scripts read the sorted-set indexes written by the Builder (see temporal/redis.py)
+
+Other storage backends answer the same questions in Python; see StorageBackend.get_sorted_range_hashes() and
+StorageBackend.count_sorted_range_by_modulus()
+
+NOTE:  SORTED_RANGE_HASHES reads hashes whose names come from the index, not from KEYS, which Redis does not officially
+support.  On a single Redis server this is harmless.  On Redis Cluster it works only because of the 'cluster' key scheme
+(see temporal/keys.py):  each year's index and every Day and Week it names share one hash tag, so one hash slot, and
+temporal.redis never runs the script across years.  Any new key that a script reads this way must keep that property.
+"""
+
+# Returns the hashes of the members of a sorted set, whose score is in a range.
+# KEYS[1] = sorted set    ARGV = minimum score, maximum score, key prefix of the members
+# The member hashes are not declared in KEYS; on Redis Cluster, they must be in the sorted set's hash slot (see above).
+# Each result is a flat array of field, value, field, value ... (empty when a member's hash does not exist)
+SORTED_RANGE_HASHES = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[1], ARGV[2])
+local results = {}
+for index, member in ipairs(members) do
+	results[index] = redis.call('HGETALL', ARGV[3] .. member)
+end
+return results
+"""
+
+# Counts the members of a sorted set, whose score is in a range, grouped by (score modulo N).
+# KEYS[1] = sorted set    ARGV = minimum score, maximum score, modulus N
+# Returns an array of N counts; the first is for a remainder of 0.
+COUNT_SORTED_RANGE_BY_MODULUS = """
+local scores = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[1], ARGV[2], 'WITHSCORES')
+local modulus = tonumber(ARGV[3])
+local counts = {}
+for bucket = 1, modulus do
+	counts[bucket] = 0
+end
+for index = 2, #scores, 2 do
+	local bucket = (tonumber(scores[index]) % modulus) + 1
+	counts[bucket] = counts[bucket] + 1
+end
+return counts
+"""
+
+# Deletes a lock, only if it is still held by the same token (it may have expired, and been taken by another process).
+# KEYS[1] = lock    ARGV = token
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+	return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+SCRIPTS = {
+	'sorted_range_hashes': SORTED_RANGE_HASHES,
+	'count_sorted_range_by_modulus': COUNT_SORTED_RANGE_BY_MODULUS,
+	'release_lock': RELEASE_LOCK,
+}
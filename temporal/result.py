@@ -5,8 +5,6 @@ from enum import Enum
 import json
 from typing import NamedTuple
 
-import frappe  # pylint: disable=unused-import
-
 from temporal import validate_datatype
 from temporal.helpers import dict_to_dateless_dict
 
@@ -71,11 +69,43 @@ class MessageAudience(str, Enum):
 	INTERNAL = 'Internal'
 	EXTERNAL = 'External'
 
+def _enum_lookup(enum_type):
+	"""
+	Build a dictionary that maps every accepted spelling of an Enum variant (the variant itself, its value, its name) to the variant.
+	"""
+	lookup = {}
+	for variant in enum_type:
+		lookup[variant.name] = variant
+		lookup[variant.value] = variant
+		lookup[variant.value.upper()] = variant
+	return lookup
+
+_AUDIENCE_LOOKUP = _enum_lookup(MessageAudience)
+_LEVEL_LOOKUP = _enum_lookup(MessageLevel)
+
+def coerce_enum_value(any_value, lookup, enum_type):
+	"""
+	Return the Enum variant for a value that validate_enum_value() would accept, using a dictionary lookup instead of Enum introspection.
+	"""
+	try:
+		return lookup[any_value]
+	except (KeyError, TypeError):
+		pass
+	# Slow path: strings in some other letter case ('error', 'wArNiNg')
+	if isinstance(any_value, str) and any_value.upper() in lookup:
+		return lookup[any_value.upper()]
+	validate_enum_value(any_value, enum_type)  # raises the usual TypeError for unknown strings
+	raise TypeError(f"Argument value '{any_value}' is not a type of Enum '{enum_type.__name__}'")
+
+
 class ResultMessage(NamedTuple):
+	"""
+	A single message.  Being a NamedTuple, instances have empty __slots__ and no per-instance __dict__.
+	"""
 	audience: MessageAudience
 	message_level: MessageLevel
 	message: str
-	message_tags: list  # just a flexible attribute, useful for things like taggging messages as 'header-error' or 'line-error'
+	message_tags: tuple  # just a flexible attribute, useful for things like taggging messages as 'header-error' or 'line-error'
 
 	@staticmethod
 	def new(audience: MessageAudience, level: MessageLevel, message_string: str, tags: list=None):
@@ -83,19 +113,20 @@ class ResultMessage(NamedTuple):
 		Create a new ResultMessageString
 		"""
 		if isinstance(tags, str):
-			tags = [ tags ]
+			tags = ( tags, )
 		return ResultMessage(
 			audience=audience,
 			message_level=level,
 			message=message_string,
-			message_tags=tags or []
+			message_tags=tuple(tags) if tags else ()  # every untagged message shares the same empty tuple
 		)
 
 	def has_tag(self, message_tag) -> bool:
 		return message_tag in self.message_tags
 
 	def __str__(self):
-		return f"{self.message_level} : {self.message}"
+		level = getattr(self.message_level, 'value', self.message_level)
+		return f"{level} : {self.message}"
 
 class OutcomeType(str, Enum):
 	SUCCESS = 'Success'
@@ -104,6 +135,8 @@ class OutcomeType(str, Enum):
 	INTERNAL_ERROR = 'Runtime Error'  # unhandled Exceptions
 	NONE = "None"  # used when something hasn't happened yet
 
+_FAILED_OUTCOMES = frozenset((OutcomeType.ERROR, OutcomeType.INTERNAL_ERROR))
+
 class ResultBase():  # pylint: disable=too-many-instance-attributes
 	"""
 	Extensible class for operations with Results and Related Data
@@ -113,8 +146,11 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 
 		self.outcome: OutcomeType = OutcomeType.SUCCESS
 		self._messages = []
+		# Indexes over self._messages, maintained by add_message()
+		self._messages_by_level = { each: [] for each in MessageLevel }
+		self._messages_by_tag = {}
 		self._data: dict = {}
-		self._available_message_tags = []
+		self._available_message_tags = set()  # subclasses may still assign a List; membership tests work either way.
 		self._should_raise_exceptions = False  # should the consumer of this Result throw a Python Exception?
 		self.runtime_exception = None
 
@@ -145,7 +181,7 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 		"""
 		if self.runtime_exception:
 			return False
-		return (self.outcome not in {OutcomeType.ERROR, OutcomeType.INTERNAL_ERROR})
+		return self.outcome not in _FAILED_OUTCOMES
 
 	def as_dict(self) -> dict:
 		return {
@@ -165,7 +201,7 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 		return self.as_json()
 
 	def should_raise_exceptions(self) -> bool:
-		if self.outcome in (OutcomeType.ERROR, OutcomeType.INTERNAL_ERROR):
+		if self.outcome in _FAILED_OUTCOMES:
 			return True
 		if self._should_raise_exceptions:
 			return True
@@ -176,18 +212,22 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 	# Message Functions
 	def add_message(self, audience, message_level, message_string, tags=None):
 
-		validate_enum_value(audience, MessageAudience)
-		validate_enum_value(message_level, MessageLevel)
+		# Strings such as 'error' are normalized to their Enum variant, so the level index below has one key per level.
+		audience = coerce_enum_value(audience, _AUDIENCE_LOOKUP, MessageAudience)
+		message_level = coerce_enum_value(message_level, _LEVEL_LOOKUP, MessageLevel)
 
 		# Validate the tags
 		if tags:
 			if isinstance(tags, str):
-				tags = [ tags ]
+				tags = ( tags, )
 			for each_tag in tags:
 				if each_tag not in self._available_message_tags:
 					raise ValueError(f"Invalid tag value '{each_tag}' passed to ResultBase.add_message()")
 		new_message = ResultMessage.new(audience=audience, level=message_level, message_string=message_string, tags=tags)
 		self._messages.append(new_message)
+		self._messages_by_level[message_level].append(new_message)
+		for each_tag in new_message.message_tags:
+			self._messages_by_tag.setdefault(each_tag, []).append(new_message)
 		# Error Message leads to Error Outcome
 		if message_level == MessageLevel.ERROR:
 			self.outcome: OutcomeType = OutcomeType.ERROR
@@ -196,13 +236,28 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 		return self._messages
 
 	def get_error_messages(self):
-		return [ each for each in self._messages if each.message_level == 'Error']  # MessageLevel.ERROR
+		return list(self._messages_by_level[MessageLevel.ERROR])
 
 	def get_warning_messages(self):
-		return [ each for each in self._messages if each.message_level == 'Warning']  # MessageLevel.WARNING
+		return list(self._messages_by_level[MessageLevel.WARNING])
 
 	def get_info_messages(self):
-		return [ each for each in self._messages if each.message_level == 'Info']  # MessageLevel.INFO
+		return list(self._messages_by_level[MessageLevel.INFO])
+
+	def get_messages_by_tag(self, message_tag):
+		return list(self._messages_by_tag.get(message_tag, ()))
+
+	def count_messages(self, message_level=None) -> int:
+		"""
+		Number of messages, optionally for a single level.  Does not scan the messages.
+		"""
+		if message_level is None:
+			return len(self._messages)
+		message_level = coerce_enum_value(message_level, _LEVEL_LOOKUP, MessageLevel)
+		return len(self._messages_by_level[message_level])
+
+	def count_messages_by_tag(self, message_tag) -> int:
+		return len(self._messages_by_tag.get(message_tag, ()))
 
 	# Common Response Schema
 
@@ -210,7 +265,7 @@ class ResultBase():  # pylint: disable=too-many-instance-attributes
 		"""
 		Add this result's data to a Common Response Schmea for the FTP Middleware.
 		"""
-		converted_dict = dict_to_dateless_dict(self.get_data())  # NOTE: function already handles a deepcopy
+		converted_dict = dict_to_dateless_dict(self.get_data())  # NOTE: only containers holding dates are copied; self._data is not modified.
 
 		for key, value in converted_dict.items():
 			crs_instance.add_data(key, value)  # important to send as JSON, to convert things like Date and DateTime to string.
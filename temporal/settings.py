@@ -0,0 +1,52 @@
+""" temporal/settings.py
+
+The settings of DocType 'Temporal Manager', read from the database once per request (or background job).
+
+The values are kept on 'frappe.local', which Frappe discards at the end of every request and job.  Saving 'Temporal Manager'
+also discards them (see TemporalManager.on_update), so the process that saved reads the new values immediately.
+"""
+
+# Standard Library
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Frappe
+import frappe
+
+TemporalSettings = namedtuple('TemporalSettings', ['debug_mode', 'start_year', 'end_year'])
+_LOCAL_ATTRIBUTE = 'temporal_settings'
+
+
+def get_settings():
+	""" Returns the TemporalSettings for this request.  The start and end years are None when blank. """
+	settings = getattr(frappe.local, _LOCAL_ATTRIBUTE, None)
+	if settings is None:
+		settings = load_settings()
+		setattr(frappe.local, _LOCAL_ATTRIBUTE, settings)
+	return settings
+
+
+def load_settings():
+	""" Read the settings from the database. """
+	def get_value(fieldname):
+		return frappe.db.get_single_value('Temporal Manager', fieldname)
+
+	return TemporalSettings(debug_mode=bool(get_value('debug_mode')),
+	                        start_year=int(get_value('start_year') or 0) or None,
+	                        end_year=int(get_value('end_year') or 0) or None)
+
+
+def clear_settings():
+	""" Forget the settings, so that the next call to get_settings() reads them again. """
+	if getattr(frappe.local, _LOCAL_ATTRIBUTE, None) is not None:
+		setattr(frappe.local, _LOCAL_ATTRIBUTE, None)
+
+
+@contextmanager
+def use_settings(temporal_settings):
+	""" Use 'temporal_settings' instead of the database's, until the block exits (e.g. for benchmarks) """
+	setattr(frappe.local, _LOCAL_ATTRIBUTE, temporal_settings)
+	try:
+		yield temporal_settings
+	finally:
+		clear_settings()
@@ -0,0 +1,603 @@
+""" temporal/storage.py
+
+Storage backends for the Temporal calendar (days, weeks, years).
+
+temporal.redis reads and writes exclusively through get_backend(), which returns one of:
+	RedisBackend	The site's Redis cache, via frappe.cache().  This is the default.
+	MemoryBackend	Python dictionaries, private to the current process.  For tests and local tools.
+	SQLiteBackend	A SQLite database file.  Survives restarts, and can be shared by processes on one host.
+
+Choose a backend with site config:
+	bench --site <sitename> set-config temporal_storage_backend sqlite
+	bench --site <sitename> set-config temporal_sqlite_path /path/to/temporal.sqlite3   (optional)
+
+With Redis, calendar reads can be sent to read replicas of the site's Redis cache (round-robin, failing over to the primary).
+Writes, and all reads by the Builder, always go to the primary:
+	bench --site <sitename> set-config temporal_redis_replicas '["redis://replica-1:13000", "redis://replica-2:13000"]'
+
+Or, from Python (tests, scripts, benchmarks):  temporal.storage.set_backend(MemoryBackend())
+
+Every backend stores the same logical data: hashes (a dictionary of field -> value), sets (of strings), and sorted sets
+(strings, each with a numeric score; used as range indexes), plus locks that expire.
+Hash values may be any picklable Python value; hash fields and set members are returned as strings.
+"""
+
+# Standard Library
+from contextlib import contextmanager
+import itertools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_BACKEND = 'redis'
+REPLICA_SOCKET_TIMEOUT = 0.5  # seconds; a replica that does not answer in time is skipped
+REPLICA_RETRY_SECONDS = 30  # after a replica fails, it is not tried again for this long
+
+_override_backend = None  # set by set_backend(); takes precedence over site config
+_backends = {}  # cache of backend instances, by (name, path)
+
+
+class StorageBackend():
+	""" Interface for Temporal storage backends. """
+	name = None
+
+	def get_hash(self, key):
+		""" Returns a dictionary for the hash 'key', or an empty dictionary if it does not exist. """
+		raise NotImplementedError
+
+	def get_hashes(self, keys):
+		""" Returns a list of dictionaries, in the same order as 'keys'.  Backends should fetch these in one round trip. """
+		return [ self.get_hash(key) for key in keys ]
+
+	def set_hash(self, key, mapping):
+		""" Replace the entire hash 'key' with 'mapping'. """
+		self.set_hashes({ key: mapping })
+
+	def set_hashes(self, mappings):
+		""" Replace several hashes.  'mappings' is a dictionary of key: mapping """
+		raise NotImplementedError
+
+	def update_hash(self, key, field, value):
+		""" Set a single field in an existing hash. """
+		raise NotImplementedError
+
+	def delete(self, *keys):
+		raise NotImplementedError
+
+	def get_set(self, key):
+		""" Returns a Python set of strings. """
+		raise NotImplementedError
+
+	def set_set(self, key, members):
+		""" Replace the entire set 'key' with 'members'. """
+		raise NotImplementedError
+
+	def add_to_set(self, key, members):
+		""" Add 'members' to the set 'key', keeping its existing members. """
+		raise NotImplementedError
+
+	def remove_from_set(self, key, members):
+		raise NotImplementedError
+
+	def acquire_lock(self, key, seconds):
+		"""
+		Take the lock 'key' for at most 'seconds', unless it is already held (by any process).
+		Returns a token for release_lock(), or None when the lock is held.
+		"""
+		raise NotImplementedError
+
+	def release_lock(self, key, token):
+		""" Release the lock 'key', if 'token' still holds it. """
+		raise NotImplementedError
+
+	@contextmanager
+	def use_primary(self):
+		""" Within this block, the current thread reads from the primary (not from replicas).  For read-then-write work, like the Builder. """
+		yield
+
+	def add_to_sorted_set(self, key, scores):
+		""" Add members to the sorted set 'key' (or update their scores).  'scores' is a dictionary of member: score """
+		raise NotImplementedError
+
+	def remove_from_sorted_set(self, key, members):
+		raise NotImplementedError
+
+	def get_sorted_range(self, key, min_score, max_score, reverse=False, limit=None):
+		"""
+		Returns a list of the members whose score is between 'min_score' and 'max_score' (inclusive), ordered by score.
+		With 'reverse', the highest scores come first.  With 'limit', at most that many members are returned.
+		"""
+		raise NotImplementedError
+
+	def get_sorted_range_hashes(self, key, min_score, max_score):
+		"""
+		Returns a list of the hashes named by the members of sorted set 'key' whose score is between 'min_score' and 'max_score'.
+		Ordered by score.  Members whose hash does not exist are omitted.
+		"""
+		return [ each for each in self.get_hashes(self.get_sorted_range(key, min_score, max_score)) if each ]
+
+	def count_sorted_range_by_modulus(self, key, min_score, max_score, modulus):
+		"""
+		Count the members of sorted set 'key' whose score is between 'min_score' and 'max_score', grouped by (score % modulus).
+		Returns a list of 'modulus' counts; the first is for a remainder of 0.
+		"""
+		raise NotImplementedError
+
+
+class RedisBackend(StorageBackend):
+	"""
+	Stores the calendar in Redis.  Values are pickled, exactly like Frappe's RedisWrapper, so existing keys remain readable.
+
+	By default this uses the site's Redis cache (frappe.cache()), and Frappe's key prefix.
+	Alternately, pass any redis-py compatible 'client' and an optional 'key_prefix' (e.g. for fakeredis, or tools outside Frappe).
+
+	'replicas' is an optional list of read replicas:  Redis URLs, or clients.  Reads are spread across them round-robin.
+	A replica that fails is skipped for REPLICA_RETRY_SECONDS; when none is available, reads go to the primary.
+	"""
+	name = 'redis'
+
+	def __init__(self, client=None, key_prefix=None, replicas=None):
+		self._client = client
+		self.key_prefix = key_prefix
+		self._scripts = {}  # name : redis.commands.core.Script
+		self.replicas = [ self._connect_replica(each) if isinstance(each, str) else each for each in (replicas or ()) ]
+		self._replica_down_until = [0.0] * len(self.replicas)
+		self._round_robin = itertools.count()
+		self._thread_state = threading.local()
+
+	@property
+	def client(self):
+		if self._client is not None:
+			return self._client
+		import frappe  # pylint: disable=import-outside-toplevel
+		return frappe.cache()
+
+	def make_key(self, key):
+		if self._client is None:
+			return self.client.make_key(key)  # Frappe's RedisWrapper adds the site's database name.
+		if self.key_prefix:
+			return f"{self.key_prefix}|{key}"
+		return key
+
+	@staticmethod
+	def _connect_replica(url):
+		import redis  # pylint: disable=import-outside-toplevel
+		return redis.Redis.from_url(url, socket_timeout=REPLICA_SOCKET_TIMEOUT, socket_connect_timeout=REPLICA_SOCKET_TIMEOUT)
+
+	@contextmanager
+	def use_primary(self):
+		self._thread_state.primary_depth = getattr(self._thread_state, 'primary_depth', 0) + 1
+		try:
+			yield
+		finally:
+			self._thread_state.primary_depth -= 1
+
+	def _read(self, command):
+		""" Returns command(client), run on the next available replica.  Fails over to the other replicas, then the primary. """
+		if not self.replicas or getattr(self._thread_state, 'primary_depth', 0):
+			return command(self.client)
+		import redis  # pylint: disable=import-outside-toplevel
+		start = next(self._round_robin)
+		for offset in range(len(self.replicas)):
+			index = (start + offset) % len(self.replicas)
+			if self._replica_down_until[index] > time.monotonic():
+				continue
+			try:
+				return command(self.replicas[index])
+			except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as ex:
+				print(f"Warning: Temporal read replica {index} failed ({ex}); skipping it for {REPLICA_RETRY_SECONDS} seconds.")
+				self._replica_down_until[index] = time.monotonic() + REPLICA_RETRY_SECONDS
+		return command(self.client)
+
+	@staticmethod
+	def _run(client, command, *args, **kwargs):
+		"""
+		Returns the result of one Redis command, sent through a pipeline.  Frappe's RedisWrapper overrides methods such as
+		hgetall() and sadd() to add its key prefix and pickle values; its pipelines are plain redis-py, like every key here.
+		"""
+		pipeline = client.pipeline(transaction=False)
+		getattr(pipeline, command)(*args, **kwargs)
+		return pipeline.execute()[0]
+
+	@staticmethod
+	def decode_hash(redis_hash):
+		return { (field.decode() if isinstance(field, bytes) else field): pickle.loads(value)
+		         for field, value in redis_hash.items() }
+
+	def get_hash(self, key):
+		redis_key = self.make_key(key)
+		result = self._read(lambda client: self._run(client, 'hgetall', redis_key))
+		if not result and self.replicas:
+			result = self._run(self.client, 'hgetall', redis_key)  # a replica may not have the Builder's latest writes yet
+		return self.decode_hash(result)
+
+	def get_hashes(self, keys):
+		redis_keys = [ self.make_key(key) for key in keys ]
+		def command(client):
+			pipeline = client.pipeline(transaction=False)
+			for redis_key in redis_keys:
+				pipeline.hgetall(redis_key)
+			return pipeline.execute()
+		results = self._read(command)
+		if self.replicas and not all(results):
+			results = command(self.client)  # a replica may not have the Builder's latest writes yet
+		return [ self.decode_hash(each) for each in results ]
+
+	def set_hashes(self, mappings):
+		pipeline = self.client.pipeline(transaction=False)
+		for key, mapping in mappings.items():
+			redis_key = self.make_key(key)
+			pipeline.delete(redis_key)
+			if mapping:
+				pipeline.hset(redis_key, mapping={ field: pickle.dumps(value) for field, value in mapping.items() })
+		pipeline.execute()
+
+	def update_hash(self, key, field, value):
+		self._run(self.client, 'hset', self.make_key(key), field, pickle.dumps(value))
+
+	def delete(self, *keys):
+		if keys:
+			self._run(self.client, 'delete', *[ self.make_key(key) for key in keys ])
+
+	def get_set(self, key):
+		redis_key = self.make_key(key)
+		return { (member.decode() if isinstance(member, bytes) else member)
+		         for member in self._read(lambda client: self._run(client, 'smembers', redis_key)) }
+
+	def set_set(self, key, members):
+		redis_key = self.make_key(key)
+		pipeline = self.client.pipeline(transaction=False)
+		pipeline.delete(redis_key)
+		if members:
+			pipeline.sadd(redis_key, *members)
+		pipeline.execute()
+
+	def add_to_set(self, key, members):
+		if members:
+			self._run(self.client, 'sadd', self.make_key(key), *members)
+
+	def remove_from_set(self, key, members):
+		if members:
+			self._run(self.client, 'srem', self.make_key(key), *members)
+
+	def acquire_lock(self, key, seconds):
+		token = uuid.uuid4().hex
+		if self._run(self.client, 'set', self.make_key(key), token, nx=True, ex=max(1, int(seconds))):
+			return token
+		return None
+
+	def release_lock(self, key, token):
+		self._script('release_lock')(keys=[ self.make_key(key) ], args=[ token ], client=self.client)
+
+	def add_to_sorted_set(self, key, scores):
+		if scores:
+			self._run(self.client, 'zadd', self.make_key(key), scores)
+
+	def remove_from_sorted_set(self, key, members):
+		if members:
+			self._run(self.client, 'zrem', self.make_key(key), *members)
+
+	def get_sorted_range(self, key, min_score, max_score, reverse=False, limit=None):
+		redis_key = self.make_key(key)
+		paging = { 'start': 0, 'num': limit } if limit else {}
+		if reverse:
+			members = self._read(lambda client: self._run(client, 'zrevrangebyscore', redis_key, max_score, min_score, **paging))
+		else:
+			members = self._read(lambda client: self._run(client, 'zrangebyscore', redis_key, min_score, max_score, **paging))
+		return [ (member.decode() if isinstance(member, bytes) else member) for member in members ]
+
+	def run_script(self, name, keys, args):
+		"""
+		Run one of the (read-only) Lua scripts in temporal.redis_scripts.  Registered once; afterwards, called with EVALSHA.
+		"""
+		script = self._script(name)
+		redis_keys = [ self.make_key(key) for key in keys ]
+		return self._read(lambda client: script(keys=redis_keys, args=args, client=client))
+
+	def _script(self, name):
+		script = self._scripts.get(name)
+		if script is None:
+			from temporal.redis_scripts import SCRIPTS  # pylint: disable=import-outside-toplevel
+			script = self._scripts[name] = self.client.register_script(SCRIPTS[name])
+		return script
+
+	def get_sorted_range_hashes(self, key, min_score, max_score):
+		member_prefix = self.make_key('')  # members are unprefixed key names
+		results = self.run_script('sorted_range_hashes', [ key ], [ min_score, max_score, member_prefix ])
+		return [ self.decode_hash(dict(zip(each[::2], each[1::2]))) for each in results if each ]
+
+	def count_sorted_range_by_modulus(self, key, min_score, max_score, modulus):
+		return [ int(count) for count in self.run_script('count_sorted_range_by_modulus', [ key ], [ min_score, max_score, modulus ]) ]
+
+
+class MemoryBackend(StorageBackend):
+	"""
+	Stores the calendar in Python dictionaries.  Nothing is shared between processes.
+	"""
+	name = 'memory'
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.hashes = {}
+		self.sets = {}
+		self.sorted_sets = {}  # key : { member : score }
+		self.locks = {}  # key : (token, expires at)
+
+	def get_hash(self, key):
+		return dict(self.hashes.get(key, {}))  # a copy, so callers cannot modify the stored hash
+
+	def set_hashes(self, mappings):
+		with self._lock:
+			for key, mapping in mappings.items():
+				self.hashes.pop(key, None)
+				if mapping:
+					self.hashes[key] = { str(field): value for field, value in mapping.items() }
+
+	def update_hash(self, key, field, value):
+		with self._lock:
+			self.hashes.setdefault(key, {})[str(field)] = value
+
+	def delete(self, *keys):
+		with self._lock:
+			for key in keys:
+				self.hashes.pop(key, None)
+				self.sets.pop(key, None)
+				self.sorted_sets.pop(key, None)
+
+	def get_set(self, key):
+		return set(self.sets.get(key, set()))
+
+	def set_set(self, key, members):
+		with self._lock:
+			self.sets.pop(key, None)
+			if members:
+				self.sets[key] = { str(member) for member in members }
+
+	def add_to_set(self, key, members):
+		with self._lock:
+			self.sets.setdefault(key, set()).update(str(member) for member in members)
+
+	def remove_from_set(self, key, members):
+		with self._lock:
+			existing = self.sets.get(key, set())
+			existing.difference_update(str(member) for member in members)
+			if not existing:
+				self.sets.pop(key, None)
+
+	def acquire_lock(self, key, seconds):
+		with self._lock:
+			if key in self.locks and self.locks[key][1] > time.monotonic():
+				return None
+			token = uuid.uuid4().hex
+			self.locks[key] = (token, time.monotonic() + seconds)
+			return token
+
+	def release_lock(self, key, token):
+		with self._lock:
+			if key in self.locks and self.locks[key][0] == token:
+				del self.locks[key]
+
+	def add_to_sorted_set(self, key, scores):
+		with self._lock:
+			self.sorted_sets.setdefault(key, {}).update({ str(member): score for member, score in scores.items() })
+
+	def remove_from_sorted_set(self, key, members):
+		with self._lock:
+			existing = self.sorted_sets.get(key, {})
+			for member in members:
+				existing.pop(str(member), None)
+			if not existing:
+				self.sorted_sets.pop(key, None)
+
+	def get_sorted_range(self, key, min_score, max_score, reverse=False, limit=None):
+		with self._lock:
+			matches = [ (score, member) for member, score in self.sorted_sets.get(key, {}).items() if min_score <= score <= max_score ]
+		matches.sort(reverse=reverse)  # like Redis, members with equal scores are ordered lexicographically
+		return [ member for _, member in matches[:limit] ]
+
+	def count_sorted_range_by_modulus(self, key, min_score, max_score, modulus):
+		counts = [0] * modulus
+		with self._lock:
+			for score in self.sorted_sets.get(key, {}).values():
+				if min_score <= score <= max_score:
+					counts[int(score) % modulus] += 1
+		return counts
+
+
+class SQLiteBackend(StorageBackend):
+	"""
+	Stores the calendar in a SQLite database file.  Values are pickled.
+	"""
+	name = 'sqlite'
+
+	def __init__(self, path):
+		self.path = path
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+		self._connection.execute("PRAGMA journal_mode=WAL")  # readers in other processes are not blocked by the Builder
+		self._connection.execute("CREATE TABLE IF NOT EXISTS temporal_hash (key TEXT NOT NULL, field TEXT NOT NULL, value BLOB, PRIMARY KEY (key, field))")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS temporal_set (key TEXT NOT NULL, member TEXT NOT NULL, PRIMARY KEY (key, member))")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS temporal_sorted_set (key TEXT NOT NULL, member TEXT NOT NULL, score REAL NOT NULL, PRIMARY KEY (key, member))")
+		self._connection.execute("CREATE INDEX IF NOT EXISTS temporal_sorted_set_score ON temporal_sorted_set (key, score)")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS temporal_lock (key TEXT NOT NULL PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)")
+
+	def get_hash(self, key):
+		with self._lock:
+			rows = self._connection.execute("SELECT field, value FROM temporal_hash WHERE key = ?", (key,)).fetchall()
+		return { field: pickle.loads(value) for field, value in rows }
+
+	def get_hashes(self, keys):
+		if not keys:
+			return []
+		results = { key: {} for key in keys }
+		with self._lock:
+			for offset in range(0, len(keys), 500):  # stay under SQLite's limit on bound parameters
+				chunk = keys[offset:offset + 500]
+				placeholders = ",".join("?" * len(chunk))
+				query = f"SELECT key, field, value FROM temporal_hash WHERE key IN ({placeholders})"
+				for key, field, value in self._connection.execute(query, tuple(chunk)):
+					results[key][field] = pickle.loads(value)
+		return [ dict(results[key]) for key in keys ]
+
+	def set_hashes(self, mappings):
+		rows = [ (key, str(field), pickle.dumps(value)) for key, mapping in mappings.items() for field, value in mapping.items() ]
+		with self._lock:
+			with self._transaction():
+				self._connection.executemany("DELETE FROM temporal_hash WHERE key = ?", [ (key,) for key in mappings ])
+				self._connection.executemany("INSERT INTO temporal_hash (key, field, value) VALUES (?, ?, ?)", rows)
+
+	def update_hash(self, key, field, value):
+		with self._lock:
+			self._connection.execute("INSERT OR REPLACE INTO temporal_hash (key, field, value) VALUES (?, ?, ?)",
+			                         (key, str(field), pickle.dumps(value)))
+
+	def delete(self, *keys):
+		with self._lock:
+			with self._transaction():
+				self._connection.executemany("DELETE FROM temporal_hash WHERE key = ?", [ (key,) for key in keys ])
+				self._connection.executemany("DELETE FROM temporal_set WHERE key = ?", [ (key,) for key in keys ])
+				self._connection.executemany("DELETE FROM temporal_sorted_set WHERE key = ?", [ (key,) for key in keys ])
+
+	def get_set(self, key):
+		with self._lock:
+			rows = self._connection.execute("SELECT member FROM temporal_set WHERE key = ?", (key,)).fetchall()
+		return { row[0] for row in rows }
+
+	def set_set(self, key, members):
+		with self._lock:
+			with self._transaction():
+				self._connection.execute("DELETE FROM temporal_set WHERE key = ?", (key,))
+				self._connection.executemany("INSERT INTO temporal_set (key, member) VALUES (?, ?)",
+				                             [ (key, str(member)) for member in set(members) ])
+
+	def add_to_set(self, key, members):
+		with self._lock:
+			self._connection.executemany("INSERT OR IGNORE INTO temporal_set (key, member) VALUES (?, ?)",
+			                             [ (key, str(member)) for member in set(members) ])
+
+	def remove_from_set(self, key, members):
+		with self._lock:
+			self._connection.executemany("DELETE FROM temporal_set WHERE key = ? AND member = ?",
+			                             [ (key, str(member)) for member in set(members) ])
+
+	def acquire_lock(self, key, seconds):
+		token = uuid.uuid4().hex
+		with self._lock:
+			with self._transaction():
+				self._connection.execute("DELETE FROM temporal_lock WHERE key = ? AND expires <= ?", (key, time.time()))
+				inserted = self._connection.execute("INSERT OR IGNORE INTO temporal_lock (key, token, expires) VALUES (?, ?, ?)",
+				                                    (key, token, time.time() + seconds)).rowcount
+		return token if inserted else None
+
+	def release_lock(self, key, token):
+		with self._lock:
+			self._connection.execute("DELETE FROM temporal_lock WHERE key = ? AND token = ?", (key, token))
+
+	def add_to_sorted_set(self, key, scores):
+		with self._lock:
+			self._connection.executemany("INSERT OR REPLACE INTO temporal_sorted_set (key, member, score) VALUES (?, ?, ?)",
+			                             [ (key, str(member), score) for member, score in scores.items() ])
+
+	def remove_from_sorted_set(self, key, members):
+		with self._lock:
+			self._connection.executemany("DELETE FROM temporal_sorted_set WHERE key = ? AND member = ?",
+			                             [ (key, str(member)) for member in set(members) ])
+
+	def get_sorted_range(self, key, min_score, max_score, reverse=False, limit=None):
+		direction = "DESC" if reverse else "ASC"
+		query = ("SELECT member FROM temporal_sorted_set WHERE key = ? AND score BETWEEN ? AND ? "
+		         f"ORDER BY score {direction}, member {direction} LIMIT ?")
+		with self._lock:
+			rows = self._connection.execute(query, (key, min_score, max_score, limit or -1)).fetchall()
+		return [ row[0] for row in rows ]
+
+	def count_sorted_range_by_modulus(self, key, min_score, max_score, modulus):
+		query = ("SELECT CAST(score AS INTEGER) % ?, COUNT(*) FROM temporal_sorted_set WHERE key = ? AND score BETWEEN ? AND ? "
+		         "GROUP BY 1")
+		counts = [0] * modulus
+		with self._lock:
+			for remainder, count in self._connection.execute(query, (modulus, key, min_score, max_score)):
+				counts[remainder] = count
+		return counts
+
+	def _transaction(self):
+		return _SQLiteTransaction(self._connection)
+
+
+class _SQLiteTransaction():
+	""" BEGIN/COMMIT around a block, with ROLLBACK on errors.  (The connection runs in autocommit mode otherwise.) """
+	def __init__(self, connection):
+		self.connection = connection
+
+	def __enter__(self):
+		self.connection.execute("BEGIN")
+		return self.connection
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+		return False
+
+
+# ----------------
+# Backend Selection
+# ----------------
+
+def set_backend(backend):
+	"""
+	Use 'backend' for all Temporal reads and writes in this process, regardless of site config.  Pass None to return to site config.
+	"""
+	global _override_backend  # pylint: disable=global-statement
+	if backend is not None and not isinstance(backend, StorageBackend):
+		raise TypeError("Argument 'backend' should be an instance of StorageBackend.")
+	_override_backend = backend
+
+
+def _site_config():
+	import frappe  # pylint: disable=import-outside-toplevel
+	try:
+		return frappe.local.conf or {}
+	except (AttributeError, RuntimeError):  # no site is initialized
+		return {}
+
+
+def _current_site():
+	import frappe  # pylint: disable=import-outside-toplevel
+	return getattr(frappe.local, 'site', None)
+
+
+def _default_sqlite_path():
+	import frappe  # pylint: disable=import-outside-toplevel
+	return os.path.join(frappe.get_site_path('private'), 'temporal.sqlite3')
+
+
+def get_backend():
+	""" Returns the StorageBackend for this process and site. """
+	if _override_backend is not None:
+		return _override_backend
+
+	site_config = _site_config()
+	name = site_config.get('temporal_storage_backend') or DEFAULT_BACKEND
+	path = None
+	if name == 'sqlite':
+		path = site_config.get('temporal_sqlite_path') or _default_sqlite_path()
+	elif name == 'memory':
+		path = _current_site()  # one calendar per site, even when a process serves several sites
+	elif name == 'redis':
+		replicas = site_config.get('temporal_redis_replicas') or ()
+		path = (replicas,) if isinstance(replicas, str) else tuple(replicas)  # the replica URLs
+
+	backend = _backends.get((name, path))
+	if backend is None:
+		if name == 'redis':
+			backend = RedisBackend(replicas=path)
+		elif name == 'memory':
+			backend = MemoryBackend()
+		elif name == 'sqlite':
+			backend = SQLiteBackend(path)
+		else:
+			raise ValueError(f"Unknown value '{name}' for site config 'temporal_storage_backend' (expected redis, memory, or sqlite)")
+		_backends[(name, path)] = backend  # NOTE: the Redis backend resolves frappe.cache() and the key prefix per call
+	return backend
@@ -3,7 +3,12 @@
 
 import frappe
 from frappe.model.document import Document
-from temporal import TDate
+from temporal import TDate, WEEKDAYS_SUN0, any_to_date, week_tuples_between
+
+# Rows per multi-row INSERT (and per commit) when populating the table.
+DATES_INSERT_BATCH_SIZE = 1000
+DATES_TABLE_FIELDS = ("name", "creation", "modified", "modified_by", "owner", "docstatus", "idx",
+                      "calendar_date", "day_name", "scalar_value", "week_number")
 
 class TemporalDates(Document):
 
@@ -48,3 +53,73 @@ def populate_week_numbers():
 			frappe.db.commit()
 		except Exception as ex:
 			print(repr(ex))
+
+
+def rebuild_dates_table(start_date, end_date, truncate=False, batch_size=DATES_INSERT_BATCH_SIZE):
+	"""
+	Populate `tabTemporal Dates` for an inclusive range of dates, and return the number of rows inserted.
+
+	Rows are generated in Python with every column filled in (including week_number), and written with multi-row INSERTs.
+	Unless 'truncate' is True, dates already in the table are kept, and only the missing ones are inserted.  So extending
+	the range by one year only writes that year's rows.
+
+		bench execute --args "['2051-01-01', '2051-12-31']" temporal.temporal_core.doctype.temporal_dates.temporal_dates.rebuild_dates_table
+	"""
+	start_date = any_to_date(start_date)
+	end_date = any_to_date(end_date)
+	if start_date > end_date:
+		raise ValueError("Argument 'start_date' cannot be greater than argument 'end_date'")
+
+	if truncate:
+		frappe.db.sql("TRUNCATE TABLE `tabTemporal Dates`")
+		existing_dates = set()
+		anchor = None
+	else:
+		existing_dates = set(frappe.db.sql_list("""SELECT calendar_date FROM `tabTemporal Dates`
+		                                            WHERE calendar_date BETWEEN %(start_date)s AND %(end_date)s""",
+		                                         values={"start_date": start_date, "end_date": end_date}))
+		anchor = get_scalar_anchor()
+
+	rows = []
+	row_count = 0
+	for row in dates_table_rows(start_date, end_date, anchor, existing_dates, frappe.utils.now(), frappe.session.user):
+		rows.append(row)
+		if len(rows) >= batch_size:
+			row_count += _insert_dates(rows)
+			rows = []
+	if rows:
+		row_count += _insert_dates(rows)
+	return row_count
+
+
+def dates_table_rows(start_date, end_date, anchor, existing_dates, timestamp, user):
+	"""
+	Generator of the rows (values for DATES_TABLE_FIELDS) of `tabTemporal Dates` for an inclusive range of dates, except 'existing_dates'.
+	'anchor' is from get_scalar_anchor();  without one, the scalar values begin with 1 on 'start_date'.
+	"""
+	# Scalar values have no gaps between days, and continue from the rows already in the table.
+	anchor_ordinal, anchor_scalar = anchor or (start_date.toordinal(), 1)
+	for calendar_date, _, week_number in week_tuples_between(start_date, end_date):
+		if calendar_date in existing_dates:
+			continue
+		ordinal = calendar_date.toordinal()
+		yield (calendar_date.isoformat(), timestamp, timestamp, user, user, 0, 0,
+		       calendar_date, WEEKDAYS_SUN0[ordinal % 7]['name_long'], anchor_scalar + (ordinal - anchor_ordinal), week_number)
+
+
+def get_scalar_anchor():
+	"""
+	Returns a tuple (date ordinal, scalar_value) of the first row in `tabTemporal Dates` that has a scalar value, or None.
+	Because scalar values have no gaps, every other date's value is:  scalar_value + (its ordinal - date ordinal)
+	"""
+	anchor = frappe.db.sql("""SELECT calendar_date, scalar_value FROM `tabTemporal Dates`
+	                          WHERE scalar_value IS NOT NULL ORDER BY calendar_date LIMIT 1""")
+	if not anchor:
+		return None
+	return any_to_date(anchor[0][0]).toordinal(), int(anchor[0][1])
+
+
+def _insert_dates(rows):
+	frappe.db.bulk_insert("Temporal Dates", fields=DATES_TABLE_FIELDS, values=rows, ignore_duplicates=True)
+	frappe.db.commit()
+	return len(rows)
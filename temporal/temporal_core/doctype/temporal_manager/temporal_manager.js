@@ -2,6 +2,27 @@
 // For license information, please see license.txt
 
 frappe.ui.form.on('Temporal Manager', {
+	onload: function(frm) {
+		// Progress of the background rebuild (temporal.rebuild_job)
+		frappe.realtime.on('temporal_rebuild_progress', (data) => {
+			if (data.status === 'complete') {
+				frm.dashboard.hide_progress();
+				frappe.show_alert({message: __('Finished rebuilding Redis Calendar.'), indicator: 'green'});
+				return;
+			}
+			if (data.status === 'failed') {
+				frm.dashboard.hide_progress();
+				frappe.show_alert({message: __('Rebuilding the Redis Calendar failed.  Click Rebuild to resume.'), indicator: 'red'});
+				return;
+			}
+			let description = data.message;
+			if (data.keys_per_second) {
+				description += ` (${data.keys_per_second} keys/sec, about ${data.eta_seconds} seconds remaining)`;
+			}
+			frm.dashboard.show_progress(__('Rebuilding Redis Calendar'), data.percent, description);
+		});
+	},
+
 	refresh: function(frm) {
 
 	},
@@ -7,7 +7,6 @@
 from __future__ import unicode_literals
 
 import datetime
-import pathlib
 
 import frappe
 from frappe import _
@@ -19,6 +18,10 @@ from frappe.model.document import Document
 
 class TemporalManager(Document):
 	""" This DocType just provides a mechanism for displaying buttons on the page. """
+	def on_update(self):
+		from temporal.settings import clear_settings
+		clear_settings()  # see temporal/settings.py
+
 	@frappe.whitelist()
 	def button_show_weeks(self):
 		frappe.msgprint(_("DEBUG: Calling frappe.publish_realtime.  This should open a dialog, but it does not (known bug 4 June 2021)"))
@@ -26,65 +29,76 @@ class TemporalManager(Document):
 
 	@frappe.whitelist()
 	def button_rebuild_calendar_cache(self):
-		""" Create a calendar records in Redis.
+		""" Create a calendar records in Redis, using a background job (see temporal.rebuild_job)
 		    * Start and End Years will default from the DocType 'Temporal Manager'
 			* If no values exist in 'Temporal Manager', there are hard-coded values in temporal.Builder()
+			* Only years added to (or removed from) the range already in Redis are written (or deleted).
+			* If a previous rebuild of the same range did not finish, it resumes where it stopped.
 		"""
-		from temporal import Builder
-		Builder.build_all()
-		frappe.msgprint(_("Finished rebuilding Redis Calendar."))
+		self._enqueue_rebuild(incremental=True)
 
 	@frappe.whitelist()
-	def button_rebuild_temporal_dates(self):
-		"""
-			Open the .SQL file in the module, and execute to populate `tabTemporal Dates`
+	def button_full_rebuild_calendar_cache(self):
+		""" Rewrite every year of the calendar in Redis, using a background job.  Repairs keys that are missing, damaged, or
+		    were written by an older version of Temporal (which an incremental rebuild leaves alone).
 		"""
-		print("Rebuilding the Temporal Dates table...")
-
-		this_path = pathlib.Path(__file__)  # path to this Python module
-		query_path = this_path.parent / 'rebuild_dates_table.sql'
-		if not query_path.exists():
-			raise FileNotFoundError(f"Cannot ready query file '{query_path}'")
-
-		frappe.db.sql("TRUNCATE TABLE `tabTemporal Dates`;")
-
-		start_date = datetime.date(int(frappe.db.get_single_value("Temporal Manager", "start_year")), 1, 1)  # January 1st of starting year.
-		end_date = datetime.date(int(frappe.db.get_single_value("Temporal Manager", "end_year")), 12, 31)  # December 31st of ending year.
-
-
-		frappe.db.sql("SET max_recursive_iterations = 20000;")  # IMPORTANT: Overrides the default value of 1000, which limits result to < 3 years.
-		with open(query_path, encoding="utf-8") as fstream:
-			query = fstream.readlines()
-			query = ''.join(query)
-			query = query.replace('@StartDate', f"'{start_date}'")
-			query = query.replace('@EndDate', f"'{end_date}'")
-			frappe.db.sql(query)
+		self._enqueue_rebuild(incremental=False)
 
-		query = """SELECT count(*) FROM `tabTemporal Dates`; """
-		row_count = frappe.db.sql(query)
-		if row_count:
-			row_count = row_count[0][0]
-		else:
-			row_count = 0
-		frappe.db.commit()
+	@staticmethod
+	def _enqueue_rebuild(incremental):
+		from temporal import rebuild_job
+		if not rebuild_job.enqueue_rebuild(incremental=incremental):
+			frappe.msgprint(_("A rebuild of the Redis Calendar is already running."))
+			return
+		frappe.msgprint(_("Rebuilding the Redis Calendar in the background.  Progress is shown on this page."))
 
-		frappe.msgprint("Calculating calendar week numbers...", to_console=True)
-		# Next, need to assign Week Numbers.
-		temporal_date_keys = frappe.get_list("Temporal Dates", pluck="name", order_by="calendar_date")
-		for index, each_key in enumerate(temporal_date_keys):
-			try:
-				if index % 100 == 0:
-					print(f"    Iteration: {index} ...")
-				doc_temporal_date = frappe.get_doc("Temporal Dates", each_key)
-				doc_temporal_date.set_week_number(raise_on_exception=True)
-				doc_temporal_date.save()
-				frappe.db.commit()
-			except Exception as ex:
-				frappe.db.rollback()
-				raise ex
+	@frappe.whitelist()
+	def button_show_redis_statistics(self):
+		""" Display Redis hit/miss counters and latencies, for all worker processes. """
+		from temporal import metrics
+		if not metrics.is_enabled():
+			frappe.msgprint(_("Redis instrumentation is disabled.  To enable it: bench --site {0} set-config temporal_metrics 1").format(frappe.local.site))
+			return
+		statistics = metrics.get_redis_statistics()
+		rows = []
+		for family, family_stats in sorted(statistics.items()):
+			read_latency = family_stats.get('read_latency') or {}
+			write_latency = family_stats.get('write_latency') or family_stats.get('build_all_latency') or {}
+			counters = ", ".join(f"{name}: {value}" for name, value in sorted(family_stats.items()) if not isinstance(value, dict))
+			rows.append(f"<tr><td>{family}</td><td>{counters}</td><td>{read_latency.get('average_ms') or ''}</td>"
+			            f"<td>{write_latency.get('average_ms') or ''}</td></tr>")
+		message = "<table class='table table-bordered'><tr><th>Family</th><th>Counters</th><th>Avg Read (ms)</th><th>Avg Write/Build (ms)</th></tr>"
+		message += "".join(rows) + "</table>"
+		frappe.msgprint(message, title=_("Temporal Redis Statistics"), wide=True)
 
+	@frappe.whitelist()
+	def button_rebuild_temporal_dates(self):
+		"""
+			Empty and repopulate `tabTemporal Dates`, from January 1st of the starting year, to December 31st of the ending year.
+		"""
+		from temporal.temporal_core.doctype.temporal_dates.temporal_dates import rebuild_dates_table
+		print("Rebuilding the Temporal Dates table...")
+		start_date, end_date = self._get_dates_table_range()
+		row_count = rebuild_dates_table(start_date, end_date, truncate=True)
 		frappe.msgprint(f"Table successfully rebuilt and contains {row_count} rows of calendar dates.")
 
+	@frappe.whitelist()
+	def button_extend_temporal_dates(self):
+		"""
+			Insert only the calendar dates missing from `tabTemporal Dates` (for example, after increasing the ending year)
+		"""
+		from temporal.temporal_core.doctype.temporal_dates.temporal_dates import rebuild_dates_table
+		start_date, end_date = self._get_dates_table_range()
+		row_count = rebuild_dates_table(start_date, end_date, truncate=False)
+		frappe.msgprint(f"Added {row_count} missing calendar dates to the table.")
+
+	@staticmethod
+	def _get_dates_table_range():
+		from temporal.settings import get_settings
+		settings = get_settings()
+		start_date = datetime.date(int(settings.start_year), 1, 1)  # January 1st of starting year.
+		end_date = datetime.date(int(settings.end_year), 12, 31)  # December 31st of ending year.
+		return start_date, end_date
 
 	@frappe.whitelist()
 	def button_run_crontab_tests(self):
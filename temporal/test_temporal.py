@@ -73,6 +73,26 @@ class TestTemporal(unittest.TestCase):
 				calculated_value = temporal.Internals.date_to_week_tuple(calendar_date, verbose=True)[1]
 				raise ex
 
+	def test_tdate_is_interned_and_immutable(self):
+		leap_day = temporal.TDate('2024-02-29')
+		self.assertIs(leap_day, temporal.TDate(date(2024, 2, 29)))
+		self.assertEqual(leap_day.day_of_year(), 60)
+		self.assertEqual(leap_day.week_tuple(), temporal.Internals.date_to_week_tuple(date(2024, 2, 29)))
+		with self.assertRaises(AttributeError):
+			leap_day.date = date(2024, 3, 1)
+
+	def test_batch_week_numbers_match_scalar_rule(self):
+		every_date = list(temporal.date_range(temporal.MIN_DATE, temporal.MAX_DATE))
+		expected = [ temporal.Internals.date_to_week_tuple(each) for each in every_date ]
+		week_years, week_numbers = temporal.dates_to_week_arrays(every_date, use_numpy=False)
+		self.assertEqual(list(zip(week_years, week_numbers)), expected)
+		try:
+			import numpy
+		except ImportError:
+			return
+		week_years, week_numbers = temporal.dates_to_week_arrays(numpy.array(every_date, dtype='datetime64[D]'))
+		self.assertEqual(list(zip(week_years.tolist(), week_numbers.tolist())), expected)
+
 	def test_future_dates_calculator(self):
 		# Test a 7 day iteration.
 		retval = temporal.calc_future_dates(epoch_date=date(2021, 7, 1),
@@ -94,6 +114,638 @@ class TestTemporal(unittest.TestCase):
 		                            date(2021, 8, 26),
 			                        date(2021, 9, 9) ])
 
+	def test_argument_errors_do_not_depend_on_import_order(self):
+		import subprocess
+		import sys
+		script = ("import sys, pickle, temporal.core\n"
+		          "assert 'frappe' not in sys.modules\n"
+		          "import frappe\n"
+		          "try:\n"
+		          "	raise temporal.core.ArgumentMissing('missing')\n"
+		          "except frappe.ValidationError as ex:\n"
+		          "	assert isinstance(ex, (ValueError, temporal.core.ArgumentMissing)) and ex.http_status_code == 500\n"
+		          "	assert isinstance(pickle.loads(pickle.dumps(ex)), temporal.core.ArgumentMissing)\n")
+		subprocess.run([ sys.executable, "-c", script ], check=True)  # Temporal imported before Frappe
+
+
+class TestHelpers(unittest.TestCase):
+	""" Unit Test for temporal.helpers """
+
+	def test_dict_to_dateless_dict(self):
+		from datetime import datetime, time
+		from decimal import Decimal
+		from temporal.helpers import dict_to_dateless_dict
+
+		untouched = { 'name': 'SO-0001', 'lines': [1, 2, 3] }
+		payload = {
+			'order_date': date(2023, 10, 1),
+			'created': datetime(2023, 10, 1, 8, 30),
+			'window': (time(8, 0), time(17, 30)),
+			'amount': Decimal('12.50'),
+			'other': untouched
+		}
+		result = dict_to_dateless_dict(payload)
+		self.assertEqual(result['order_date'], '2023-10-01')
+		self.assertEqual(result['created'], '2023-10-01 08:30:00')
+		self.assertEqual(result['window'], ('08:00:00', '17:30:00'))
+		self.assertEqual(result['amount'], 12.5)
+		self.assertIs(result['other'], untouched)  # nothing to convert, so not copied
+		self.assertEqual(payload['order_date'], date(2023, 10, 1))  # argument was not modified
+
+		self.assertIs(dict_to_dateless_dict(payload, in_place=True), payload)
+		self.assertEqual(payload['order_date'], '2023-10-01')
+
+	def test_dict_to_dateless_dict_deep_nesting(self):
+		from temporal.helpers import dict_to_dateless_dict
+		nested = innermost = []
+		for _ in range(5000):  # deeper than the default recursion limit
+			innermost.append([])
+			innermost = innermost[0]
+		innermost.append(date(2023, 1, 1))
+
+		result = dict_to_dateless_dict(nested)
+		for _ in range(5000):
+			result = result[0]
+		self.assertEqual(result, ['2023-01-01'])
+
+
+class TestResultBase(unittest.TestCase):
+	""" Unit Test for the message store in temporal.result.ResultBase """
+
+	def test_message_indexes(self):
+		from temporal.result import ResultBase, MessageAudience, MessageLevel, OutcomeType
+		result = ResultBase()
+		result._available_message_tags = { 'line-error' }  # pylint: disable=protected-access
+		result.add_message(MessageAudience.ALL, MessageLevel.INFO, "Started")
+		result.add_message('internal', 'error', "Line 2 is invalid", tags='line-error')
+		result.add_message(MessageAudience.EXTERNAL, MessageLevel.WARNING, "Line 3 was dropped", tags=['line-error'])
+
+		self.assertEqual(result.count_messages(), 3)
+		self.assertEqual(result.count_messages(MessageLevel.ERROR), 1)
+		self.assertEqual([ each.message for each in result.get_error_messages() ], [ "Line 2 is invalid" ])
+		self.assertEqual(result.get_error_messages()[0].message_level, MessageLevel.ERROR)  # lowercase string was normalized
+		self.assertEqual(len(result.get_warning_messages()), 1)
+		self.assertEqual(result.count_messages_by_tag('line-error'), 2)
+		self.assertEqual(result.outcome, OutcomeType.ERROR)
+		self.assertFalse(result)
+
+		with self.assertRaises(ValueError):
+			result.add_message(MessageAudience.ALL, MessageLevel.INFO, "Unknown tag", tags='header-error')
+
+
+
+class TestCalendarFile(unittest.TestCase):
+	""" Unit Test for the memory-mapped calendar file """
+
+	def test_matches_week_calculation(self):
+		import os
+		import tempfile
+		from temporal.calendar_file import CalendarFile, write_calendar_file
+
+		path = write_calendar_file(os.path.join(tempfile.mkdtemp(), 'temporal_calendar.bin'))
+		calendar = CalendarFile(path)
+		for each in (date(2021, 1, 1), date(2021, 4, 17), date(2021, 12, 26), date(2022, 12, 31), date(2023, 1, 1), date(2201, 12, 31)):
+			week_year, week_number, _ = calendar.read_day_record(each)
+			self.assertEqual((week_year, week_number), temporal.Internals.date_to_week_tuple(each))
+
+		self.assertEqual(calendar.read_day(date(2021, 4, 17))['index_in_week'], 7)
+		self.assertEqual(calendar.read_week(2021, 16)['week_start'], date(2021, 4, 11))
+		self.assertEqual(calendar.read_year(2022)['max_week_number'], 53)
+		self.assertIsNone(calendar.read_week(2021, 53))
+		self.assertIsNone(calendar.read_day(date(1999, 12, 31)))
+		calendar.close()
+
+
+class TestCodec(unittest.TestCase):
+	""" Unit Test for temporal.codec """
+
+	def test_round_trip(self):
+		from temporal import codec
+		year_dict = temporal.Builder.year_dict_for_year(2024)
+		week_dicts = temporal.Builder.week_dicts_for_year(2024)
+		day_dicts = temporal.Builder.day_dicts_for_year(2024)
+		self.assertEqual(codec.decode(codec.encode_year(year_dict)), year_dict)
+		self.assertEqual([ codec.decode(codec.encode_week(each)) for each in week_dicts ], week_dicts)
+		for day_dict in day_dicts:
+			self.assertEqual(codec.decode(codec.encode_day(day_dict)), dict(day_dict, date=day_dict['date'].isoformat()))
+			self.assertEqual(codec.record_date(codec.encode_day(day_dict)), day_dict['date'])
+		self.assertIsNone(codec.record_date(codec.encode_year(year_dict)))
+		self.assertEqual([ codec.DAY_RECORD.size, codec.WEEK_RECORD.size, codec.YEAR_RECORD.size ], [ 10, 9, 6 ])  # as documented
+		self.assertEqual(codec.decode({ 'year': 2024 }), { 'year': 2024 })  # hashes written before the codec
+
+
+class TestLocalCache(unittest.TestCase):
+	""" Unit Test for the process-local cache in temporal.local_cache """
+
+	def test_eviction_and_generation(self):
+		from temporal.local_cache import GENERATION_KEY, LocalCache
+		from temporal.storage import MemoryBackend
+
+		backend = MemoryBackend()
+		cache = LocalCache(backend, max_entries=2)
+		cache.set(('day', 1), { 'value': 1 })
+		cache.set(('day', 2), { 'value': 2 })
+		self.assertEqual(cache.get(('day', 1)), { 'value': 1 })
+		cache.set(('day', 3), { 'value': 3 })  # evicts ('day', 2), the least recently used
+		self.assertIsNone(cache.get(('day', 2)))
+		self.assertEqual(cache.as_dict()['evicted'], 1)
+
+		backend.set_hash(GENERATION_KEY, { 'generation': 'rebuilt' })  # another process rebuilt the calendar
+		cache.check_generation(now=float('inf'))
+		self.assertIsNone(cache.get(('day', 1)))
+		self.assertEqual(cache.generation, 'rebuilt')
+
+	def test_publish_clears_other_processes(self):
+		import importlib.util
+		if importlib.util.find_spec('fakeredis') is None:
+			self.skipTest("Package 'fakeredis' is not installed.")
+		from unittest import mock
+		from temporal import local_cache, storage
+		wrapper = frappe_redis_wrapper()
+		with mock.patch.object(frappe, 'cache', lambda: wrapper, create=True):
+			backend = storage.RedisBackend()
+			storage.set_backend(backend)
+			try:
+				other_process = local_cache.LocalCache(backend)  # e.g. another worker, sharing the site's Redis
+				other_process.check_generation(now=0.0)
+				other_process.set(('day', 'temporal/day/2022-01-01'), { 'value': 1 })
+				generation = local_cache.publish_generation()
+				self.assertEqual(backend.get_hash(local_cache.GENERATION_KEY), { 'generation': generation })
+				other_process.check_generation(now=float('inf'))
+				self.assertIsNone(other_process.get(('day', 'temporal/day/2022-01-01')))
+				self.assertEqual(other_process.generation, generation)
+			finally:
+				storage.set_backend(None)
+
+
+class TestDatesTable(unittest.TestCase):
+	""" Unit Test for populating `tabTemporal Dates` (with a mock database) """
+
+	def test_rows_continue_scalar_values(self):
+		from temporal.temporal_core.doctype.temporal_dates.temporal_dates import dates_table_rows
+		anchor = (date(2024, 1, 1).toordinal(), 100)
+		rows = dates_table_rows(date(2023, 12, 30), date(2024, 1, 2), anchor, { date(2023, 12, 31) }, '2024-06-01', 'Administrator')
+		self.assertEqual([ row[7:] for row in rows ], [ (date(2023, 12, 30), 'Saturday', 98, 52),
+		                                                (date(2024, 1, 1), 'Monday', 100, 1),
+		                                                (date(2024, 1, 2), 'Tuesday', 101, 1) ])
+
+	def test_truncate_and_extend(self):
+		from unittest import mock
+		from temporal.temporal_core.doctype.temporal_dates import temporal_dates
+		database = mock.MagicMock()
+		with mock.patch.object(frappe, 'db', database, create=True), \
+		     mock.patch.object(frappe, 'utils', mock.Mock(now=lambda: '2024-06-01 00:00:00'), create=True), \
+		     mock.patch.object(frappe, 'session', mock.Mock(user='Administrator'), create=True):
+			self.assertEqual(temporal_dates.rebuild_dates_table('2024-01-01', '2024-12-31', truncate=True, batch_size=100), 366)
+			database.sql.assert_called_once_with("TRUNCATE TABLE `tabTemporal Dates`")
+			inserted = [ row for each in database.bulk_insert.call_args_list for row in each.kwargs['values'] ]
+			self.assertEqual([ len(each.kwargs['values']) for each in database.bulk_insert.call_args_list ], [100, 100, 100, 66])
+			self.assertEqual((inserted[0][9], inserted[-1][9]), (1, 366))
+
+			# Extend through 2025:  only missing dates are inserted, and scalar values continue from the table.
+			database.reset_mock()
+			database.sql_list.return_value = [ row[7] for row in inserted ]
+			database.sql.return_value = [ (date(2024, 1, 1), 1) ]
+			self.assertEqual(temporal_dates.rebuild_dates_table('2024-01-01', '2025-12-31'), 365)
+			inserted = database.bulk_insert.call_args.kwargs['values']
+			self.assertEqual((inserted[0][7], inserted[0][9]), (date(2025, 1, 1), 367))
+
+
+class TestExport(unittest.TestCase):
+	""" Unit Test for temporal.export """
+
+	def test_batches_match_builder(self):
+		from temporal.export import calendar_batches
+		batches = list(calendar_batches('2023-12-01', '2024-12-31', batch_size=100, scalar_anchor=(date(2024, 1, 1).toordinal(), 1000)))
+		self.assertEqual([ len(each['date']) for each in batches ], [100] * 3 + [97])
+		rows = [ dict(zip(columns, values)) for columns in batches for values in zip(*columns.values()) ]
+		for row, day_dict in zip(rows[31:], temporal.Builder.day_dicts_for_year(2024)):
+			self.assertEqual(row['weekday_name'], day_dict['weekday_name'])
+			self.assertEqual((row['date'], row['week_year'], row['week_number'], row['index_in_week'], row['day_of_year']),
+			                 (day_dict['date'], day_dict['week_year'], day_dict['week_number'], day_dict['index_in_week'], int(day_dict['day_of_year'])))
+		self.assertEqual((rows[0]['scalar_value'], rows[31]['scalar_value']), (969, 1000))
+		self.assertEqual((rows[-1]['week_start'], rows[-1]['week_end'], rows[-1]['iso_week']), (date(2024, 12, 29), date(2025, 1, 4), 1))
+
+
+class TestSettings(unittest.TestCase):
+	""" Unit Test for temporal.settings """
+
+	def test_settings_are_read_once(self):
+		from unittest import mock
+		from temporal import settings
+		database = mock.Mock()
+		values = { 'debug_mode': 0, 'start_year': '2020', 'end_year': None }
+		database.get_single_value.side_effect = lambda doctype, fieldname: values[fieldname]
+		settings.clear_settings()
+		with mock.patch.object(frappe, 'db', database, create=True):
+			self.assertEqual(settings.get_settings(), (False, 2020, None))
+			temporal.Builder(epoch_year=None, end_year=2021)
+			self.assertEqual(database.get_single_value.call_count, 3)  # one per field, for the entire request
+			settings.clear_settings()  # e.g. 'Temporal Manager' was saved
+			settings.get_settings()
+			self.assertEqual(database.get_single_value.call_count, 6)
+		settings.clear_settings()
+
+
+class TestMetrics(unittest.TestCase):
+	""" Unit Test for temporal.metrics """
+
+	def test_counts_hits_misses_and_writes(self):
+		from unittest import mock
+		from temporal import metrics
+		from temporal import redis as temporal_redis
+		from temporal.benchmark import local_environment
+		with local_environment('memory'), mock.patch.object(metrics, '_forced_state', True), \
+		     mock.patch.object(metrics, '_registries', {}):
+			temporal.Builder.build_all(epoch_year=2022, end_year=2022)
+			temporal.get_date_metadata(date(2022, 4, 17))
+			temporal.get_date_metadata(date(2022, 4, 18))
+			self.assertIsNone(temporal_redis.read_single_day('temporal/day/2030-01-01'))  # not in the calendar
+			statistics = metrics.get_redis_statistics(scope='process')
+			self.assertEqual((statistics['day']['hit'], statistics['day']['miss'], statistics['day']['hit_rate']), (2, 1, 0.6667))
+			self.assertEqual(statistics['day']['read_latency']['count'], 3)
+			self.assertGreater(statistics['day']['writes'], 0)
+			self.assertEqual(statistics['year']['writes'], 1)
+			temporal.Builder(2022, 2022).reconcile()  # stores the checksum
+			temporal.Builder(2022, 2022).reconcile(verify_only=True, deep=True)  # reads every key back, but is not a lookup
+			self.assertEqual(metrics.get_redis_statistics(scope='process')['day']['read_latency']['count'], 3)
+
+			try:
+				wrapper = frappe_redis_wrapper()
+			except ImportError:
+				return  # the site-wide totals need 'fakeredis'
+			with mock.patch.object(frappe, 'cache', lambda: wrapper, create=True):
+				site_statistics = metrics.get_redis_statistics()  # flushes this process's statistics first
+				self.assertEqual(site_statistics['day']['hit'], 2)
+				self.assertEqual(site_statistics['day']['read_latency']['count'], 3)
+				temporal.get_date_metadata(date(2022, 4, 19))
+				metrics.get_registry().flush()
+				self.assertEqual(metrics.get_redis_statistics()['day']['hit'], 3)  # only unflushed statistics are added
+
+	def test_statistics_are_kept_per_site_and_flushed_after_requests(self):
+		from unittest import mock
+		from temporal import metrics
+		with mock.patch.object(metrics, '_forced_state', True), mock.patch.object(metrics, '_registries', {}), \
+		     mock.patch.object(metrics, 'FLUSH_INTERVAL_SECONDS', 0), mock.patch.object(metrics.MetricsRegistry, 'flush') as flush:
+			with mock.patch.object(frappe.local, 'site', 'one.example.com', create=True):
+				metrics.record_read('day', 1.0, hit=True)
+				metrics.record_write('day', 1.0)
+			with mock.patch.object(frappe.local, 'site', 'two.example.com', create=True):
+				metrics.record_read('day', 1.0, hit=False)
+				flush.assert_not_called()  # never while reading
+				metrics.flush_if_due(None, None)  # hook 'after_request'
+				flush.assert_called_once()
+				self.assertEqual((metrics.get_registry().as_dict()['day']['miss'], metrics.get_registry().as_dict()['day'].get('hit')), (1, None))
+			with mock.patch.object(frappe.local, 'site', 'one.example.com', create=True):
+				self.assertEqual((metrics.get_registry().as_dict()['day']['hit'], metrics.get_registry().as_dict()['day'].get('miss')), (1, None))
+
+
+class TestBuilder(unittest.TestCase):
+	""" Unit Test for temporal.Builder, against a local storage backend. """
+
+	@staticmethod
+	def calendar_contents(backend):
+		hashes = { key: value for key, value in backend.hashes.items() if not key.startswith(('temporal/generation', 'temporal/checksum', 'temporal/schema_version')) }
+		return hashes, backend.sets, backend.sorted_sets
+
+	def test_incremental_matches_full_build(self):
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend:
+			temporal.Builder.build_all(epoch_year=2021, end_year=2023)
+			expected = self.calendar_contents(backend)
+		with local_environment('memory') as backend:
+			temporal.Builder.build_all(epoch_year=2022, end_year=2024)
+			temporal.Builder.build_all(epoch_year=2021, end_year=2023, incremental=True)  # adds 2021, drops 2024
+			self.assertEqual(self.calendar_contents(backend), expected)
+
+	def test_build_all_arguments_from_http(self):
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend:
+			temporal.Builder.build_all(epoch_year='2021', end_year='2022', incremental='0')
+			self.assertEqual(backend.get_set('temporal/years'), { '2021', '2022' })
+
+	def test_parallel_matches_serial_build(self):
+		from unittest import mock
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend:
+			temporal.Builder.build_all(epoch_year=2021, end_year=2022)
+			expected = self.calendar_contents(backend)
+		with local_environment('memory') as backend, mock.patch.object(frappe, 'only_for', create=True) as only_for:
+			temporal.Builder.build_all(epoch_year=2021, end_year=2022, parallel='1', processes='2')  # as sent over HTTP
+			self.assertEqual(self.calendar_contents(backend), expected)
+			only_for.assert_called_once_with("System Manager")
+
+	def test_reconcile_rewrites_only_drifted_years(self):
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend:
+			self.assertEqual(temporal.Builder(2021, 2023).reconcile()['drifted'], [2021, 2022, 2023])
+			self.assertEqual(temporal.Builder(2021, 2023).reconcile()['drifted'], [])
+			del backend.hashes['temporal/day/2022-06-01']  # e.g. evicted by Redis
+			self.assertEqual(temporal.Builder(2021, 2023).reconcile(verify_only=True, deep=True)['drifted'], [2022])
+			temporal.Builder(2021, 2023).reconcile(deep=True)
+			self.assertIn('temporal/day/2022-06-01', backend.hashes)
+			backend.hashes['temporal/year/2023'] = { 'year': 2023 }  # e.g. written by an old version, after its checksum
+			temporal.Builder.build_all(epoch_year=2021, end_year=2023, reconcile='0')  # as sent over HTTP:  a full build
+			self.assertEqual(temporal.Builder(2021, 2023).reconcile(verify_only=True, deep=True)['drifted'], [])
+
+	def test_range_reads_use_indexes(self):
+		from temporal import redis as temporal_redis
+		from temporal.benchmark import local_environment
+		with local_environment('sqlite'):
+			temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+			days = temporal_redis.read_days_between(date(2022, 12, 30), date(2023, 1, 2))
+			self.assertEqual([ each['date'] for each in days ], ['2022-12-30', '2022-12-31', '2023-01-01', '2023-01-02'])
+			weeks = temporal_redis.read_weeks_between(date(2022, 12, 31), date(2023, 1, 1))
+			self.assertEqual([ (each['year'], each['week_number']) for each in weeks ], [(2022, 53), (2023, 1)])
+			for ordinal in range(date(2023, 12, 24).toordinal(), date(2024, 1, 1).toordinal()):
+				week = temporal_redis.week_containing(date.fromordinal(ordinal))
+				self.assertEqual((week['year'], week['week_number']), temporal.Internals.date_to_week_tuple(date.fromordinal(ordinal)))
+			april_2023 = temporal.count_weekdays_between('2023-04-01', '2023-04-30')  # April 1st is a Saturday
+			self.assertEqual(list(april_2023.values()), [5, 4, 4, 4, 4, 4, 5])
+
+	def test_week_generator_matches_stored_weeks(self):
+		from temporal.benchmark import local_environment
+		with local_environment('memory'):
+			temporal.Builder.build_all(epoch_year=2021, end_year=2024)
+			calculated = [ (week, week.days, week.date_end) for week in temporal.week_generator('2021-01-01', '2024-12-31') ]
+			stored = [ (week, week.days, week.date_end) for week in temporal.week_generator('2021-01-01', '2024-12-31', prefetch=True) ]
+			self.assertEqual(calculated, stored)
+			self.assertEqual(len(calculated), 210)  # through Week #1 of 2025, which includes December 31st 2024
+			self.assertEqual(len(list(temporal.week_generator('2022-05-25', '2022-05-25'))), 1)
+
+	def test_cluster_key_scheme(self):
+		from unittest import mock
+		from temporal import redis as temporal_redis
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend, mock.patch.object(frappe.local, 'conf', { 'temporal_key_scheme': 'cluster' }, create=True):
+			temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+			self.assertIn('temporal/{2023}/day/2023-01-01', backend.hashes)
+			self.assertIn('temporal/{2024}/week/2024-01', backend.sorted_sets['temporal/{2024}/weeks'])  # the boundary week
+			weeks = temporal_redis.read_weeks_between(date(2022, 12, 31), date(2023, 1, 1))  # one read per year's index
+			self.assertEqual([ (each['year'], each['week_number']) for each in weeks ], [(2022, 53), (2023, 1)])
+			self.assertEqual(temporal.get_week_by_anydate(date(2023, 5, 5)).week_number, 18)
+
+	def test_warm_up_builds_only_missing_years(self):
+		from unittest import mock
+		from temporal import warmup
+		from temporal.benchmark import local_environment
+		this_year = date.today().year
+		with local_environment('memory') as backend, mock.patch.object(frappe.local, 'conf', { 'temporal_local_cache': 1 }, create=True):
+			temporal.Builder.build_all(epoch_year=this_year - 2, end_year=this_year + 2)
+			expected = self.calendar_contents(backend)
+			with mock.patch.object(temporal, 'EPOCH_START_YEAR', this_year - 2), mock.patch.object(temporal, 'EPOCH_END_YEAR', this_year + 2):
+				del backend.hashes[f'temporal/year/{this_year}']  # e.g. evicted by Redis
+				backend.sets['temporal/years'].discard(str(this_year + 2))
+				self.assertEqual(warmup.warm_up(budget_seconds=60, build=False)['built'], [])  # a worker never builds
+				token = backend.acquire_lock(warmup.BUILD_LOCK_KEY, 60)  # another process is building
+				self.assertTrue(warmup.warm_up(budget_seconds=60)['locked'])
+				backend.release_lock(warmup.BUILD_LOCK_KEY, token)
+				report = warmup.warm_up(budget_seconds=60)
+				self.assertEqual(report['built'], [this_year, this_year + 2])
+				self.assertTrue(report['published'])
+				self.assertGreater(report['cached'], 800)
+				self.assertEqual(self.calendar_contents(backend), expected)
+				self.assertEqual(warmup.warm_up(budget_seconds=0)['built'], [])
+				self.assertEqual(backend.locks, {})
+
+	def test_after_migrate_upgrades_an_old_calendar(self):
+		from unittest import mock
+		from temporal import codec, redis as temporal_redis, warmup
+		from temporal.benchmark import local_environment
+		this_year = date.today().year
+		with local_environment('memory') as backend, \
+		     mock.patch.object(temporal, 'EPOCH_START_YEAR', this_year - 1), mock.patch.object(temporal, 'EPOCH_END_YEAR', this_year + 1):
+			temporal.Builder.build_all()
+			expected = temporal_redis.read_days_between(date(this_year, 1, 1), date(this_year, 1, 31))
+			# As stored before version 3:  one field per value, no range indexes, no checksums
+			backend.hashes = { key: codec.decode(value) for key, value in backend.hashes.items() if not key.startswith('temporal/checksum') }
+			backend.sorted_sets.clear()
+			del backend.hashes['temporal/schema_version']
+			self.assertEqual(temporal_redis.read_days_between(date(this_year, 1, 1), date(this_year, 1, 31)), [])
+			warmup.after_migrate()
+			self.assertEqual(temporal_redis.read_days_between(date(this_year, 1, 1), date(this_year, 1, 31)), expected)
+			self.assertEqual(temporal_redis.read_schema_version(), temporal.CALENDAR_SCHEMA_VERSION)
+			self.assertEqual(warmup.warm_up()['upgraded'], [])  # once
+
+
+class TestRebuildJob(unittest.TestCase):
+	""" Unit Test for temporal.rebuild_job """
+
+	def test_resume_after_failure(self):
+		from unittest import mock
+		from temporal import rebuild_job
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend:
+			temporal.Builder.build_all(epoch_year=2021, end_year=2023)
+			expected = TestBuilder.calendar_contents(backend)
+
+		build_year_chunk = temporal.Builder.build_year_chunk
+		built_years = []
+		def crash_in_2022(builder, year):
+			if year == 2022 and 'crashed' not in built_years:
+				built_years.append('crashed')
+				raise RuntimeError("worker killed")
+			built_years.append(year)
+			return build_year_chunk(builder, year)
+
+		with local_environment('memory') as backend, mock.patch.object(frappe, 'publish_realtime', mock.Mock(), create=True), \
+		     mock.patch.object(temporal.Builder, 'build_year_chunk', crash_in_2022):
+			with self.assertRaises(RuntimeError):
+				rebuild_job.run_rebuild(epoch_year=2021, end_year=2023)
+			checkpoint = rebuild_job.read_checkpoint()
+			self.assertEqual((checkpoint['status'], checkpoint['completed_years']), ('failed', [2021]))
+			rebuild_job.run_rebuild(epoch_year=2021, end_year=2023)  # resumes the same rebuild
+			self.assertEqual(built_years, [2021, 'crashed', 2022, 2023])  # 2021 was not built again
+			self.assertEqual(rebuild_job.read_checkpoint()['status'], 'complete')
+			backend.delete(rebuild_job.CHECKPOINT_KEY)
+			self.assertEqual(TestBuilder.calendar_contents(backend), expected)
+
+	def test_is_running_until_heartbeat_is_stale(self):
+		from unittest import mock
+		from temporal import rebuild_job
+		from temporal.benchmark import local_environment
+		with local_environment('memory'):
+			self.assertFalse(rebuild_job.is_running())
+			with mock.patch.object(rebuild_job.time, 'time', return_value=1000.0):
+				rebuild_job._write_checkpoint({ 'status': 'running' })  # pylint: disable=protected-access
+			with mock.patch.object(rebuild_job.time, 'time', return_value=1000.0 + rebuild_job.STALE_AFTER_SECONDS - 1):
+				self.assertTrue(rebuild_job.is_running())
+			with mock.patch.object(rebuild_job.time, 'time', return_value=1000.0 + rebuild_job.STALE_AFTER_SECONDS + 1):
+				self.assertFalse(rebuild_job.is_running())  # the job died without updating its checkpoint
+
+	def test_full_rebuild_repairs_stored_years(self):
+		from unittest import mock
+		from temporal import rebuild_job
+		from temporal.benchmark import local_environment
+		with local_environment('memory') as backend, mock.patch.object(frappe, 'publish_realtime', mock.Mock(), create=True):
+			temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+			expected = TestBuilder.calendar_contents(backend)
+			del backend.hashes['temporal/day/2023-03-01']  # damaged, in a year that is still listed
+			rebuild_job.run_rebuild(epoch_year=2022, end_year=2023, incremental=True)
+			self.assertNotIn('temporal/day/2023-03-01', backend.hashes)  # an incremental rebuild has nothing to add
+			rebuild_job.run_rebuild(epoch_year=2022, end_year=2023, incremental=False)  # 'Full Rebuild of Calendar Cache'
+			backend.delete(rebuild_job.CHECKPOINT_KEY)
+			self.assertEqual(TestBuilder.calendar_contents(backend), expected)
+
+
+def frappe_redis_wrapper():
+	"""
+	A stand-in for Frappe's RedisWrapper (frappe.cache()) on fakeredis:  some methods add the site's key prefix, and pickle hash values.
+	Like the real one, its pipelines are plain redis-py.
+	"""
+	import pickle
+	import fakeredis
+
+	class RedisWrapper(fakeredis.FakeStrictRedis):  # pylint: disable=too-many-ancestors
+		def make_key(self, key, user=None, shared=False):  # pylint: disable=unused-argument
+			return f"_testdb|{key}"
+
+		def hset(self, name, key, value, shared=False):  # pylint: disable=arguments-differ,unused-argument
+			return super().hset(self.make_key(name), key, pickle.dumps(value))
+
+		def hgetall(self, name):
+			return { field: pickle.loads(value) for field, value in super().hgetall(self.make_key(name)).items() }
+
+		def sadd(self, name, *values):
+			return super().sadd(self.make_key(name), *values)
+
+		def srem(self, name, *values):
+			return super().srem(self.make_key(name), *values)
+
+		def smembers(self, name):
+			return super().smembers(self.make_key(name))
+
+	return RedisWrapper()
+
+
+class TestRedisBackend(unittest.TestCase):
+	""" Unit Test for temporal.storage.RedisBackend on the site's Redis cache (requires the 'fakeredis' package) """
+
+	def setUp(self):
+		import importlib.util
+		if importlib.util.find_spec('fakeredis') is None:
+			self.skipTest("Package 'fakeredis' is not installed.")
+
+	def test_build_and_read_through_frappe_cache(self):
+		from unittest import mock
+		from temporal import storage
+		from temporal.benchmark import local_environment
+		wrapper = frappe_redis_wrapper()
+		with local_environment('memory'), mock.patch.object(frappe, 'cache', lambda: wrapper, create=True):
+			storage.set_backend(storage.RedisBackend())  # no client:  uses frappe.cache()
+			temporal.Builder.build_all(epoch_year=2021, end_year=2022)
+			self.assertTrue(all(key.startswith(b'_testdb|temporal/') for key in wrapper.keys()))
+			self.assertEqual(temporal.get_calendar_years(), [2021, 2022])
+			self.assertEqual(temporal.get_date_metadata(date(2021, 4, 17))['index_in_week'], 7)
+			self.assertEqual(temporal.get_week_by_anydate(date(2022, 5, 5)).week_number, 19)
+			self.assertEqual(sum(temporal.count_weekdays_between('2021-01-01', '2021-12-31').values()), 365)
+			temporal.Builder.build_all(epoch_year=2021, end_year=2021, incremental=True)
+			self.assertEqual(temporal.get_calendar_years(), [2021])
+			self.assertFalse(wrapper.exists('_testdb|temporal/year/2022'))
+
+	def test_lua_range_reads(self):
+		import importlib.util
+		if importlib.util.find_spec('lupa') is None:
+			self.skipTest("Package 'lupa' is not installed (fakeredis needs it for Lua scripts).")
+		import fakeredis
+		from unittest import mock
+		from temporal import redis as temporal_redis, storage
+		from temporal.benchmark import local_environment
+		with local_environment('memory'):
+			temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+			expected = (temporal_redis.read_days_between(date(2022, 12, 25), date(2023, 1, 14)),
+			            temporal_redis.read_weeks_between(date(2022, 12, 25), date(2023, 1, 14)),
+			            temporal.count_weekdays_between('2022-03-01', '2023-10-31'))
+		for scheme in ('standard', 'cluster'):
+			with local_environment('memory'), mock.patch.object(frappe.local, 'conf', { 'temporal_key_scheme': scheme }, create=True):
+				backend = storage.RedisBackend(client=fakeredis.FakeStrictRedis(), key_prefix='_testdb')
+				storage.set_backend(backend)
+				temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+				with mock.patch.object(storage.RedisBackend, 'get_hashes', side_effect=AssertionError("not read with Lua")):
+					self.assertEqual((temporal_redis.read_days_between(date(2022, 12, 25), date(2023, 1, 14)),
+					                  temporal_redis.read_weeks_between(date(2022, 12, 25), date(2023, 1, 14)),
+					                  temporal.count_weekdays_between('2022-03-01', '2023-10-31')), expected)
+				self.assertEqual(set(backend._scripts), { 'sorted_range_hashes', 'count_sorted_range_by_modulus' })  # pylint: disable=protected-access
+
+	def test_locks(self):
+		import os
+		import tempfile
+		from temporal import storage
+		for backend in (storage.RedisBackend(client=frappe_redis_wrapper()), storage.MemoryBackend(),
+		                storage.SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'temporal.sqlite3'))):
+			token = backend.acquire_lock('temporal/test_lock', 60)
+			self.assertTrue(token)
+			self.assertIsNone(backend.acquire_lock('temporal/test_lock', 60))
+			backend.release_lock('temporal/test_lock', 'another token')  # e.g. after the lock expired, and was taken again
+			self.assertIsNone(backend.acquire_lock('temporal/test_lock', 60))
+			backend.release_lock('temporal/test_lock', token)
+			self.assertTrue(backend.acquire_lock('temporal/test_lock', 60))
+
+
+class TestAsyncTemporal(unittest.TestCase):
+	""" Unit Test for temporal.aio.AsyncTemporal (requires the 'fakeredis' package) """
+
+	def test_reads_match_synchronous_reads(self):
+		try:
+			import fakeredis
+		except ImportError:
+			self.skipTest("Package 'fakeredis' is not installed.")
+		import asyncio
+		from unittest import mock
+		from temporal import keys, storage
+		from temporal.aio import AsyncTemporal
+		from temporal.benchmark import local_environment
+
+		async def read_all(calendar):
+			week = await calendar.get_week_by_anydate(date(2023, 1, 1))
+			weeks = await calendar.get_weeks_as_dict(2022, 50, 53)
+			generated = [ each async for each in calendar.week_generator('2022-12-01', '2023-01-31') ]
+			return week, weeks, generated
+
+		for scheme in ('standard', 'cluster'):
+			server = fakeredis.FakeServer()
+			with local_environment('memory'), mock.patch.object(frappe.local, 'conf', { 'temporal_key_scheme': scheme }, create=True):
+				storage.set_backend(storage.RedisBackend(client=fakeredis.FakeStrictRedis(server=server), key_prefix='_testdb'))
+				temporal.Builder.build_all(epoch_year=2022, end_year=2023)
+				expected = (temporal.get_week_by_anydate(date(2023, 1, 1)),
+				            temporal.get_weeks_as_dict(2022, 50, 53),
+				            list(temporal.week_generator('2022-12-01', '2023-01-31')))
+
+			async def run():
+				async with AsyncTemporal(client=fakeredis.FakeAsyncRedis(server=server), key_prefix='_testdb', key_scheme=scheme) as calendar:  # pylint: disable=cell-var-from-loop
+					self.assertEqual(await read_all(calendar), expected)
+					await calendar.client.delete(calendar.make_key(keys.day_key(date(2023, 1, 1), scheme)))
+					with self.assertRaises(KeyError):
+						await calendar.get_week_by_anydate(date(2023, 1, 1))
+			asyncio.run(run())
+
+
+class TestReadReplicas(unittest.TestCase):
+	""" Unit Test for reads from Redis replicas (requires the 'fakeredis' package) """
+
+	def test_round_robin_and_failover(self):
+		try:
+			import fakeredis
+		except ImportError:
+			self.skipTest("Package 'fakeredis' is not installed.")
+		import pickle
+		from temporal.storage import RedisBackend
+		primary = fakeredis.FakeStrictRedis()
+		replica_servers = [ fakeredis.FakeServer(), fakeredis.FakeServer() ]
+		replicas = [ fakeredis.FakeStrictRedis(server=server) for server in replica_servers ]
+		backend = RedisBackend(client=primary, replicas=replicas)
+		backend.set_hash('temporal/year/2022', { 'year': 2022 })
+		for index, replica in enumerate(replicas):
+			replica.hset('temporal/year/2022', 'year', pickle.dumps(f"replica {index}"))  # identifies which replica answered
+		answers = [ backend.get_hash('temporal/year/2022')['year'] for _ in range(4) ]
+		self.assertEqual(sorted(answers), ['replica 0', 'replica 0', 'replica 1', 'replica 1'])
+		for server in replica_servers:
+			server.connected = False
+		self.assertEqual(backend.get_hash('temporal/year/2022'), { 'year': 2022 })  # every replica failed, so the primary
+		with backend.use_primary():
+			replica_servers[0].connected = replica_servers[1].connected = True
+			self.assertEqual(backend.get_hash('temporal/year/2022'), { 'year': 2022 })
+
 
 def custom_test_one(year):
 	""" Simple test for printing Dates and Weeks to console.
@@ -0,0 +1,172 @@
+""" temporal/warmup.py
+
+Prepare the Temporal calendar before traffic arrives, so the first requests do not pay for a rebuild-on-miss.
+
+	1. When the stored calendar was written with an older schema (see temporal.CALENDAR_SCHEMA_VERSION), upgrade it with Builder.reconcile().
+	   Then build the years that are missing (not listed, or whose Year key was lost, e.g. after a Redis restart).  Years nearest today are built first.
+	2. Make sure a calendar generation is published (see temporal/local_cache.py)
+	3. Open the calendar file, and fill the local cache with the days and weeks around today, when either is enabled.
+
+Building (step 1) happens only after 'bench migrate', or when warm_up() is called directly.  It holds the lock BUILD_LOCK_KEY, so
+only one process builds at a time;  the others skip it, as they do while a background rebuild is running (see temporal.rebuild_job).
+The budget is checked between missing years, so the last year built may finish after the budget is spent.  An upgrade ignores the
+budget:  until every year is rewritten, range reads of the old calendar find nothing.
+
+Workers only do steps 2 and 3, once per process (and site), on their first request or background job.  So no request waits for a build.
+
+	bench --site <sitename> set-config temporal_warmup 0               (optional; disables the warm-up of workers)
+	bench --site <sitename> set-config temporal_warmup_seconds 5       (optional; time budget of each worker)
+	bench execute temporal.warmup.warm_up
+"""
+
+# Standard Library
+from datetime import date, timedelta
+import threading
+import time
+
+# Frappe
+import frappe
+
+# Temporal
+from temporal import keys, local_cache
+from temporal.storage import get_backend
+
+WORKER_BUDGET_SECONDS = 5
+AFTER_MIGRATE_BUDGET_SECONDS = 120
+BUILD_LOCK_KEY = "temporal/warmup_lock"
+# The lock expires this long after the budget, in case its holder dies (a year that began before the deadline still finishes)
+BUILD_LOCK_MARGIN_SECONDS = 60
+# The local cache is filled with the days (and their weeks) from this many days before today, through as many after.
+WARM_DAYS_AROUND_TODAY = 400
+
+_warmed_sites = set()
+_warmed_sites_lock = threading.Lock()
+
+
+def _site_config():
+	return getattr(frappe.local, 'conf', None) or {}
+
+
+def _log(message):
+	print(f"Temporal warm-up: {message}")
+
+
+def warm_up(budget_seconds=AFTER_MIGRATE_BUDGET_SECONDS, build=True):
+	"""
+	Build missing years (unless 'build' is False), publish a generation, and warm the local cache, within 'budget_seconds'.
+	Returns a report:  { 'upgraded': [years], 'built': [years], 'skipped': [years], 'locked': bool, 'published': bool, 'cached': int, 'seconds': float }
+	"""
+	start = time.monotonic()
+	deadline = start + float(budget_seconds)
+	report = { 'upgraded': [], 'built': [], 'skipped': [], 'locked': False, 'published': False, 'cached': 0 }
+
+	with get_backend().use_primary():
+		if build:
+			build_missing_years(deadline, report)
+		if report['upgraded'] or report['built'] or not get_backend().get_hash(local_cache.GENERATION_KEY):
+			local_cache.publish_generation()
+			report['published'] = True
+
+	if time.monotonic() < deadline:
+		report['cached'] = warm_local_cache(deadline)
+
+	report['seconds'] = round(time.monotonic() - start, 3)
+	_log(f"upgraded {report['upgraded'] or 'no'} years, built {report['built'] or 'no'} years, skipped {report['skipped'] or 'no'} years (out of time), "
+	     f"{'skipped building (another process is building), ' if report['locked'] else ''}"
+	     f"{'published a new' if report['published'] else 'kept the'} generation, and cached {report['cached']} entries in {report['seconds']}s")
+	return report
+
+
+def build_missing_years(deadline, report):
+	"""
+	Upgrade an outdated calendar, then build the missing years until 'deadline' (a time.monotonic() value), unless another process is building.
+	Updates 'report'.
+	"""
+	from temporal import CALENDAR_SCHEMA_VERSION, Builder, rebuild_job, redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	backend = get_backend()
+	token = None if rebuild_job.is_running() else backend.acquire_lock(BUILD_LOCK_KEY, deadline - time.monotonic() + BUILD_LOCK_MARGIN_SECONDS)
+	if not token:
+		report['locked'] = True
+		return
+	try:
+		builder = Builder(epoch_year=None, end_year=None)
+		stored_years = temporal_redis.read_years()
+		if stored_years and temporal_redis.read_schema_version() != CALENDAR_SCHEMA_VERSION:
+			report['upgraded'] = builder.reconcile()['drifted']  # every year written with an older schema has a different checksum
+			temporal_redis.write_schema_version(CALENDAR_SCHEMA_VERSION)
+		missing_years = find_missing_years(builder)
+		missing_years.sort(key=lambda year: abs(year - date.today().year))
+		for year in missing_years:
+			if time.monotonic() >= deadline:
+				report['skipped'].append(year)
+				continue
+			builder.build_year_chunk(year)
+			report['built'].append(year)
+		if not stored_years and report['built'] and not report['skipped']:
+			temporal_redis.write_schema_version(CALENDAR_SCHEMA_VERSION)  # built from nothing
+		if (report['upgraded'] or report['built']) and not report['skipped']:
+			builder.build_calendar_file()
+	finally:
+		backend.release_lock(BUILD_LOCK_KEY, token)
+
+
+def find_missing_years(builder):
+	"""
+	Returns the list of this Builder's years that are not listed as stored, or whose Year key no longer exists.
+	"""
+	from temporal import redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	stored_years = set(temporal_redis.read_years())
+	year_hashes = get_backend().get_hashes([ keys.year_key(year) for year in builder.years ])
+	return [ year for year, year_hash in zip(builder.years, year_hashes) if year not in stored_years or not year_hash ]
+
+
+def warm_local_cache(deadline):
+	"""
+	Open the calendar file, and preload the local cache with the days and weeks around today.  Returns the number of entries cached.
+	"""
+	from temporal import calendar_file, redis as temporal_redis  # pylint: disable=import-outside-toplevel
+	calendar_file.get_calendar_file()
+	if not local_cache.is_enabled():
+		return 0
+	today = date.today()
+	from_date, to_date = today - timedelta(days=WARM_DAYS_AROUND_TODAY), today + timedelta(days=WARM_DAYS_AROUND_TODAY)
+
+	day_dicts = temporal_redis.read_days_by_date_between(from_date, to_date)
+	cached = local_cache.preload('day', { (keys.day_key(day_date),): day_dict for day_date, day_dict in day_dicts.items() })
+	if time.monotonic() >= deadline:
+		return cached
+	week_dicts = temporal_redis.read_weeks_between(from_date, to_date)
+	cached += local_cache.preload('week', { (each['year'], each['week_number']): each for each in week_dicts if each })
+	stored_years = temporal_redis.read_years()
+	for year in range(from_date.year, to_date.year + 1):
+		if year in stored_years and temporal_redis.read_single_year(year):  # cached by the read
+			cached += 1
+	return cached
+
+# ----------------
+# Hooks
+# ----------------
+
+def after_migrate():
+	""" Hook 'after_migrate' """
+	warm_up(budget_seconds=AFTER_MIGRATE_BUDGET_SECONDS)
+
+
+def on_worker_start(*args, **kwargs):  # pylint: disable=unused-argument
+	"""
+	Hooks 'before_request' and 'before_job':  warm up once per process and site, without building.  Never raises; a failure is logged, and not retried.
+	"""
+	site = getattr(frappe.local, 'site', None)
+	if site in _warmed_sites:
+		return
+	with _warmed_sites_lock:
+		if site in _warmed_sites:
+			return
+		_warmed_sites.add(site)
+	site_config = _site_config()
+	if not int(site_config.get('temporal_warmup', 1)):
+		return
+	try:
+		warm_up(budget_seconds=float(site_config.get('temporal_warmup_seconds') or WORKER_BUDGET_SECONDS), build=False)
+	except Exception as ex:  # pylint: disable=broad-except
+		_log(f"failed ({ex})")